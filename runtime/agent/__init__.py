@@ -1,7 +1,33 @@
-"""Renderdoc Debug Agent package."""
+"""Renderdoc Debug Agent package.
 
-from .config import AgentConfig
-from .renderdoc_adapter import RenderdocModule, load_renderdoc
-from .runtime import RenderdocDebugAgent
+Public names are imported on first attribute access so that importing a
+submodule (``runtime.agent.config``, ``python -m runtime.agent``) does not
+pull in the tool stack.
+"""
+
+import importlib
+import sys
+
+_EXPORTS = {
+    "AgentConfig": ".config",
+    "RenderdocModule": ".renderdoc_adapter",
+    "load_renderdoc": ".renderdoc_adapter",
+    "RenderdocDebugAgent": ".runtime",
+}
 
 __all__ = ["AgentConfig", "RenderdocModule", "load_renderdoc", "RenderdocDebugAgent"]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):  # no module __getattr__ (PEP 562)
+    from .config import AgentConfig
+    from .renderdoc_adapter import RenderdocModule, load_renderdoc
+    from .runtime import RenderdocDebugAgent
@@ -6,13 +6,17 @@ Usage:
 Environment variables:
     RENDERDOC_PYTHON_PATH  Path to RenderDoc's python bindings (if not on PYTHONPATH).
     RENDERDOC_CAPTURE      Optional default .rdc path for smoke testing.
+    RENDERDOC_PREWARM      Set to 1 to load the RenderDoc bindings in the background at startup.
     MCP_HOST               Host interface for the MCP WebSocket server (default: 127.0.0.1).
     MCP_PORT               Port for the MCP WebSocket server (default: 8765).
+    MCP_METRICS_PORT       Serve Prometheus metrics on http://MCP_HOST:PORT/metrics (default: off).
+    MCP_TIMINGS            Set to 1 to attach per-phase ``timings`` to every MCP response.
 """
 
 
 import os
 
+from . import metrics
 from .config import AgentConfig
 from .runtime import RenderdocDebugAgent
 
@@ -28,6 +32,10 @@ def main() -> None:
     except ValueError:
         port = 8765
 
+    metrics_port = os.environ.get("MCP_METRICS_PORT", "").strip()
+    if metrics_port.isdigit() and int(metrics_port) > 0:
+        metrics.start_http_server(int(metrics_port), host)
+
     agent.run_mcp_server_sync(host=host, port=port)
 
 
@@ -0,0 +1,5 @@
+"""Micro-benchmarks for the RenderDoc MCP agent hot paths.
+
+Each module is runnable on its own, e.g.:
+    python -m runtime.agent.benchmarks.mcp_throughput
+"""
@@ -0,0 +1,83 @@
+"""Compare copy_capture through the capture store with shutil.copy2.
+
+Run with:
+    python -m runtime.agent.benchmarks.capture_store --sizes 16,256,1024 --dir /path/on/target/fs
+
+A random capture of each size (MiB) is staged ``--copies`` times into new
+destination paths and once more onto an existing copy. ``copy2`` copies
+every time; the store hashes the capture once, stores it once and then
+reflinks (or copies in-kernel, or with ``--hardlinks`` hardlinks) each
+destination. Results depend on the filesystem of ``--dir``: reflinks need
+btrfs/XFS, hardlinks need the store and the destinations on one filesystem.
+"""
+
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from ..tools.capture_store import CaptureStore
+
+
+def _write_random(path: str, size: int) -> None:
+    block = os.urandom(1 << 20)
+    with open(path, "wb") as handle:
+        for _ in range(size >> 20):
+            handle.write(block)
+
+
+def _run(copy: Callable[[str, str], str], source: str, root: str, copies: int) -> Dict[str, object]:
+    methods: List[str] = []
+    start = time.perf_counter()
+    first = None
+    for index in range(copies):
+        methods.append(copy(source, os.path.join(root, f"copy{index}", "frame.rdc")))
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    again = time.perf_counter()
+    methods.append(copy(source, os.path.join(root, "copy0", "frame.rdc")))
+    existing = time.perf_counter() - again
+    return {"first": first, "total": total, "existing": existing, "methods": sorted(set(methods))}
+
+
+def _copy2(source: str, dest: str) -> str:
+    os.makedirs(os.path.dirname(dest), exist_ok=True)
+    shutil.copy2(source, dest)
+    return "copy2"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Capture store vs shutil.copy2 benchmark.")
+    parser.add_argument("--sizes", default="16,256", help="Comma-separated capture sizes in MiB.")
+    parser.add_argument("--copies", type=int, default=4, help="Destinations staged per size.")
+    parser.add_argument("--dir", default=None, help="Scratch directory (default: system temp dir).")
+    parser.add_argument("--hardlinks", action="store_true", help="Enable the store's read-only hardlink copies.")
+    args = parser.parse_args()
+
+    print(f"{'MiB':>6} {'path':<8} {'first ms':>10} {'all ms':>10} {'existing ms':>12}  methods")
+    for size in (int(value) for value in args.sizes.split(",") if value.strip()):
+        root = tempfile.mkdtemp(prefix="rdstore-", dir=args.dir)
+        try:
+            source = os.path.join(root, "source.rdc")
+            _write_random(source, size << 20)
+            store = CaptureStore(os.path.join(root, "store"), hardlinks=args.hardlinks)
+            cases = [
+                ("copy2", lambda s, d: _copy2(s, d), os.path.join(root, "copy2")),
+                ("store", lambda s, d: store.copy(s, d)["method"], os.path.join(root, "store-out")),
+            ]
+            for name, copy, out in cases:
+                result = _run(copy, source, out, max(1, args.copies))
+                print(
+                    f"{size:>6} {name:<8} {result['first'] * 1000:>10.1f} {result['total'] * 1000:>10.1f} "
+                    f"{result['existing'] * 1000:>12.1f}  {','.join(result['methods'])}"
+                )
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,544 @@
+"""Synthetic in-process stand-in for RenderDoc's ``renderdoc`` module.
+
+``make_module(**options)`` returns a fresh module object implementing the
+subset of the replay API used by RenderdocTools (action tree, pixel
+history, counters, post-VS data, textures, pipeline state), so tools, the
+MCP server and the replay worker pool can be exercised and benchmarked
+without a GPU:
+
+    rd = RenderdocModule(make_module(actions=2000, replay_latency=0.01))
+    tools = RenderdocTools(rd)
+
+Sizes (actions, pixel-history depth, counters, vertices, texture size) and
+latencies are set through the options in DEFAULT_OPTIONS. Data is
+deterministic: every ``nan_every``-th pixel/texel/vertex is a NaN.
+
+Failure injection for worker-pool tests: a capture path containing
+``crash_marker`` kills the hosting process on open, one containing
+``hang_marker`` blocks for ``hang_seconds``.
+"""
+
+
+import array
+import os
+import struct
+import time
+import types
+from typing import Any, Dict, Optional
+
+from ..renderdoc_adapter import RenderdocModule
+
+DEFAULT_OPTIONS: Dict[str, Any] = {
+    # Number of drawcalls in the synthetic frame (grouped under markers).
+    "actions": 100,
+    # Drawcalls per marker region.
+    "actions_per_marker": 10,
+    # Seconds spent in OpenCapture.
+    "open_latency": 0.0,
+    # Seconds spent per SetFrameEvent.
+    "replay_latency": 0.0,
+    # Drawcalls that modified each pixel in PixelHistory.
+    "pixel_history_depth": 4,
+    # Every n-th pixel / texel / vertex holds a NaN.
+    "nan_every": 97,
+    # Number of GPU counters reported by EnumerateCounters.
+    "counters": 8,
+    # Post-VS vertices per drawcall.
+    "vertices": 3000,
+    # Draw with a 32-bit index buffer (vertices in reverse order).
+    "indexed": False,
+    # Render target size (RGBA16F colour, RGBA32F and R11G11B10 targets).
+    "texture_width": 512,
+    "texture_height": 256,
+    # Seconds spent per PixelHistory / FetchCounters / GetTextureData call.
+    "query_latency": 0.0,
+    # CaptureFile.DriverName() for catalog metadata.
+    "driver": "Vulkan",
+    "crash_marker": "crash",
+    "hang_marker": "hang",
+    "hang_seconds": 3600.0,
+}
+
+
+class _Enum(int):
+    """Int-valued enum member exposing ``.name`` like RenderDoc's enums."""
+
+    def __new__(cls, name: str, value: int):
+        member = super().__new__(cls, value)
+        member.name = name
+        return member
+
+    def __str__(self) -> str:
+        return self.name
+
+
+def make_module(**overrides: Any) -> types.ModuleType:
+    """Build a fake ``renderdoc`` module configured by ``overrides``."""
+
+    unknown = set(overrides) - set(DEFAULT_OPTIONS)
+    if unknown:
+        raise TypeError(f"Unknown fake renderdoc options: {sorted(unknown)}")
+    options = dict(DEFAULT_OPTIONS, **overrides)
+    rd = types.ModuleType("renderdoc")
+    rd.options = options
+
+    class ResultCode:
+        Succeeded = 1
+        FileNotFound = 2
+
+    class ActionFlags:
+        NoFlags = 0
+        Clear = 0x1
+        Drawcall = 0x2
+        PushMarker = 0x4
+        Present = 0x8
+        Indexed = 0x10
+
+    class ResourceId:
+        def __init__(self, value: int = 0):
+            self.value = int(value)
+
+        def __eq__(self, other: Any) -> bool:
+            return isinstance(other, ResourceId) and other.value == self.value
+
+        def __hash__(self) -> int:
+            return hash(self.value)
+
+        def __bool__(self) -> bool:
+            return bool(self.value)
+
+        @staticmethod
+        def Null() -> "ResourceId":
+            return ResourceId(0)
+
+    class ReplayOptions:
+        pass
+
+    class Action:
+        def __init__(self, event_id: int, name: str, flags: int, children=()):
+            self.eventId = event_id
+            self.drawcallId = event_id
+            self.flags = flags
+            self.name = name
+            self.children = list(children)
+            draw = bool(flags & ActionFlags.Drawcall)
+            self.numIndices = int(options["vertices"]) if draw else 0
+            self.numInstances = 1 if draw else 0
+            self.indexOffset = self.baseVertex = self.vertexOffset = self.instanceOffset = 0
+
+        def GetName(self, structured=None) -> str:
+            return self.name
+
+    def build_actions():
+        roots = []
+        event_id = 1
+        remaining = int(options["actions"])
+        marker_index = 0
+        while remaining > 0:
+            marker = Action(event_id, f"Pass {marker_index}", ActionFlags.PushMarker)
+            event_id += 1
+            for _ in range(min(remaining, int(options["actions_per_marker"]))):
+                flags = ActionFlags.Drawcall | (ActionFlags.Indexed if options["indexed"] else 0)
+                marker.children.append(Action(event_id, f"Draw {event_id}", flags))
+                event_id += 1
+                remaining -= 1
+            roots.append(marker)
+            marker_index += 1
+        roots.append(Action(event_id, "Present", ActionFlags.Present))
+        return roots
+
+    class CompType:
+        Float = _Enum("Float", 1)
+        UInt = _Enum("UInt", 2)
+        UNorm = _Enum("UNorm", 3)
+
+    class CounterUnit:
+        Absolute = _Enum("Absolute", 0)
+        Seconds = _Enum("Seconds", 1)
+
+    class ResourceFormatType:
+        Regular = _Enum("Regular", 0)
+        R11G11B10 = _Enum("R11G11B10", 1)
+
+    class FileType:
+        DDS = _Enum("DDS", 0)
+        PNG = _Enum("PNG", 1)
+        EXR = _Enum("EXR", 2)
+        JPG = _Enum("JPG", 3)
+
+    class MeshDataStage:
+        VSIn = _Enum("VSIn", 0)
+        VSOut = _Enum("VSOut", 1)
+        GSOut = _Enum("GSOut", 2)
+
+    class ShaderStage:
+        Vertex = _Enum("Vertex", 0)
+        Geometry = _Enum("Geometry", 3)
+        Pixel = _Enum("Pixel", 4)
+
+    class Topology:
+        TriangleList = _Enum("TriangleList", 3)
+
+    class ShaderBuiltin:
+        Position = _Enum("Position", 1)
+
+    class ResourceFormat:
+        def __init__(self, fmt_type, comp_type, count: int, width: int, name: str):
+            self.type = fmt_type
+            self.compType = comp_type
+            self.compCount = count
+            self.compByteWidth = width
+            self._name = name
+
+        def Name(self) -> str:
+            return self._name
+
+        def BGRAOrder(self) -> bool:
+            return False
+
+    class TextureDescription:
+        def __init__(self, resource_id: int, fmt: "ResourceFormat"):
+            self.resourceId = ResourceId(resource_id)
+            self.width = int(options["texture_width"])
+            self.height = int(options["texture_height"])
+            self.depth = 1
+            self.mips = 1
+            self.arraysize = 1
+            self.format = fmt
+
+    class Subresource:
+        def __init__(self, mip: int = 0, slice: int = 0, sample: int = 0):
+            self.mip = mip
+            self.slice = slice
+            self.sample = sample
+
+    class TextureSave:
+        def __init__(self):
+            self.resourceId = ResourceId()
+            self.destType = FileType.PNG
+            self.mip = 0
+            self.slice = types.SimpleNamespace(sliceIndex=0)
+
+    class ModValue:
+        def __init__(self, colour):
+            self.colour = colour
+
+    class PixelModification:
+        def __init__(self, event_id: int, pre, post):
+            self.eventId = event_id
+            self.preMod = ModValue(pre)
+            self.postMod = ModValue(post)
+
+    class CounterDescription:
+        def __init__(self, counter: int):
+            self.name = "EventGPUDuration" if counter == 1 else f"Counter{counter}"
+            self.description = f"Synthetic counter {counter}"
+            self.resultType = CompType.Float if counter == 1 else CompType.UInt
+            self.resultByteWidth = 8
+            self.unit = CounterUnit.Seconds if counter == 1 else CounterUnit.Absolute
+
+    class CounterValue:
+        # A union like the real one: only the member matching resultType holds the value,
+        # the others read its bits.
+        def __init__(self, value: float, floating: bool):
+            if floating:
+                raw = struct.pack("<d", float(value))
+                self.d = self.f = float(value)
+                self.u64 = struct.unpack("<Q", raw)[0]
+                self.u32 = self.u64 & 0xFFFFFFFF
+            else:
+                raw = struct.pack("<Q", int(value))
+                self.u64 = self.u32 = int(value)
+                self.d = struct.unpack("<d", raw)[0]
+                self.f = struct.unpack("<f", raw[:4])[0]
+
+    class CounterResult:
+        def __init__(self, event_id: int, counter: int, value: float):
+            self.eventId = event_id
+            self.counter = counter
+            self.value = CounterValue(value, floating=counter == 1)
+
+    class MeshFormat:
+        def __init__(self, event_id: int, valid: bool = True):
+            self.vertexResourceId = ResourceId(500000 + event_id) if valid else ResourceId.Null()
+            self.vertexByteOffset = 0
+            self.vertexByteStride = 24
+            self.format = ResourceFormat(ResourceFormatType.Regular, CompType.Float, 4, 4, "R32G32B32A32_FLOAT")
+            self.numIndices = int(options["vertices"]) if valid else 0
+            self.indexResourceId = ResourceId(INDEX_BUFFER) if options["indexed"] else ResourceId.Null()
+            self.indexByteOffset = 0
+            self.indexByteStride = 4 if options["indexed"] else 0
+            self.baseVertex = 0
+            self.topology = Topology.TriangleList
+
+    class VertexInputAttribute:
+        def __init__(self, name: str, offset: int, fmt: "ResourceFormat"):
+            self.name = name
+            self.vertexBuffer = 0
+            self.byteOffset = offset
+            self.perInstance = False
+            self.instanceRate = 0
+            self.format = fmt
+            self.used = True
+
+    class BoundVBuffer:
+        def __init__(self, resource_id: int, stride: int, size: int):
+            self.resourceId = ResourceId(resource_id)
+            self.byteOffset = 0
+            self.byteStride = stride
+            self.byteSize = size
+
+    class SigParameter:
+        def __init__(self, name: str, count: int, system_value=None):
+            self.semanticName = name
+            self.varName = name.lower()
+            self.compCount = count
+            self.systemValue = system_value
+
+    class Attachment:
+        def __init__(self, resource_id: int, name: str):
+            self.resourceId = ResourceId(resource_id)
+            self.name = name
+
+    class PipeState:
+        def __init__(self, event_id: int):
+            self.event_id = event_id or 0
+
+        def GetFramebuffer(self):
+            # The depth target is unbound for the first drawcall of every pass.
+            depth = None if self.event_id % int(options["actions_per_marker"] + 1) == 2 else Attachment(20, "Depth")
+            return types.SimpleNamespace(colorAttachments=[Attachment(10, "Color")], depthAttachment=depth)
+
+        def GetShaderReflection(self, stage):
+            if stage is ShaderStage.Geometry:
+                return None
+            signature = [SigParameter("SV_Position", 4, ShaderBuiltin.Position), SigParameter("TEXCOORD0", 2)]
+            return types.SimpleNamespace(outputSignature=signature)
+
+        def GetVertexInputs(self):
+            float4 = ResourceFormat(ResourceFormatType.Regular, CompType.Float, 4, 4, "R32G32B32A32_FLOAT")
+            float2 = ResourceFormat(ResourceFormatType.Regular, CompType.Float, 2, 4, "R32G32_FLOAT")
+            return [VertexInputAttribute("POSITION", 0, float4), VertexInputAttribute("TEXCOORD", 16, float2)]
+
+        def GetVBuffers(self):
+            return [BoundVBuffer(VERTEX_BUFFER, 24, int(options["vertices"]) * 24)]
+
+        def GetIBuffer(self):
+            if options["indexed"]:
+                return BoundVBuffer(INDEX_BUFFER, 4, int(options["vertices"]) * 4)
+            return BoundVBuffer(0, 0, 0)
+
+    VERTEX_BUFFER = 400000
+    INDEX_BUFFER = 600000
+
+    textures = [
+        TextureDescription(10, ResourceFormat(ResourceFormatType.Regular, CompType.Float, 4, 2, "R16G16B16A16_FLOAT")),
+        TextureDescription(11, ResourceFormat(ResourceFormatType.Regular, CompType.Float, 4, 4, "R32G32B32A32_FLOAT")),
+        TextureDescription(12, ResourceFormat(ResourceFormatType.R11G11B10, CompType.Float, 3, 1, "R11G11B10_FLOAT")),
+    ]
+
+    def query_delay() -> None:
+        if options["query_latency"]:
+            time.sleep(options["query_latency"])
+
+    def draw_events(roots) -> list:
+        return [child.eventId for marker in roots for child in marker.children]
+
+    class ReplayController:
+        def __init__(self):
+            self.event_id = None
+            self._roots = build_actions()
+            self._draws = draw_events(self._roots)
+            self._data = {}
+
+        def GetRootActions(self):
+            return self._roots
+
+        def SetFrameEvent(self, event_id: int, force: bool) -> None:
+            if options["replay_latency"]:
+                time.sleep(options["replay_latency"])
+            self.event_id = event_id
+
+        def PixelHistory(self, texture, x: int, y: int, sample: int):
+            query_delay()
+            depth = min(int(options["pixel_history_depth"]), len(self._draws))
+            step = max(1, len(self._draws) // max(1, depth))
+            mods = []
+            colour = [0.0, 0.0, 0.0, 0.0]
+            for i in range(depth):
+                post = [(x + i) % 256 / 255.0, (y + i) % 256 / 255.0, i / max(1, depth), 1.0]
+                if i == depth - 1 and (x * 7919 + y) % int(options["nan_every"]) == 0:
+                    post[0] = float("nan")
+                mods.append(PixelModification(self._draws[i * step], colour, post))
+                colour = post
+            # Like RenderDoc, only modifications up to the current event are reported.
+            if self.event_id is not None:
+                mods = [mod for mod in mods if mod.eventId <= self.event_id]
+            return mods
+
+        def EnumerateCounters(self):
+            return list(range(1, int(options["counters"]) + 1))
+
+        def DescribeCounter(self, counter: int):
+            return CounterDescription(counter)
+
+        def FetchCounters(self, counters):
+            query_delay()
+            return [CounterResult(eid, c, eid * 10 + c) for eid in self._draws for c in counters]
+
+        def GetPostVSData(self, instance: int, view: int, stage):
+            if not any(stage is member for member in (MeshDataStage.VSIn, MeshDataStage.VSOut, MeshDataStage.GSOut)):
+                raise TypeError(f"GetPostVSData(instance, view, stage): invalid stage {stage!r}")
+            # No geometry shader is bound, so GSOut is empty like in RenderDoc.
+            return MeshFormat(self.event_id or 0, stage is not MeshDataStage.GSOut)
+
+        def GetBufferData(self, resource_id, offset: int, length: int) -> bytes:
+            query_delay()
+            kind = "indices" if getattr(resource_id, "value", None) == INDEX_BUFFER else "vertices"
+            data = self._data.get(kind)
+            if data is None:
+                data = self._data[kind] = self._index_bytes() if kind == "indices" else self._vertex_bytes()
+            return data[offset : offset + length] if length else data[offset:]
+
+        def _index_bytes(self) -> bytes:
+            return array.array("I", reversed(range(int(options["vertices"])))).tobytes()
+
+        def _vertex_bytes(self) -> bytes:
+            count = int(options["vertices"])
+            nan_every = int(options["nan_every"])
+            values = array.array("f")
+            for i in range(count):
+                x = float("nan") if i % nan_every == 0 else (i % 100) / 10.0
+                values.extend((x, 1.0, 0.5, 1.0, (i % 13) / 10.0, (i % 7) / 10.0))
+            return values.tobytes()
+
+        def GetPipelineState(self):
+            return PipeState(self.event_id)
+
+        def GetTextures(self):
+            return list(textures)
+
+        def GetTextureData(self, resource_id, subresource) -> bytes:
+            query_delay()
+            tex = next(t for t in textures if t.resourceId == resource_id)
+            data = self._data.get(tex.resourceId.value)
+            if data is None:
+                data = self._data[tex.resourceId.value] = self._texture_bytes(tex)
+            return data
+
+        def _texture_bytes(self, tex) -> bytes:
+            texels = tex.width * tex.height
+            nan_every = int(options["nan_every"])
+            if tex.format.type is ResourceFormatType.R11G11B10:
+                one = (15 << 6) | ((15 << 6) << 11) | ((15 << 5) << 22)
+                words = array.array("I", [one]) * texels
+                for i in range(0, texels, nan_every):
+                    words[i] = (31 << 6) | 1
+                return words.tobytes()
+            layout = "<4e" if tex.format.compByteWidth == 2 else "<4f"
+            texel = struct.pack(layout, 1.0, 1.0, 1.0, 1.0)
+            nan_texel = struct.pack(layout, float("nan"), 1.0, 1.0, 1.0)
+            data = bytearray(texel * texels)
+            size = len(texel)
+            for i in range(0, texels, nan_every):
+                data[i * size : (i + 1) * size] = nan_texel
+            return bytes(data)
+
+        def SaveTexture(self, save, path: str) -> None:
+            with open(path, "wb") as handle:
+                handle.write(self.GetTextureData(save.resourceId, Subresource(save.mip, save.slice.sliceIndex)))
+
+        def Shutdown(self) -> None:
+            pass
+
+    class CaptureFile:
+        def __init__(self):
+            self.path = None
+
+        def OpenFile(self, path: str, filetype: str, progress) -> int:
+            if not os.path.isfile(path):
+                return ResultCode.FileNotFound
+            self.path = path
+            return ResultCode.Succeeded
+
+        def LocalReplaySupport(self) -> bool:
+            return True
+
+        def DriverName(self) -> str:
+            return options["driver"]
+
+        def RecordedMachineIdent(self) -> str:
+            return "Linux 64-bit"
+
+        def TimestampBase(self) -> int:
+            return 0
+
+        def GetSectionCount(self) -> int:
+            return 2
+
+        def GetSectionProperties(self, index: int):
+            if index == 0:
+                size = os.path.getsize(self.path)
+                name, section_type = "renderdoc/internal/framecapture", "FrameCapture"
+                compressed, uncompressed = size, size * 2
+            else:
+                name, section_type = "renderdoc/ui/notes", "Notes"
+                compressed = uncompressed = 64
+            return types.SimpleNamespace(
+                name=name,
+                type=section_type,
+                version=1,
+                compressedSize=compressed,
+                uncompressedSize=uncompressed,
+                flags="NoFlags",
+            )
+
+        def GetThumbnail(self, file_type, max_size: int):
+            data = b"\xff\xd8\xff\xe0fake-jpeg\xff\xd9"
+            return types.SimpleNamespace(data=data, format=FileType.JPG, width=64, height=36)
+
+        def OpenCapture(self, opts, progress):
+            name = os.path.basename(self.path or "")
+            if options["crash_marker"] and options["crash_marker"] in name:
+                os._exit(70)  # simulate a native crash: no exception, no cleanup
+            if options["hang_marker"] and options["hang_marker"] in name:
+                time.sleep(options["hang_seconds"])
+            if options["open_latency"]:
+                time.sleep(options["open_latency"])
+            return ResultCode.Succeeded, ReplayController()
+
+        def Shutdown(self) -> None:
+            pass
+
+    rd.ResultCode = ResultCode
+    rd.CompType = CompType
+    rd.CounterUnit = CounterUnit
+    rd.ResourceFormatType = ResourceFormatType
+    rd.FileType = FileType
+    rd.MeshDataStage = MeshDataStage
+    rd.ShaderStage = ShaderStage
+    rd.ShaderBuiltin = ShaderBuiltin
+    rd.Topology = Topology
+    rd.Subresource = Subresource
+    rd.TextureSave = TextureSave
+    rd.ActionFlags = ActionFlags
+    rd.ResourceId = ResourceId
+    rd.ReplayOptions = ReplayOptions
+    rd.Action = Action
+    rd.ReplayController = ReplayController
+    rd.CaptureFile = CaptureFile
+    rd.OpenCaptureFile = CaptureFile
+    rd.LocalReplaySupport = lambda: True
+    return rd
+
+
+def fake_renderdoc(**overrides: Any) -> RenderdocModule:
+    return RenderdocModule(make_module(**overrides))
+
+
+def fake_tools(options: Dict[str, Any], cache_dir: Optional[str] = None):
+    """Top-level (picklable) factory for worker pools running the fake backend."""
+
+    from ..tools.renderdoc_tools import RenderdocTools
+
+    return RenderdocTools(fake_renderdoc(**options), cache_dir=cache_dir)
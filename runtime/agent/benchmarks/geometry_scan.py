@@ -0,0 +1,102 @@
+"""Compare the NumPy and pure-Python geometry_anomalies scans.
+
+Run with:
+    python -m runtime.agent.benchmarks.geometry_scan --vertices 10000,100000,1000000
+
+Synthetic interleaved post-VS buffers (float4 position + float2 texcoord,
+24-byte stride) are generated with a small fraction of NaN/huge positions
+and out-of-range UVs. The NumPy path includes the structured-array view of
+the raw bytes; the Python path includes building per-vertex objects, as
+the legacy loop sees them through ``vsout.positions``.
+"""
+
+
+import argparse
+import random
+import struct
+import time
+from collections import namedtuple
+from typing import Any, Callable, Tuple
+
+from ..tools import geometry
+
+np = geometry.np
+
+Vec4 = namedtuple("Vec4", "x y z w")
+Vec2 = namedtuple("Vec2", "x y")
+
+STRIDE = 24
+UV_OFFSET = 16
+
+
+def synthetic_buffer(count: int, bad_ratio: float, seed: int = 1) -> bytes:
+    rng = random.Random(seed)
+    out = bytearray(count * STRIDE)
+    for i in range(count):
+        x, y, z = rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(0, 1)
+        u, v = rng.random(), rng.random()
+        roll = rng.random()
+        if roll < bad_ratio / 3:
+            x = float("nan")
+        elif roll < 2 * bad_ratio / 3:
+            y = 1e6
+        elif roll < bad_ratio:
+            u = 1.5
+        struct.pack_into("<6f", out, i * STRIDE, x, y, z, 1.0, u, v)
+    return bytes(out)
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_numpy(raw: bytes):
+    dtype = geometry.vertex_dtype(STRIDE, 4, UV_OFFSET)
+    vertices = np.frombuffer(raw, dtype=dtype)
+    return geometry.scan_arrays(vertices["position"], vertices["texcoord"])
+
+
+def run_python(raw: bytes):
+    positions = []
+    uvs = []
+    for x, y, z, w, u, v in struct.iter_unpack("<6f", raw):
+        positions.append(Vec4(x, y, z, w))
+        uvs.append(Vec2(u, v))
+    return geometry.scan_python(positions, uvs)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="geometry_anomalies scan benchmark.")
+    parser.add_argument("--vertices", default="10000,100000,1000000", help="Comma-separated vertex counts.")
+    parser.add_argument("--bad-ratio", type=float, default=0.001, help="Fraction of anomalous vertices.")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions per path.")
+    parser.add_argument("--max-python-vertices", type=int, default=1000000, help="Skip the Python path above this.")
+    args = parser.parse_args()
+
+    print(f"{'vertices':>10} {'numpy ms':>10} {'python ms':>10} {'speedup':>8}")
+    for count in [int(c) for c in args.vertices.split(",") if c]:
+        raw = synthetic_buffer(count, args.bad_ratio)
+        np_ms = py_ms = None
+        if np is not None:
+            seconds, np_result = _time(lambda: run_numpy(raw), args.repeat)
+            np_ms = seconds * 1000.0
+        if count <= args.max_python_vertices:
+            seconds, py_result = _time(lambda: run_python(raw), args.repeat)
+            py_ms = seconds * 1000.0
+        if np_ms is not None and py_ms is not None:
+            for key in ("invalidPositionCount", "uvOutOfRangeCount"):
+                assert np_result[key] == py_result[key], (key, np_result[key], py_result[key])
+        speedup = f"{py_ms / np_ms:>7.1f}x" if np_ms and py_ms else f"{'-':>8}"
+        np_text = f"{np_ms:>10.2f}" if np_ms is not None else f"{'n/a':>10}"
+        py_text = f"{py_ms:>10.2f}" if py_ms is not None else f"{'skipped':>10}"
+        print(f"{count:>10} {np_text} {py_text} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Import-time budget check for the agent's entry points.
+
+Run with:
+    python -m runtime.agent.benchmarks.import_time
+    python -m runtime.agent.benchmarks.import_time --scale 2.0
+
+Each module is imported in a fresh interpreter with ``-X importtime``
+(Python 3.7+) and the best cumulative time over ``--repeat`` runs is
+compared with its budget. Modules listed as deferred must not be imported
+at all: numpy, websockets, the renderdoc bindings and the MCP server are
+loaded on first use. The process exits with status 1 when a budget is
+exceeded or a deferred module is imported. Budgets are generous wall-clock
+figures for a typical dev box; scale them on slower machines.
+"""
+
+
+import argparse
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+HEAVY = ("numpy", "websockets", "renderdoc", "requests", "msgpack", "cbor2")
+
+# module -> (budget in ms, modules that must stay unimported)
+BUDGETS: Dict[str, Tuple[float, Tuple[str, ...]]] = {
+    "runtime.agent": (20.0, HEAVY + ("runtime.agent.runtime", "runtime.agent.tools")),
+    "runtime.agent.config": (80.0, HEAVY + ("runtime.agent.runtime", "runtime.agent.tools")),
+    "runtime.agent.runtime": (200.0, HEAVY + ("asyncio", "runtime.agent.mcp_server", "runtime.agent.worker_pool")),
+    "runtime.agent.__main__": (200.0, HEAVY + ("asyncio", "runtime.agent.mcp_server")),
+    "runtime.agent.mcp_renderdoc": (200.0, HEAVY + ("runtime.agent.mcp_server",)),
+    "runtime.agent.orchestrator_minimal": (250.0, HEAVY + ("runtime.agent.mcp_server",)),
+}
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+
+def import_profile(module: str) -> Tuple[float, List[str]]:
+    """Return (cumulative ms, imported module names) for importing ``module``."""
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr}")
+    total = 0.0
+    names = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        names.append(match.group(3))
+        if match.group(3) == module:
+            total = int(match.group(2)) / 1000.0
+    return total, names
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check import-time budgets with -X importtime.")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of runs per module.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget by this factor.")
+    parser.add_argument("--filter", default="", help="Only check modules whose name contains this text.")
+    args = parser.parse_args()
+
+    if sys.version_info < (3, 7):
+        print("-X importtime needs Python 3.7+")
+        sys.exit(2)
+
+    failures = []
+    print(f"{'module':<40} {'ms':>10} {'budget':>10}")
+    for module, (budget, deferred) in BUDGETS.items():
+        if args.filter and args.filter not in module:
+            continue
+        best = float("inf")
+        imported: List[str] = []
+        for _ in range(max(1, args.repeat)):
+            total, imported = import_profile(module)
+            best = min(best, total)
+        budget *= args.scale
+        print(f"{module:<40} {best:>10.1f} {budget:>10.1f}")
+        if best > budget:
+            failures.append(f"{module}: {best:.1f} ms > {budget:.1f} ms")
+        loaded = sorted({name for name in imported if any(name == d or name.startswith(d + ".") for d in deferred)})
+        if loaded:
+            failures.append(f"{module}: imports deferred module(s) {', '.join(loaded)}")
+
+    if failures:
+        print(f"\n{len(failures)} import-time failure(s):")
+        for line in failures:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
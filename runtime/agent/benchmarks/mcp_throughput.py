@@ -0,0 +1,122 @@
+"""Measure MCPServer throughput with N concurrent WebSocket clients.
+
+Run with:
+    python -m runtime.agent.benchmarks.mcp_throughput --clients 1,4,16
+
+Tool calls are simulated by a sleep (which releases the GIL the same way
+native replay does), spread over a configurable number of captures so the
+per-capture serialization in MCPServer is exercised. Each client keeps
+``--inflight`` requests pipelined on its connection.
+"""
+
+
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict, List
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - optional dependency
+    websockets = None  # type: ignore
+
+from ..mcp_server import MCPServer
+
+
+class SleepTools:
+    """Stand-in for RenderdocTools whose calls take a fixed amount of time."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def dispatch(self, tool_name: str, payload: Dict[str, Any]) -> Any:
+        time.sleep(self.latency)
+        return {"tool": tool_name, "capture": payload.get("capture_path")}
+
+
+async def _client(uri: str, client_index: int, requests: int, inflight: int, captures: int) -> List[float]:
+    latencies: List[float] = []
+    async with websockets.connect(uri) as ws:
+        sent_at: Dict[str, float] = {}
+        next_index = 0
+
+        async def send_one() -> None:
+            nonlocal next_index
+            request_id = f"{client_index}-{next_index}"
+            capture = f"capture_{(client_index + next_index) % captures}.rdc"
+            next_index += 1
+            sent_at[request_id] = time.perf_counter()
+            await ws.send(json.dumps({"id": request_id, "tool": "noop", "arguments": {"capture_path": capture}}))
+
+        for _ in range(min(inflight, requests)):
+            await send_one()
+        received = 0
+        while received < requests:
+            data = json.loads(await ws.recv())
+            latencies.append(time.perf_counter() - sent_at.pop(data["id"]))
+            received += 1
+            if next_index < requests:
+                await send_one()
+    return latencies
+
+
+async def _run_round(port: int, clients: int, requests: int, inflight: int, captures: int) -> Dict[str, float]:
+    uri = f"ws://127.0.0.1:{port}"
+    start = time.perf_counter()
+    results = await asyncio.gather(*[_client(uri, i, requests, inflight, captures) for i in range(clients)])
+    elapsed = time.perf_counter() - start
+    latencies = sorted(lat for per_client in results for lat in per_client)
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": latencies[len(latencies) // 2] * 1000.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000.0,
+    }
+
+
+async def _bench(args) -> None:
+    server = MCPServer(SleepTools(args.latency_ms / 1000.0), "127.0.0.1", args.port, max_workers=args.workers)
+    async with server.listen():
+        print(
+            f"latency={args.latency_ms}ms captures={args.captures} inflight={args.inflight} "
+            f"requests/client={args.requests}"
+        )
+        print(f"{'clients':>8} {'requests':>9} {'seconds':>8} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+        for clients in [int(c) for c in args.clients.split(",") if c]:
+            row = await _run_round(args.port, clients, args.requests, args.inflight, args.captures)
+            print(
+                f"{row['clients']:>8} {row['requests']:>9} {row['seconds']:>8.2f} "
+                f"{row['rps']:>9.1f} {row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MCPServer throughput benchmark.")
+    parser.add_argument("--clients", default="1,2,4,8,16", help="Comma-separated client counts.")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per client.")
+    parser.add_argument("--inflight", type=int, default=4, help="Pipelined requests per connection.")
+    parser.add_argument("--captures", type=int, default=8, help="Distinct captures to spread calls over.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated tool latency.")
+    parser.add_argument("--workers", type=int, default=None, help="Executor worker threads.")
+    parser.add_argument("--port", type=int, default=8799, help="Port for the benchmark server.")
+    args = parser.parse_args()
+
+    if websockets is None:
+        raise SystemExit("websockets package is required for this benchmark.")
+    if hasattr(asyncio, "run"):
+        asyncio.run(_bench(args))
+        return
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(_bench(args))
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Compare MCP response encodings on typical tool outputs.
+
+Run with:
+    python -m runtime.agent.benchmarks.serialization --actions 50000
+
+Reports encode time and payload size for the legacy ``indent=2`` JSON, the
+compact stdlib JSON default, optional fast JSON backends and the binary
+codecs negotiated through ``mcp.negotiate`` (when installed).
+"""
+
+
+import argparse
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from .. import wire
+
+
+def sample_actions(count: int) -> List[Dict[str, Any]]:
+    rng = random.Random(7)
+    actions = []
+    for event_id in range(1, count + 1):
+        actions.append(
+            {
+                "eventId": event_id,
+                "drawcallId": event_id,
+                "flags": "Drawcall|Indexed",
+                "flagsMask": 0x6,
+                "name": f"DrawIndexed({rng.randint(3, 90000)})",
+                "parentEventId": max(1, event_id - event_id % 50),
+                "depth": 2,
+            }
+        )
+    return actions
+
+
+def sample_counters(events: int, counters: int) -> List[Dict[str, Any]]:
+    rng = random.Random(11)
+    return [{"name": f"Counter {c} (event {e})", "value": rng.random() * 1e6} for e in range(events) for c in range(counters)]
+
+
+def sample_pixel_region(pixels: int) -> Dict[str, Any]:
+    rng = random.Random(13)
+    return {
+        "textureId": 101,
+        "sample": 0,
+        "pixelCount": pixels,
+        "touchedPixelCount": pixels,
+        "events": [{"eventId": e, "pixelCount": pixels, "nanInfCount": 0} for e in range(100, 140)],
+        "pixels": [
+            {
+                "x": i % 64,
+                "y": i // 64,
+                "eventIds": sorted(rng.sample(range(100, 140), 4)),
+                "postColour": [rng.random(), rng.random(), rng.random(), 1.0],
+            }
+            for i in range(pixels)
+        ],
+    }
+
+
+def sample_pipeline_state() -> Dict[str, Any]:
+    return {
+        "highlightStage": None,
+        "warningMessage": None,
+        "colorTargets": [{"index": i, "resourceId": str(1000 + i), "name": f"GBuffer{i}"} for i in range(4)],
+        "depthTarget": {"resourceId": "2000", "name": "Depth"},
+    }
+
+
+def _encoders() -> List[Tuple[str, Callable[[Any], Any]]]:
+    encoders: List[Tuple[str, Callable[[Any], Any]]] = [
+        ("json indent=2 (legacy)", lambda obj: json.dumps(obj, ensure_ascii=False, indent=2)),
+        ("json compact (stdlib)", wire.json_codec("stdlib").dumps),
+    ]
+    for backend in ("orjson", "ujson"):
+        try:
+            __import__(backend)
+        except ImportError:
+            continue
+        encoders.append((f"json compact ({backend})", wire.json_codec(backend).dumps))
+    for name in ("msgpack", "cbor"):
+        codec = wire.CODECS.get(name)
+        if codec is not None:
+            encoders.append((name, codec.dumps))
+    return encoders
+
+
+def _measure(encode: Callable[[Any], Any], payload: Any, repeat: int) -> Tuple[float, int]:
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = encode(payload)
+        best = min(best, time.perf_counter() - start)
+        size = len(data.encode("utf-8")) if isinstance(data, str) else len(data)
+    return best * 1000.0, size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MCP response serialization benchmark.")
+    parser.add_argument("--actions", type=int, default=50000, help="Actions in the iterate_actions payload.")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions.")
+    args = parser.parse_args()
+
+    payloads = {
+        f"iterate_actions[{args.actions}]": sample_actions(args.actions),
+        "enumerate_counters[500x20]": sample_counters(500, 20),
+        "pixel_history_region[4096]": sample_pixel_region(4096),
+        "get_pipeline_state": sample_pipeline_state(),
+    }
+    for label, payload in payloads.items():
+        response = {"id": "bench", "ok": True, "result": payload, "error": None}
+        print(label)
+        baseline = None
+        for name, encode in _encoders():
+            ms, size = _measure(encode, response, args.repeat)
+            baseline = baseline or size
+            print(f"  {name:<26} {ms:>9.2f} ms {size:>12,d} B {100.0 * size / baseline:>6.1f}%")
+
+
+if __name__ == "__main__":
+    main()
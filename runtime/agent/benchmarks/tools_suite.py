@@ -0,0 +1,272 @@
+"""Tool-level benchmark suite on the fake renderdoc backend.
+
+Run with:
+    python -m runtime.agent.benchmarks.tools_suite
+    python -m runtime.agent.benchmarks.tools_suite --update-baseline
+
+Every RenderdocTools method, serialize_result and an MCPServer WebSocket
+round trip are timed (best of ``--repeat``) against the synthetic capture
+from fake_renderdoc. Results are compared with a baseline JSON file; a case
+slower than the baseline by more than ``--threshold`` (relative) and
+``--min-delta-ms`` (absolute) is reported as a regression and the process
+exits with status 1. Baselines are machine-specific: regenerate them on the
+box that runs the comparison.
+"""
+
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..tools.renderdoc_tools import RenderdocTools, serialize_result
+from ..tools.result_cache import ToolResultCache
+from .fake_renderdoc import fake_renderdoc
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "tools_suite.json")
+
+Case = Tuple[str, Callable[[], Any]]
+
+
+class SuiteContext:
+    """Fake capture, warm tools and scratch directories shared by the cases."""
+
+    def __init__(self, options: Dict[str, Any]):
+        self.options = options
+        self.root = tempfile.mkdtemp(prefix="rdbench-")
+        self.capture = os.path.join(self.root, "frame.rdc")
+        with open(self.capture, "wb") as handle:
+            handle.write(os.urandom(1 << 20))
+        self.tools = self.new_tools()
+        self.last_event = self.tools.iterate_actions(self.capture)[-1]["eventId"]
+
+    def new_tools(self, cache_dir: Optional[str] = None) -> RenderdocTools:
+        # A zero-byte result cache keeps every call on the measured code path.
+        return RenderdocTools(
+            fake_renderdoc(**self.options),
+            cache_dir=cache_dir or os.path.join(self.root, "cache"),
+            result_cache=ToolResultCache(max_bytes=0),
+        )
+
+    def scratch(self, name: str) -> str:
+        path = os.path.join(self.root, name)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path)
+        return path
+
+    def close(self) -> None:
+        self.tools.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def tool_cases(ctx: SuiteContext) -> List[Case]:
+    tools, capture = ctx.tools, ctx.capture
+    mid_event = ctx.last_event // 2
+
+    def iterate_cold() -> Any:
+        cold = ctx.new_tools(ctx.scratch("cold-cache"))
+        try:
+            return cold.iterate_actions(capture)
+        finally:
+            cold.close()
+
+    def stream_all() -> int:
+        return sum(len(chunk) for chunk in tools.stream("iterate_actions", {"capture_path": capture}, 1000))
+
+    # Requested newest-first so the batch has to reorder them into one forward pass.
+    step = max(1, ctx.last_event // 50)
+    sweep = [{"tool": "get_pipeline_state", "event_id": eid} for eid in range(ctx.last_event, 0, -step)]
+
+    def copy() -> Any:
+        return tools.copy_capture(capture, os.path.join(ctx.scratch("copy"), "copy.rdc"))
+
+    return [
+        ("iterate_actions (cold, builds index)", iterate_cold),
+        ("iterate_actions (indexed)", lambda: tools.iterate_actions(capture)),
+        ("iterate_actions (page of 100)", lambda: tools.iterate_actions(capture, event_min=mid_event, limit=100)),
+        ("stream iterate_actions", stream_all),
+        ("pixel_history", lambda: tools.pixel_history(capture, 10, 97, 0)),
+        ("analyze_nan_inf", lambda: tools.analyze_nan_inf(capture, 10, 97, 0)),
+        (
+            "pixel_history_region (32x32)",
+            lambda: tools.pixel_history_region(capture, 10, rect={"x": 0, "y": 0, "width": 32, "height": 32}),
+        ),
+        ("scan_texture_nan_inf (RGBA16F)", lambda: tools.scan_texture_nan_inf(capture, 10)),
+        ("scan_texture_nan_inf (R11G11B10)", lambda: tools.scan_texture_nan_inf(capture, 12)),
+        ("enumerate_counters (all)", lambda: tools.enumerate_counters(capture)),
+        ("geometry_anomalies", lambda: tools.geometry_anomalies(capture, 2)),
+        (
+            "export_mesh (vsin + vsout, npy)",
+            lambda: tools.export_mesh(capture, 2, ctx.scratch("mesh"), stages=["vsin", "vsout"]),
+        ),
+        ("get_pipeline_state", lambda: tools.get_pipeline_state(capture, mid_event)),
+        ("pipeline_timeline (whole frame)", lambda: tools.pipeline_timeline(capture)),
+        (f"batch_query ({len(sweep)} get_pipeline_state)", lambda: tools.batch_query(capture, sweep)),
+        ("diff_captures (same capture, cached inputs)", lambda: tools.diff_captures(capture, capture)),
+        ("save_texture", lambda: tools.save_texture(capture, 10, os.path.join(ctx.scratch("save"), "rt.png"))),
+        (
+            "export_textures (3 targets, png)",
+            lambda: tools.export_textures(
+                capture, [{"resource_id": 10}, {"resource_id": 11}, {"resource_id": 12}], ctx.scratch("export")
+            ),
+        ),
+        ("copy_capture (1 MiB)", copy),
+        ("session_stats", tools.session_stats),
+        ("export_schema", tools.export_schema),
+        ("tool_schema (etag + compact prompt)", lambda: tools.tool_schema().response()),
+    ]
+
+
+def serialization_cases(ctx: SuiteContext) -> List[Case]:
+    actions = ctx.tools.iterate_actions(ctx.capture)
+    region = ctx.tools.pixel_history_region(ctx.capture, 10, rect={"x": 0, "y": 0, "width": 64, "height": 64})
+    return [
+        (f"serialize_result iterate_actions[{len(actions)}]", lambda: serialize_result(actions)),
+        ("serialize_result pixel_history_region[4096]", lambda: serialize_result(region)),
+    ]
+
+
+def mcp_cases(ctx: SuiteContext, port: int) -> List[Case]:
+    try:
+        import websockets
+    except ImportError:
+        return []
+    from ..mcp_server import MCPServer
+
+    def round_trip(tool: str, arguments: Dict[str, Any], calls: int) -> Callable[[], Any]:
+        async def run() -> None:
+            server = MCPServer(ctx.tools, "127.0.0.1", port)
+            async with server.listen():
+                async with websockets.connect(f"ws://127.0.0.1:{port}", max_size=None) as ws:
+                    for i in range(calls):
+                        await ws.send(json.dumps({"id": str(i), "tool": tool, "arguments": arguments}))
+                        reply = json.loads(await ws.recv())
+                        if not reply["ok"]:
+                            raise RuntimeError(reply["error"])
+
+        return lambda: _run_async(run())
+
+    return [
+        (
+            "MCPServer round trip x50 (get_pipeline_state)",
+            round_trip("get_pipeline_state", {"capture_path": ctx.capture, "event_id": 2}, 50),
+        ),
+        ("MCPServer round trip x5 (iterate_actions)", round_trip("iterate_actions", {"capture_path": ctx.capture}, 5)),
+    ]
+
+
+def _run_async(coro) -> Any:
+    if hasattr(asyncio, "run"):
+        return asyncio.run(coro)
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+        asyncio.set_event_loop(None)
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> float:
+    fn()  # warm-up: opens the pooled session and fills per-session caches
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000.0, 3)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float, min_delta_ms: float) -> List[str]:
+    regressions = []
+    for name, ms in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if ms > base * (1.0 + threshold) and ms - base > min_delta_ms:
+            regressions.append(f"{name}: {base:.3f} ms -> {ms:.3f} ms (+{100.0 * (ms / base - 1.0):.0f}%)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RenderdocTools benchmark suite on a fake renderdoc backend.")
+    parser.add_argument("--actions", type=int, default=2000, help="Drawcalls in the synthetic frame.")
+    parser.add_argument("--pixel-history-depth", type=int, default=8, help="Modifications per pixel.")
+    parser.add_argument("--counters", type=int, default=16, help="GPU counters reported.")
+    parser.add_argument("--vertices", type=int, default=30000, help="Post-VS vertices per draw.")
+    parser.add_argument("--texture-size", default="1024x512", help="Render target WxH.")
+    parser.add_argument("--replay-latency-ms", type=float, default=0.0, help="Simulated SetFrameEvent latency.")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions.")
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this text.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON to compare with.")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results to --baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown counted as regression.")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5, help="Ignore absolute slowdowns below this.")
+    parser.add_argument("--port", type=int, default=8798, help="Port for the MCPServer round-trip cases.")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.texture_size.lower().split("x"))
+    options = {
+        "actions": args.actions,
+        "pixel_history_depth": args.pixel_history_depth,
+        "counters": args.counters,
+        "vertices": args.vertices,
+        "texture_width": width,
+        "texture_height": height,
+        "replay_latency": args.replay_latency_ms / 1000.0,
+    }
+    ctx = SuiteContext(options)
+    try:
+        cases = tool_cases(ctx) + serialization_cases(ctx) + mcp_cases(ctx, args.port)
+        results: Dict[str, float] = {}
+        for name, fn in cases:
+            if args.filter and args.filter not in name:
+                continue
+            results[name] = measure(fn, args.repeat)
+    finally:
+        ctx.close()
+
+    baseline: Dict[str, Any] = {}
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as handle:
+            baseline = json.load(handle)
+    if baseline.get("options") not in (None, options):
+        print("warning: baseline was recorded with different options; comparison is not meaningful")
+
+    base_cases = baseline.get("cases", {})
+    print(f"{'case':<50} {'ms':>10} {'baseline':>10}")
+    for name, ms in results.items():
+        base = base_cases.get(name)
+        print(f"{name:<50} {ms:>10.3f} {'-' if base is None else f'{base:.3f}':>10}")
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        record = {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "options": options,
+            "repeat": args.repeat,
+            "cases": dict(base_cases, **results),
+        }
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(record, handle, indent=2, sort_keys=True)
+            handle.write("\n")
+        print(f"baseline written to {args.baseline}")
+        return
+
+    regressions = compare(results, base_cases, args.threshold, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {100.0 * args.threshold:.0f}%:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,37 @@ from dataclasses import dataclass
 from typing import Optional
 
 
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def default_cache_dir() -> str:
+    """Return the per-user directory for on-disk caches (action index, ...)."""
+
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "renderdoc-debug-agent")
+
+
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass
 class AgentConfig:
     """Runtime configuration.
@@ -16,6 +47,21 @@ class AgentConfig:
         model_explainer: Model identifier for explanations.
         renderdoc_python_path: Optional override for locating the RenderDoc Python module.
         default_capture: Optional path to a default capture file for smoke testing.
+        session_max_captures: Maximum number of warm replay controllers kept open.
+        session_max_bytes: Approximate memory budget (capture bytes) for warm controllers.
+        session_idle_timeout: Seconds before an unused replay controller is closed.
+        cache_dir: Directory for persistent per-capture caches.
+        result_cache_bytes: In-memory budget for memoized tool results.
+        result_cache_disk: Also persist memoized tool results under cache_dir.
+        chain_workers: Tool chain groups for different captures run in parallel on the replay worker pool.
+        replay_workers: Replay subprocesses serving MCP tool calls (0 replays in the server process).
+        replay_timeout: Seconds before a replay worker call is abandoned and the worker restarted.
+        renderdoc_prewarm: Load the RenderDoc bindings on a background thread at startup instead of on first use.
+        capture_store: Back copy_capture with the content-addressed capture store under cache_dir.
+        capture_store_hardlinks: Let the capture store hardlink copies to its read-only objects (opt-in).
+        planner_cache_entries: Maximum planner results kept by the orchestrator's planner cache.
+        planner_cache_ttl: Seconds a cached planner result stays valid.
+        planner_cache_disk: Persist the planner cache under cache_dir.
     """
 
     openrouter_api_key: Optional[str] = os.environ.get("OPENROUTER_API_KEY")
@@ -23,6 +69,21 @@ class AgentConfig:
     model_explainer: str = os.environ.get("EXPLAINER_MODEL", "gpt-4o")
     renderdoc_python_path: Optional[str] = os.environ.get("RENDERDOC_PYTHON_PATH")
     default_capture: Optional[str] = os.environ.get("RENDERDOC_CAPTURE")
+    session_max_captures: int = _env_int("RENDERDOC_SESSION_MAX", 4)
+    session_max_bytes: int = _env_int("RENDERDOC_SESSION_MAX_BYTES", 4 * 1024 ** 3)
+    session_idle_timeout: float = _env_float("RENDERDOC_SESSION_IDLE_SECONDS", 300.0)
+    cache_dir: str = os.environ.get("RENDERDOC_AGENT_CACHE_DIR") or default_cache_dir()
+    result_cache_bytes: int = _env_int("RENDERDOC_RESULT_CACHE_BYTES", 64 * 1024 * 1024)
+    result_cache_disk: bool = _env_bool("RENDERDOC_RESULT_CACHE_DISK")
+    chain_workers: int = _env_int("RENDERDOC_CHAIN_WORKERS", min(4, os.cpu_count() or 1))
+    replay_workers: int = _env_int("RENDERDOC_REPLAY_WORKERS", 0)
+    replay_timeout: float = _env_float("RENDERDOC_REPLAY_TIMEOUT_SECONDS", 300.0)
+    renderdoc_prewarm: bool = _env_bool("RENDERDOC_PREWARM")
+    capture_store: bool = _env_bool("RENDERDOC_CAPTURE_STORE", True)
+    capture_store_hardlinks: bool = _env_bool("RENDERDOC_CAPTURE_STORE_HARDLINKS")
+    planner_cache_entries: int = _env_int("PLANNER_CACHE_ENTRIES", 4096)
+    planner_cache_ttl: float = _env_float("PLANNER_CACHE_TTL_SECONDS", 7 * 24 * 3600.0)
+    planner_cache_disk: bool = _env_bool("PLANNER_CACHE_DISK", True)
 
     @classmethod
     def from_env(cls) -> "AgentConfig":
@@ -39,4 +100,19 @@ class AgentConfig:
             model_explainer=self.model_explainer,
             renderdoc_python_path=path,
             default_capture=self.default_capture,
+            session_max_captures=self.session_max_captures,
+            session_max_bytes=self.session_max_bytes,
+            session_idle_timeout=self.session_idle_timeout,
+            cache_dir=self.cache_dir,
+            result_cache_bytes=self.result_cache_bytes,
+            result_cache_disk=self.result_cache_disk,
+            chain_workers=self.chain_workers,
+            replay_workers=self.replay_workers,
+            replay_timeout=self.replay_timeout,
+            renderdoc_prewarm=self.renderdoc_prewarm,
+            capture_store=self.capture_store,
+            capture_store_hardlinks=self.capture_store_hardlinks,
+            planner_cache_entries=self.planner_cache_entries,
+            planner_cache_ttl=self.planner_cache_ttl,
+            planner_cache_disk=self.planner_cache_disk,
         )
@@ -0,0 +1,206 @@
+"""Persistent, multiplexed WebSocket client for MCPServer.
+
+MCPClient keeps one connection open and pipelines requests on it: every
+call gets a unique ``id``, is sent immediately, and waits on a future that
+the connection's reader task resolves when the response with that ``id``
+arrives, so many calls can be in flight at once and may complete out of
+order. When the connection drops, calls fail over to a new connection
+(with exponential backoff) up to ``reconnect_attempts`` times. Calls to
+WRITE_TOOLS are only retried if their request never reached the socket:
+the server may already have run them, and running a copy or export twice
+is not safe. A call without a response within ``timeout`` raises
+MCPTimeoutError.
+
+SyncMCPClient runs an MCPClient on a private event loop thread for
+synchronous callers; it is safe to call from several threads at once.
+
+Responses are returned as the server's dicts (``{id, ok, result|error}``).
+Streamed requests are not supported: ``call`` resolves on the first
+response whose ``done`` is not ``false``.
+"""
+
+
+import asyncio
+import itertools
+import json
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import websockets
+except ImportError:  # pragma: no cover - optional dependency
+    websockets = None  # type: ignore
+
+# Tools with side effects (files written, captures copied); never re-sent once written.
+WRITE_TOOLS = frozenset({"save_texture", "export_textures", "export_mesh", "copy_capture"})
+
+
+class MCPConnectionError(ConnectionError):
+    """Raised when the MCP connection is lost and cannot be re-established."""
+
+
+class MCPTimeoutError(MCPConnectionError):
+    """Raised when a call gets no response within the client timeout."""
+
+
+class _Connection:
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.pending: Dict[str, "asyncio.Future"] = {}
+        self.closed = False
+        self.reader: Optional["asyncio.Future"] = None
+
+
+class MCPClient:
+    """Long-lived async client multiplexing tool calls over one WebSocket."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        reconnect_attempts: int = 3,
+        reconnect_delay: float = 0.25,
+        timeout: Optional[float] = None,
+    ):
+        if websockets is None:
+            raise RuntimeError("websockets package is required to talk to the MCP server.")
+        self.uri = f"ws://{host}:{port}"
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_delay = reconnect_delay
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._conn: Optional[_Connection] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self.connects = 0
+
+    async def __aenter__(self) -> "MCPClient":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def connect(self) -> None:
+        await self._connection()
+
+    async def call(self, tool: str, arguments: Optional[Dict[str, Any]] = None, **options: Any) -> Dict[str, Any]:
+        """Send one request and wait for its response.
+
+        ``options`` are extra request fields such as ``timings=True``.
+        """
+
+        request = dict(options, id=str(next(self._ids)), tool=tool, arguments=arguments or {})
+        payload = json.dumps(request, ensure_ascii=False)
+        attempt = 0
+        while True:
+            sent = False
+            try:
+                conn = await self._connection()
+                future = asyncio.get_event_loop().create_future()
+                conn.pending[request["id"]] = future
+                try:
+                    await conn.websocket.send(payload)
+                    sent = True
+                    return await asyncio.wait_for(future, self.timeout)
+                finally:
+                    conn.pending.pop(request["id"], None)
+            except asyncio.TimeoutError as exc:
+                # Checked first: on Python 3.11+ it is an OSError.
+                raise MCPTimeoutError(f"MCP call {tool} got no response within {self.timeout}s") from exc
+            except (MCPConnectionError, OSError, websockets.exceptions.ConnectionClosed) as exc:
+                if sent and tool in WRITE_TOOLS:
+                    raise MCPConnectionError(f"MCP call {tool} may have run; not retried after: {exc}") from exc
+                if attempt >= self.reconnect_attempts:
+                    raise MCPConnectionError(f"MCP call {tool} failed after {attempt + 1} attempt(s): {exc}") from exc
+                await asyncio.sleep(self.reconnect_delay * (2 ** attempt))
+                attempt += 1
+
+    async def call_many(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Issue several calls concurrently on the connection; results keep call order."""
+
+        return list(await asyncio.gather(*(self.call(tool, arguments) for tool, arguments in calls)))
+
+    async def close(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            await conn.websocket.close()
+            if conn.reader is not None:
+                await asyncio.gather(conn.reader, return_exceptions=True)
+
+    async def _connection(self) -> _Connection:
+        conn = self._conn
+        if conn is not None and not conn.closed:
+            return conn
+        if self._connect_lock is None:
+            # Created lazily so the lock binds to the loop the client runs on.
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            conn = self._conn
+            if conn is None or conn.closed:
+                websocket = await websockets.connect(self.uri, max_size=None)
+                conn = _Connection(websocket)
+                conn.reader = asyncio.ensure_future(self._read(conn))
+                self._conn = conn
+                self.connects += 1
+            return conn
+
+    async def _read(self, conn: _Connection) -> None:
+        error: Exception = MCPConnectionError("MCP connection closed")
+        try:
+            async for raw in conn.websocket:
+                message = json.loads(raw)
+                if message.get("done") is False:
+                    continue
+                future = conn.pending.get(message.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except Exception as exc:  # noqa: BLE001 - handed to the waiting calls
+            error = MCPConnectionError(f"MCP connection lost: {exc}")
+        finally:
+            conn.closed = True
+            for future in conn.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+
+
+class SyncMCPClient:
+    """Blocking facade over MCPClient running on a private event loop thread."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, **options: Any):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-client", daemon=True)
+        self._thread.start()
+        self._client = self._submit(self._create(host, port, options))
+
+    def __enter__(self) -> "SyncMCPClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @property
+    def connects(self) -> int:
+        return self._client.connects
+
+    def call(self, tool: str, arguments: Optional[Dict[str, Any]] = None, **options: Any) -> Dict[str, Any]:
+        return self._submit(self._client.call(tool, arguments, **options))
+
+    def call_many(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        return self._submit(self._client.call_many(calls))
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        try:
+            self._submit(self._client.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    @staticmethod
+    async def _create(host: str, port: int, options: Dict[str, Any]) -> MCPClient:
+        return MCPClient(host, port, **options)
+
+    def _submit(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
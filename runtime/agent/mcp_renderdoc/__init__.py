@@ -3,43 +3,35 @@
 This package describes RenderDoc tools in an MCP-friendly format and
 connects them to the existing RenderdocTools implementation under
 runtime.agent.tools.renderdoc_tools.
+
+``TOOLS`` is built on first access rather than at import time.
 """
 
 
+import sys
 from typing import Any, Dict, List
 
 from ..tools.renderdoc_tools import RenderdocTools
 
 
-def _base_schema() -> Dict[str, Any]:
-    """Return the JSON schema-style description of available tools.
+def tool_descriptors() -> List[Dict[str, Any]]:
+    """Return a list of MCP tool descriptors for registration.
 
-    This is initially derived from RenderdocTools.export_schema(), and can
-    be extended as new capabilities (geometry analysis, NaN/Inf analysis,
-    pipeline inspection, etc.) are added.
+    Descriptors are derived from RenderdocTools.export_schema() once per
+    process; RenderdocTools.tool_schema() also carries their etag.
     """
 
-    tools = RenderdocTools()
-    return tools.export_schema()
-
-
-def tool_descriptors() -> List[Dict[str, Any]]:
-    """Return a list of MCP tool descriptors for registration."""
+    return list(RenderdocTools.tool_schema().descriptors)
 
-    schema = _base_schema()
 
-    descriptors: List[Dict[str, Any]] = []
-    for name, spec in schema.items():
-        descriptors.append(
-            {
-                "name": f"renderdoc.{name}",
-                "description": spec.get("description", ""),
-                "parameters": spec.get("parameters", {"type": "object", "properties": {}}),
-            }
-        )
-    return descriptors
+def __getattr__(name):
+    # Convenience constant for simple integration in orchestrators.
+    if name == "TOOLS":
+        value = globals()["TOOLS"] = tool_descriptors()
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-# Convenience constant for simple integration in orchestrators.
-TOOLS: List[Dict[str, Any]] = tool_descriptors()
+if sys.version_info < (3, 7):  # no module __getattr__ (PEP 562)
+    TOOLS: List[Dict[str, Any]] = tool_descriptors()
 
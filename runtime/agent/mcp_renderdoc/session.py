@@ -1,63 +1,263 @@
 """Session management for RenderDoc MCP tools.
 
-RenderDocSessionManager is responsible for mapping logical capture IDs
-to underlying ReplayController instances when long-lived sessions are
-needed. For now this is a lightweight skeleton; tools that operate on
-file paths directly can continue to use RenderdocTools.
+RenderDocSessionManager keeps a pool of warm ReplayController instances so
+that repeated tool calls against the same capture skip the
+OpenFile/OpenCapture/Shutdown round trip. Sessions are keyed by the
+capture path plus the file's mtime and size, so a capture that is
+overwritten on disk is transparently reopened.
+
+The pool is bounded by a session count and an approximate memory budget
+(the capture file size is used as the replay footprint estimate). Least
+recently used sessions are evicted first, and sessions idle for longer
+than ``idle_timeout`` seconds are closed on the next pool access.
 """
 
 
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Dict, Optional
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..renderdoc_adapter import RenderdocModule
+from ..tools.renderdoc_tools import RenderdocCapture
+
+SessionKey = Tuple[str, int, int]
 
-import renderdoc  # type: ignore[import-not-found]
+
+def capture_key(file_path: str) -> SessionKey:
+    """Return the pool key (normalized path, mtime_ns, size) for a capture."""
+
+    path = os.path.normcase(os.path.abspath(file_path))
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
 
 
 @dataclass
 class RenderDocSession:
+    key: SessionKey
     capture_path: str
-    controller: renderdoc.ReplayController
+    capture: RenderdocCapture
+    size_bytes: int
+    last_used: float
+    users: int = 0
+    retired: bool = False
+    closed: bool = False
+    lock: Any = field(default_factory=threading.RLock)
+    # Derived per-controller data (counter descriptions, ...) dropped with the session.
+    cache: Dict[str, Any] = field(default_factory=dict)
+    # Event the controller was last moved to with SetFrameEvent (None: unknown, next seek is forced).
+    current_event: Optional[int] = None
+    seeks: int = 0
+    seeks_skipped: int = 0
+
+    @property
+    def controller(self):
+        return self.capture.controller
 
 
 @dataclass
 class RenderDocSessionManager:
-    sessions: Dict[str, RenderDocSession] = field(default_factory=dict)
+    """LRU pool of warm replay controllers.
+
+    Attributes:
+        max_sessions: Maximum number of controllers kept open at once.
+        max_bytes: Approximate memory budget across all open sessions.
+        idle_timeout: Seconds after which an unused session is closed.
+    """
+
+    max_sessions: int = 4
+    max_bytes: int = 4 * 1024 ** 3
+    idle_timeout: float = 300.0
+    sessions: "OrderedDict[SessionKey, RenderDocSession]" = field(default_factory=OrderedDict)
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+        self._opening: Dict[SessionKey, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_config(cls, config) -> "RenderDocSessionManager":
+        """Build a pool using the session limits from an AgentConfig."""
+
+        return cls(
+            max_sessions=config.session_max_captures,
+            max_bytes=config.session_max_bytes,
+            idle_timeout=config.session_idle_timeout,
+        )
 
-    def open_capture(self, capture_id: str, file_path: str) -> None:
-        """Open a capture and associate it with a logical capture_id."""
+    @contextmanager
+    def acquire(self, rd: RenderdocModule, capture_path: str) -> Iterator[RenderDocSession]:
+        """Yield a warm session for a capture, opening it on a pool miss.
 
-        if capture_id in self.sessions:
-            raise ValueError(f"Capture id already exists: {capture_id}")
+        The session lock is held for the duration of the block because
+        ReplayController instances are not thread-safe.
+        """
 
-        cap = renderdoc.OpenCaptureFile()
-        result = cap.OpenFile(file_path, "", None)
-        if result != renderdoc.ResultCode.Succeeded:
-            cap.Shutdown()
-            raise RuntimeError(f"Couldn't open file '{file_path}': {result}")
+        session = self._checkout(rd, capture_path)
+        try:
+            with session.lock:
+                yield session
+        finally:
+            self._checkin(session)
 
-        if not cap.LocalReplaySupport():
-            cap.Shutdown()
-            raise RuntimeError("Capture cannot be replayed on this machine")
+    def close_capture(self, capture_path: str) -> None:
+        """Close every pooled session opened for a capture path."""
 
-        result, controller = cap.OpenCapture(renderdoc.ReplayOptions(), None)
-        cap.Shutdown()
+        path = os.path.normcase(os.path.abspath(capture_path))
+        with self._lock:
+            victims = [s for key, s in list(self.sessions.items()) if key[0] == path]
+            for session in victims:
+                self._retire_locked(session)
+        self._shutdown(victims)
 
-        if result != renderdoc.ResultCode.Succeeded:
-            raise RuntimeError(f"Couldn't initialise replay: {result}")
+    def close_all(self) -> None:
+        """Close every pooled session."""
 
-        self.sessions[capture_id] = RenderDocSession(capture_path=file_path, controller=controller)
+        with self._lock:
+            victims = list(self.sessions.values())
+            for session in victims:
+                self._retire_locked(session)
+        self._shutdown(victims)
 
-    def close_capture(self, capture_id: str) -> None:
-        """Shutdown and remove a previously opened capture session."""
+    def evict_idle(self) -> int:
+        """Close sessions idle for longer than idle_timeout; return the count."""
 
-        session = self.sessions.pop(capture_id, None)
+        with self._lock:
+            victims = self._expire_idle_locked(time.monotonic())
+        self._shutdown(victims)
+        return len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool counters and the current occupancy."""
+
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "openSessions": len(self.sessions),
+                "openBytes": sum(s.size_bytes for s in self.sessions.values()),
+                "captures": [s.capture_path for s in self.sessions.values()],
+            }
+
+    def _checkout(self, rd: RenderdocModule, capture_path: str) -> RenderDocSession:
+        key = capture_key(capture_path)
+        with self._lock:
+            victims = self._expire_idle_locked(time.monotonic())
+            session = self._lookup_locked(key)
+            if session is None:
+                key_lock = self._opening.setdefault(key, threading.Lock())
+        self._shutdown(victims)
+        if session is not None:
+            return session
+
+        with key_lock:
+            with self._lock:
+                session = self._lookup_locked(key)
+                if session is not None:
+                    return session
+                self.misses += 1
+            try:
+                capture = RenderdocCapture(rd, Path(capture_path)).open()
+            finally:
+                with self._lock:
+                    self._opening.pop(key, None)
+
+            session = RenderDocSession(
+                key=key,
+                capture_path=str(capture_path),
+                capture=capture,
+                size_bytes=key[2],
+                last_used=time.monotonic(),
+                users=1,
+            )
+            with self._lock:
+                victims = self._invalidate_stale_locked(key)
+                self.sessions[key] = session
+                victims.extend(self._enforce_budget_locked())
+        self._shutdown(victims)
+        return session
+
+    def _checkin(self, session: RenderDocSession) -> None:
+        with self._lock:
+            session.users -= 1
+            session.last_used = time.monotonic()
+            close_now = session.retired and session.users == 0 and not session.closed
+            if close_now:
+                session.closed = True
+        if close_now:
+            self._close(session)
+
+    def _lookup_locked(self, key: SessionKey) -> Optional[RenderDocSession]:
+        session = self.sessions.get(key)
         if session is None:
-            return
-        session.controller.Shutdown()
+            return None
+        self.sessions.move_to_end(key)
+        session.users += 1
+        self.hits += 1
+        return session
+
+    def _invalidate_stale_locked(self, key: SessionKey) -> List[RenderDocSession]:
+        victims = []
+        for other_key, session in list(self.sessions.items()):
+            if other_key[0] == key[0] and other_key != key:
+                self.invalidations += 1
+                victims.append(session)
+                self._retire_locked(session)
+        return victims
+
+    def _expire_idle_locked(self, now: float) -> List[RenderDocSession]:
+        if self.idle_timeout <= 0:
+            return []
+        victims = []
+        for session in list(self.sessions.values()):
+            if session.users == 0 and now - session.last_used > self.idle_timeout:
+                self.expirations += 1
+                self._retire_locked(session)
+                victims.append(session)
+        return victims
+
+    def _enforce_budget_locked(self) -> List[RenderDocSession]:
+        victims = []
+        total = sum(s.size_bytes for s in self.sessions.values())
+        for session in list(self.sessions.values()):
+            if len(self.sessions) <= self.max_sessions and total <= self.max_bytes:
+                break
+            if session.users > 0:
+                continue
+            self.evictions += 1
+            total -= session.size_bytes
+            self._retire_locked(session)
+            victims.append(session)
+        return victims
 
-    def get_controller(self, capture_id: str) -> Optional[renderdoc.ReplayController]:
-        """Return the ReplayController for a capture id, if it exists."""
+    def _retire_locked(self, session: RenderDocSession) -> None:
+        if self.sessions.get(session.key) is session:
+            del self.sessions[session.key]
+        session.retired = True
 
-        session = self.sessions.get(capture_id)
-        return session.controller if session is not None else None
+    def _shutdown(self, sessions: List[RenderDocSession]) -> None:
+        for session in sessions:
+            with self._lock:
+                if session.users > 0 or session.closed:
+                    # Sessions still in use are closed by _checkin on release.
+                    continue
+                session.closed = True
+            self._close(session)
 
+    @staticmethod
+    def _close(session: RenderDocSession) -> None:
+        try:
+            session.capture.close()
+        except Exception:
+            pass
@@ -1,17 +1,50 @@
-"""Lightweight Model Context Protocol (MCP) server for RenderDoc tools."""
+"""Lightweight Model Context Protocol (MCP) server for RenderDoc tools.
+
+Tool calls run on a worker thread pool so a slow replay never blocks the
+event loop. Requests on one connection are pipelined: each message is
+dispatched as soon as it arrives and its response is sent when ready, so
+responses may arrive out of order and must be matched by ``id``. Calls
+that target the same capture are serialized because replay controllers
+are not thread-safe.
+
+Requests with ``"stream": true`` receive their result as a series of
+responses carrying ``seq`` (0-based) and ``done: false`` with one chunk of
+at most ``chunk_size`` items each, followed by a final ``done: true``
+response whose result is ``{"count", "chunks"}``.
+
+Responses are compact JSON text frames unless the client switches the
+connection to msgpack/CBOR binary frames with the ``mcp.negotiate`` tool
+(see runtime.agent.wire).
+
+The built-in ``mcp.schema`` tool returns the tool schema, MCP descriptors
+and compact prompt rendering with a content-hash ``etag``; a client that
+passes its cached etag as ``if_none_match`` gets ``notModified: true`` and
+no body.
+
+Every tool call is timed per phase (see runtime.agent.metrics). Requests
+with ``"timings": true`` (or all requests when ``MCP_TIMINGS=1``) get the
+phase breakdown back in the response's ``timings`` field, including the
+time spent encoding the response (such responses are encoded twice).
+"""
 
 
 import asyncio
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 try:
     import websockets
 except ImportError:  # pragma: no cover - optional dependency
     websockets = None  # type: ignore
 
-from .tools.renderdoc_tools import RenderdocTools, serialize_result
+from . import metrics, wire
+from .scheduler import capture_lock_key
+from .tools.renderdoc_tools import RenderdocTools
+from .tools.schema import ToolSchema
 
 
 @dataclass
@@ -19,6 +52,9 @@ class MCPRequest:
     id: str
     tool: str
     arguments: Dict[str, Any]
+    stream: bool = False
+    chunk_size: int = 1000
+    timings: bool = False
 
 
 @dataclass
@@ -27,32 +63,226 @@ class MCPResponse:
     ok: bool
     result: Any = None
     error: Optional[str] = None
+    seq: Optional[int] = None
+    done: Optional[bool] = None
+    timings: Optional[Dict[str, Any]] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = dict(self.__dict__)
+        # Streaming fields and timings are only present when set.
+        for key in ("seq", "done", "timings"):
+            if data[key] is None:
+                del data[key]
+        return data
+
+
+class MCPConnection:
+    """Per-connection state: the socket, its send lock and negotiated codec."""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.send_lock = asyncio.Lock()
+        self.codec = wire.DEFAULT_CODEC
+
+    def decode(self, raw: Any) -> Any:
+        if isinstance(raw, (bytes, bytearray)) and self.codec.binary:
+            return self.codec.loads(raw)
+        return json.loads(raw)
 
 
 class MCPServer:
     """Minimal WebSocket server so an LLM orchestrator can call local tools."""
 
-    def __init__(self, tools: RenderdocTools, host: str = "127.0.0.1", port: int = 8765):
+    def __init__(
+        self,
+        tools: RenderdocTools,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        max_workers: Optional[int] = None,
+        max_inflight: int = 32,
+        timings: Optional[bool] = None,
+    ):
         if websockets is None:
             raise RuntimeError("websockets package is required to run MCPServer")
         self.tools = tools
         self.host = host
         self.port = port
+        self.max_inflight = max_inflight
+        if timings is None:
+            timings = os.environ.get("MCP_TIMINGS", "").strip().lower() in ("1", "true", "yes", "on")
+        self.timings = timings
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or min(32, (os.cpu_count() or 1) + 4))
+        # capture key -> [lock, calls holding or waiting for it]; dropped when unused.
+        self._capture_locks: Dict[str, List[Any]] = {}
+        self._schema: Optional[ToolSchema] = None
 
     async def _handle(self, websocket, path=None):
-        async for raw in websocket:
-            try:
-                msg = json.loads(raw)
-                req = MCPRequest(**msg)
-                result = self.tools.dispatch(req.tool, req.arguments)
+        conn = MCPConnection(websocket)
+        slots = asyncio.Semaphore(self.max_inflight)
+        pending = set()
+        try:
+            async for raw in websocket:
+                # Bound in-flight requests per connection; reading pauses when full.
+                await slots.acquire()
+                task = asyncio.ensure_future(self._process(conn, raw, time.perf_counter()))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                task.add_done_callback(lambda _task: slots.release())
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _process(self, conn: "MCPConnection", raw, received: float) -> None:
+        request_id = "unknown"
+        tool = ""
+        try:
+            msg = conn.decode(raw)
+            if isinstance(msg, dict):
+                request_id = msg.get("id", request_id)
+            req = MCPRequest(**msg)
+            tool = req.tool
+            if req.tool == "mcp.negotiate":
+                await self._negotiate(conn, req)
+                return
+            if req.tool == "mcp.schema":
+                result = self.tool_schema().response(req.arguments.get("if_none_match"))
                 response = MCPResponse(id=req.id, ok=True, result=result)
-            except Exception as exc:  # noqa: BLE001 - surface errors to orchestrator
-                response = MCPResponse(id=req.id if "req" in locals() else "unknown", ok=False, error=str(exc))
-            await websocket.send(json.dumps(response.__dict__, ensure_ascii=False))
+            elif req.stream:
+                response = await self._stream(conn, req)
+            else:
+                collector = metrics.Collector(req.tool)
+                try:
+                    result = await self._run_locked(
+                        req.arguments, self._call_tool, req.tool, req.arguments, received, len(raw), collector
+                    )
+                    response = MCPResponse(id=req.id, ok=True, result=result)
+                except Exception as exc:  # noqa: BLE001 - surface errors to orchestrator
+                    response = MCPResponse(id=req.id, ok=False, error=str(exc))
+                if req.timings or self.timings:
+                    response.timings = collector.timings()
+        except Exception as exc:  # noqa: BLE001 - surface errors to orchestrator
+            response = MCPResponse(id=request_id, ok=False, error=str(exc))
+        await self._send(conn, response, tool)
+
+    def _call_tool(
+        self,
+        tool: str,
+        arguments: Dict[str, Any],
+        received: float,
+        request_bytes: int,
+        collector: "metrics.Collector",
+    ) -> Any:
+        """Run one tool call on an executor thread with its phases collected."""
+
+        with metrics.collect(tool) as active:
+            # Queue wait covers the capture lock and a free executor thread.
+            metrics.record("queue_wait", time.perf_counter() - received)
+            metrics.record_bytes("request", request_bytes, tool)
+            try:
+                with metrics.measure_tool(active):
+                    return self.tools.dispatch(tool, arguments)
+            finally:
+                collector.phases.update(active.phases)
+                collector.sizes.update(active.sizes)
+
+    def _encode(self, codec: Any, response: MCPResponse, tool: str) -> Any:
+        timings, response.timings = response.timings, None
+        start = time.perf_counter()
+        payload = codec.dumps(response.to_dict())
+        elapsed = time.perf_counter() - start
+        metrics.record("serialize", elapsed, tool)
+        metrics.record_bytes("response", len(payload), tool)
+        if timings is not None:
+            # The timings travel inside the payload they measure, so encode it again with them.
+            response.timings = dict(timings, serializeMs=round(elapsed * 1000.0, 3), responseBytes=len(payload))
+            payload = codec.dumps(response.to_dict())
+        return payload
+
+    async def _send(self, conn: "MCPConnection", response: MCPResponse, tool: str = "") -> None:
+        loop = asyncio.get_event_loop()
+        codec = conn.codec
+        # Large results are encoded off the event loop like the tool call itself.
+        payload = await loop.run_in_executor(self._executor, self._encode, codec, response, tool)
+        async with conn.send_lock:
+            if conn.codec is not codec:
+                payload = conn.codec.dumps(response.to_dict())
+            await conn.websocket.send(payload)
+
+    def tool_schema(self) -> ToolSchema:
+        """Precomputed schema of the served tools (see runtime.agent.tools.schema)."""
+
+        if self._schema is None:
+            build = getattr(self.tools, "tool_schema", None)
+            self._schema = build() if build is not None else ToolSchema(self.tools.export_schema())
+        return self._schema
+
+    async def _negotiate(self, conn: "MCPConnection", req: MCPRequest) -> None:
+        """Switch the connection encoding; the reply still uses the old one."""
+
+        codec = wire.negotiate(req.arguments.get("encodings") or [])
+        response = MCPResponse(
+            id=req.id,
+            ok=True,
+            result={"encoding": codec.name, "binary": codec.binary, "available": wire.available_encodings()},
+        )
+        async with conn.send_lock:
+            await conn.websocket.send(conn.codec.dumps(response.to_dict()))
+            conn.codec = codec
+
+    async def _stream(self, conn: "MCPConnection", req: MCPRequest) -> MCPResponse:
+        # Only setup needs the capture lock; chunks are read from persistent indexes.
+        chunks = await self._run_locked(req.arguments, self.tools.stream, req.tool, req.arguments, req.chunk_size)
+        seq = 0
+        count = 0
+        fetch = None
+        try:
+            while True:
+                fetch = self._executor.submit(next, chunks, None)
+                chunk = await asyncio.wrap_future(fetch)
+                if chunk is None:
+                    break
+                await self._send(conn, MCPResponse(id=req.id, ok=True, result=chunk, seq=seq, done=False), req.tool)
+                seq += 1
+                count += len(chunk)
+        finally:
+            # A client that disconnects mid-stream must not leave the index cursor open.
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                if fetch is not None and not fetch.done():
+                    # Cancelled while a chunk was being read; close once the read ends.
+                    fetch.add_done_callback(lambda _fetch: close())
+                else:
+                    close()
+        return MCPResponse(id=req.id, ok=True, result={"count": count, "chunks": seq}, seq=seq, done=True)
+
+    async def _run_locked(self, arguments: Dict[str, Any], fn: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_event_loop()
+        key = capture_lock_key(arguments)
+        if key is None:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        entry = self._capture_locks.get(key)
+        if entry is None:
+            entry = self._capture_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                return await loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._capture_locks[key]
+
+    def listen(self):
+        """Return the websockets server context manager bound to host/port."""
+
+        return websockets.serve(self._handle, self.host, self.port)
 
     async def run(self):
-        async with websockets.serve(self._handle, self.host, self.port):
-            await asyncio.Future()
+        try:
+            async with self.listen():
+                await asyncio.Future()
+        finally:
+            self._executor.shutdown(wait=False)
 
 
 async def serve(tools: RenderdocTools, host: str = "127.0.0.1", port: int = 8765) -> None:
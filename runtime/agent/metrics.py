@@ -0,0 +1,232 @@
+"""Per-phase timing spans and Prometheus-format histograms.
+
+Tool calls are broken into phases:
+
+- ``open_file`` / ``open_capture``: CaptureFile.OpenFile / OpenCapture
+- ``set_frame_event``: ReplayController.SetFrameEvent
+- ``replay_call``: any other ReplayController call (PixelHistory, ...)
+- ``postprocess``: the rest of the tool call (Python-side processing)
+- ``tool``: the whole tool call
+- ``queue_wait``: from receiving a request to starting its tool call
+- ``serialize``: encoding a response
+
+While a collector is active on the current thread (see ``collect``) spans
+are summed there, so one request can report its own ``timings``, and the
+per-request totals are observed into the process-wide REGISTRY when it
+closes; replay controller calls are only timed inside a collector. Other
+spans are observed directly. Request/response sizes go to a separate bytes
+histogram. ``start_http_server`` exposes the registry
+on ``/metrics`` for Prometheus.
+"""
+
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+PHASE_SECONDS = "renderdoc_agent_phase_seconds"
+MESSAGE_BYTES = "renderdoc_agent_message_bytes"
+
+TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTE_BUCKETS = tuple(64 * 4 ** i for i in range(11))  # 64 B .. 64 MiB
+
+# Phases spent inside RenderDoc; ``postprocess`` is the tool time outside them.
+REPLAY_PHASES = ("open_file", "open_capture", "set_frame_event", "replay_call")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative histogram with one series per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # One count per bucket, then +Inf count and sum.
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted(self._series.items())
+            items = [(key, list(series)) for key, series in items]
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_labels(key, le=_format(bound))} {int(count)}")
+            lines.append(f'{self.name}_bucket{_labels(key, le="+Inf")} {int(series[-2])}')
+            lines.append(f"{self.name}_sum{_labels(key)} {series[-1]!r}")
+            lines.append(f"{self.name}_count{_labels(key)} {int(series[-2])}")
+        return lines
+
+
+def _format(bound: float) -> str:
+    return repr(float(bound))
+
+
+def _labels(key: LabelKey, **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    body = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.histograms = {
+            PHASE_SECONDS: Histogram(PHASE_SECONDS, "Time spent per tool call phase.", TIME_BUCKETS),
+            MESSAGE_BYTES: Histogram(MESSAGE_BYTES, "MCP request/response sizes.", BYTE_BUCKETS),
+        }
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        self.histograms[name].observe(value, **labels)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for histogram in self.histograms.values():
+            lines.extend(histogram.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Collector:
+    """Per-request accumulation of phase seconds."""
+
+    def __init__(self, tool: str = ""):
+        self.tool = tool
+        self.phases: Dict[str, float] = {}
+        self.sizes: Dict[str, int] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def timings(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            _camel(phase) + "Ms": round(seconds * 1000.0, 3) for phase, seconds in self.phases.items()
+        }
+        for direction, size in self.sizes.items():
+            data[direction + "Bytes"] = size
+        return data
+
+
+def _camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(part.title() for part in rest)
+
+
+_local = threading.local()
+
+
+def current() -> Optional[Collector]:
+    return getattr(_local, "collector", None)
+
+
+@contextmanager
+def collect(tool: str = "") -> Iterator[Collector]:
+    """Activate a collector for spans recorded on this thread."""
+
+    previous = current()
+    collector = Collector(tool)
+    _local.collector = collector
+    try:
+        yield collector
+    finally:
+        _local.collector = previous
+        for phase, seconds in collector.phases.items():
+            REGISTRY.observe(PHASE_SECONDS, seconds, phase=phase, tool=tool)
+
+
+def record(phase: str, seconds: float, tool: Optional[str] = None) -> None:
+    collector = current()
+    if collector is not None and tool is None:
+        collector.add(phase, seconds)
+        return
+    REGISTRY.observe(PHASE_SECONDS, seconds, phase=phase, tool=tool or "")
+
+
+def record_bytes(direction: str, size: int, tool: str = "") -> None:
+    REGISTRY.observe(MESSAGE_BYTES, size, direction=direction, tool=tool)
+    collector = current()
+    if collector is not None:
+        collector.sizes[direction] = size
+
+
+def replay_spans(phases: Dict[str, float]) -> None:
+    """Record phase totals measured in another process (replay workers)."""
+
+    for phase, seconds in phases.items():
+        record(phase, seconds)
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - start)
+
+
+@contextmanager
+def measure_tool(collector: Collector) -> Iterator[None]:
+    """Record the ``tool`` phase and derive ``postprocess`` for a tool call."""
+
+    start = time.perf_counter()
+    before = sum(collector.phases.get(phase, 0.0) for phase in REPLAY_PHASES)
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - start
+        inside = sum(collector.phases.get(phase, 0.0) for phase in REPLAY_PHASES) - before
+        record("postprocess", max(0.0, total - inside))
+        record("tool", total)
+
+
+def _metrics_handler(registry: MetricsRegistry):
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):  # noqa: N802 - http.server API
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):  # noqa: A002 - http.server API
+            pass
+
+    return MetricsHandler
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> Any:
+    """Serve REGISTRY on http://host:port/metrics from a daemon thread."""
+
+    # http.server is only imported when the endpoint is enabled.
+    from http.server import HTTPServer
+
+    server = HTTPServer((host, port), _metrics_handler(REGISTRY))
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    return server
@@ -3,39 +3,57 @@
 This script demonstrates an end-to-end loop:
 
 - Read a natural language question from the user
-- Use either OpenRouter (if configured) or simple heuristics to pick a
-  single MCP tool and its arguments
+- Pick a single MCP tool and its arguments: a regex fast path first, then
+  the planner cache, then OpenRouter (if configured); see runtime.agent.planner
 - Call the local MCP server over WebSocket
 - Print the tool result in a readable form
 
 It is intentionally small and synchronous for easier experimentation.
+``--batch FILE`` answers one question per line, planning on a thread pool
+and sending every tool call over a single multiplexed MCP connection
+(runtime.agent.mcp_client); OpenRouter requests share a keep-alive HTTP
+session.
 """
 
 
 import argparse
+import atexit
 import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
-import asyncio
-
-try:
-    import websockets  # type: ignore
-except ImportError:
-    websockets = None  # type: ignore
-
-try:
-    import requests  # type: ignore
-except ImportError:
-    requests = None  # type: ignore
-
+# websockets and requests are optional and imported on first use.
 from .config import AgentConfig
+from .planner import PlannerCache, fast_plan, plan_key
 from .runtime import RenderdocDebugAgent, ToolCall
 
 
 OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
 
 
+_session = None
+_session_lock = threading.Lock()
+_planner_cache: Optional[PlannerCache] = None
+
+
+def _openrouter_session(requests_module: Any, pool_size: int = 32) -> Any:
+    """Shared keep-alive session so repeated planner calls reuse TLS connections."""
+
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests_module.Session()
+            adapter = requests_module.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
 @dataclass
 class PlannedAction:
     name: str
@@ -47,10 +65,12 @@ def _call_openrouter(
     system_prompt: str,
     user_content: str,
 ) -> Optional[Dict[str, Any]]:
-    if requests is None:
-        return None
     if not config.openrouter_api_key:
         return None
+    try:
+        import requests  # type: ignore
+    except ImportError:
+        return None
 
     headers = {
         "Authorization": f"Bearer {config.openrouter_api_key}",
@@ -64,7 +84,7 @@ def _call_openrouter(
         ],
         "response_format": {"type": "json_object"},
     }
-    response = requests.post(OPENROUTER_API_URL, headers=headers, json=body, timeout=60)
+    response = _openrouter_session(requests).post(OPENROUTER_API_URL, headers=headers, json=body, timeout=60)
     response.raise_for_status()
     data = response.json()
     try:
@@ -74,80 +94,73 @@ def _call_openrouter(
         return None
 
 
-def _heuristic_plan(question: str, config: AgentConfig) -> PlannedAction:
-    capture_path = config.default_capture
-    if not capture_path:
-        raise RuntimeError("RENDERDOC_CAPTURE is not set and no capture path was provided.")
+def planner_cache(config: AgentConfig) -> PlannerCache:
+    """Process-wide planner cache, persisted under cache_dir unless disabled."""
 
-    text = question.lower()
-    if "action" in text or "drawcall" in text or "事件" in text:
-        return PlannedAction(
-            name="iterate_actions",
-            arguments={"capture_path": capture_path},
-        )
-    if "counter" in text or "性能" in text or "gpu" in text:
-        return PlannedAction(
-            name="enumerate_counters",
-            arguments={"capture_path": capture_path},
-        )
-    raise RuntimeError(
-        "Could not infer a tool from the question. "
-        "Try mentioning 'actions' or 'counters', or configure OpenRouter for planning."
-    )
+    global _planner_cache
+    with _session_lock:
+        if _planner_cache is None:
+            path = os.path.join(config.cache_dir, "planner_cache.json") if config.planner_cache_disk else None
+            _planner_cache = PlannerCache(config.planner_cache_entries, config.planner_cache_ttl, path)
+            # put() batches saves; write the last ones when the process exits.
+            atexit.register(_planner_cache.flush)
+        return _planner_cache
 
 
-def plan_single_tool(question: str, agent: RenderdocDebugAgent) -> PlannedAction:
+def plan_single_tool(
+    question: str, agent: RenderdocDebugAgent, cache: Optional[PlannerCache] = None
+) -> PlannedAction:
     config = agent.config
+    cache = cache if cache is not None else planner_cache(config)
+
+    fast = fast_plan(question, config.default_capture)
+    if fast is not None:
+        cache.record_fast_path()
+        return PlannedAction(name=fast[0], arguments=fast[1])
 
-    schema = agent.tools.export_schema()
-    schema_text = json.dumps(schema, ensure_ascii=False, indent=2)
+    schema = agent.tools.tool_schema()
+    key = plan_key(question, config.default_capture, schema.etag, config.model_planner)
+    cached = cache.get(key)
+    if cached is not None:
+        return PlannedAction(name=cached[0], arguments=cached[1])
 
+    # Compact signatures (name?: optional, =default) cost far fewer tokens than the JSON schema.
     system_prompt = (
         "You are a RenderDoc planning model. "
         "Given a natural language question from a user and the available MCP tools, "
         "choose exactly one tool to call and provide concrete arguments. "
         "Always return a JSON object with fields 'name' (string) and 'arguments' (object). "
-        "Available tools and their JSON schemas:\n"
-        f"{schema_text}"
+        "Available tools (name(arg:type, optional?:type=default): description):\n"
+        f"{schema.prompt}"
     )
 
     nl_payload = f"User question: {question}"
+    if config.default_capture:
+        nl_payload += f"\nCapture path: {config.default_capture}"
+    started = time.perf_counter()
     result = _call_openrouter(config, system_prompt, nl_payload)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
 
     if result and isinstance(result, dict) and "name" in result and "arguments" in result:
+        cache.record_llm(elapsed_ms)
+        cache.put(key, (result["name"], result["arguments"]), elapsed_ms)
         return PlannedAction(name=result["name"], arguments=result["arguments"])
 
-    return _heuristic_plan(question, config)
+    if not config.default_capture:
+        raise RuntimeError("RENDERDOC_CAPTURE is not set and no capture path was provided.")
+    raise RuntimeError(
+        "Could not infer a tool from the question. "
+        "Try mentioning 'actions', 'counters', 'pipeline state at event N' or 'pixel history of texture T at (x, y)', "
+        "or configure OpenRouter for planning."
+    )
 
 
-async def _call_mcp_tool(
-    host: str,
-    port: int,
-    tool: str,
-    arguments: Dict[str, Any],
-) -> Dict[str, Any]:
-    if websockets is None:
-        raise RuntimeError("websockets package is required to talk to the MCP server.")
-
-    uri = f"ws://{host}:{port}"
-    async with websockets.connect(uri) as ws:
-        req = {"id": "1", "tool": tool, "arguments": arguments}
-        await ws.send(json.dumps(req, ensure_ascii=False))
-        raw = await ws.recv()
-        data = json.loads(raw)
-        return data
-
-
-def _run_async(coro):
-    if hasattr(asyncio, "run"):
-        return asyncio.run(coro)
-    loop = asyncio.new_event_loop()
-    try:
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
-    finally:
-        loop.close()
-        asyncio.set_event_loop(None)
+def _config_for(capture_path: Optional[str]) -> AgentConfig:
+    config = AgentConfig.from_env()
+    if capture_path:
+        config = config.with_renderdoc_path(config.renderdoc_python_path)  # type: ignore[assignment]
+        config.default_capture = capture_path  # type: ignore[assignment]
+    return config
 
 
 def run_once(
@@ -156,31 +169,65 @@ def run_once(
     host: str,
     port: int,
 ) -> None:
-    config = AgentConfig.from_env()
-    if capture_path:
-        config = config.with_renderdoc_path(config.renderdoc_python_path)  # type: ignore[assignment]
-        config.default_capture = capture_path  # type: ignore[assignment]
+    from .mcp_client import SyncMCPClient
 
-    agent = RenderdocDebugAgent(config)
+    agent = RenderdocDebugAgent(_config_for(capture_path))
     action = plan_single_tool(question, agent)
 
     print("Planned tool call:")
     print(json.dumps({"tool": action.name, "arguments": action.arguments}, ensure_ascii=False, indent=2))
 
-    response = _run_async(_call_mcp_tool(host, port, action.name, action.arguments))
+    with SyncMCPClient(host, port) as client:
+        response = client.call(action.name, action.arguments)
 
     print("\nMCP response:")
     print(json.dumps(response, ensure_ascii=False, indent=2))
 
 
+def run_batch(
+    questions: List[str],
+    capture_path: Optional[str],
+    host: str,
+    port: int,
+    concurrency: int = 8,
+) -> None:
+    """Answer many questions, printing one JSON line per question in input order."""
+
+    from .mcp_client import SyncMCPClient
+
+    agent = RenderdocDebugAgent(_config_for(capture_path))
+
+    def answer(question: str) -> Dict[str, Any]:
+        try:
+            action = plan_single_tool(question, agent)
+            response = client.call(action.name, action.arguments)
+            return {"question": question, "tool": action.name, "arguments": action.arguments, "response": response}
+        except Exception as exc:  # noqa: BLE001 - reported per question
+            return {"question": question, "error": str(exc)}
+
+    with SyncMCPClient(host, port) as client, ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for record in pool.map(answer, questions):
+            print(json.dumps(record, ensure_ascii=False))
+    planner_cache(agent.config).flush()
+    print(json.dumps({"plannerStats": planner_cache(agent.config).stats()}), file=sys.stderr)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description="Minimal NL-to-RenderDoc-tool orchestrator.")
     parser.add_argument("question", nargs="*", help="Natural language question for the agent.")
     parser.add_argument("--capture", help="Path to a .rdc capture. Falls back to RENDERDOC_CAPTURE.")
     parser.add_argument("--host", default="127.0.0.1", help="MCP server host (default: 127.0.0.1).")
     parser.add_argument("--port", type=int, default=8765, help="MCP server port (default: 8765).")
+    parser.add_argument("--batch", help="File with one question per line; prints one JSON result per line.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Questions in flight in --batch mode.")
     args = parser.parse_args()
 
+    if args.batch:
+        with open(args.batch, "r", encoding="utf-8") as handle:
+            questions = [line.strip() for line in handle if line.strip()]
+        run_batch(questions, args.capture, args.host, args.port, args.concurrency)
+        return
+
     if args.question:
         question = " ".join(args.question)
     else:
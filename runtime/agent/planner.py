@@ -0,0 +1,342 @@
+"""Planner fast path and result cache for the NL orchestrator.
+
+Questions are answered without an LLM call when possible:
+
+1. ``fast_plan`` matches the question against FAST_PATHS, a table of
+   regular expressions (English and Chinese) grouped into families that
+   pick a tool and extract its arguments (texture ids, pixel coordinates,
+   event ids and ranges). English keywords only match whole words. The fast
+   path is taken only when exactly one family matches and its required
+   arguments are present; anything ambiguous goes to the LLM.
+2. PlannerCache memoizes LLM plans keyed by the normalized question, the
+   capture, the tool schema etag and the planner model. Entries expire
+   after ``ttl`` seconds, the cache keeps at most ``max_entries`` (LRU)
+   and it is persisted as one JSON file so batch runs share it. Saves are
+   batched: ``put`` writes at most once per ``save_interval`` seconds, the
+   file is written outside the cache lock, and ``flush`` writes whatever is
+   still pending.
+
+``PlannerCache.stats()`` reports the fast-path/cache hit rate and the LLM
+latency they saved (the recorded latency of each cached plan, and the
+mean observed LLM latency for each fast-path hit).
+"""
+
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple
+
+CACHE_VERSION = "1"
+
+_FILLER = frozenset({"please", "can", "could", "you", "show", "me", "the", "a", "an", "all", "of", "in", "this"})
+_PUNCTUATION = re.compile(r"[^\w\s]+", re.UNICODE)
+
+Plan = Tuple[str, Dict[str, Any]]
+
+
+def normalize_question(question: str) -> str:
+    """Case-fold, strip punctuation and filler words so near-identical questions share a key."""
+
+    text = unicodedata.normalize("NFKC", question).casefold()
+    words = _PUNCTUATION.sub(" ", text).split()
+    return " ".join(word for word in words if word not in _FILLER)
+
+
+def plan_key(question: str, capture_path: Optional[str], schema_etag: str, model: str) -> str:
+    capture = os.path.normcase(os.path.abspath(capture_path)) if capture_path else ""
+    canonical = json.dumps(
+        {
+            "v": CACHE_VERSION,
+            "q": normalize_question(question),
+            "capture": capture,
+            "schema": schema_etag,
+            "model": model,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+# --- fast path -------------------------------------------------------------
+
+# English keywords must start a word; a number may follow directly ("rt5", "eid40").
+_TEXTURE = re.compile(
+    r"(?:\b(?:textures?|tex|resources?|rts?|render\s*targets?)(?![a-z])|纹理|贴图|资源)"
+    r"\s*(?:id(?![a-z]))?\s*[#:=]?\s*(\d+)"
+)
+_PIXEL = re.compile(r"\(?\s*(\d+)\s*[,，]\s*(\d+)\s*\)?")
+_EVENT = re.compile(
+    r"(?:\b(?:events?|eids?|draw\s*calls?|draws?)(?![a-z])|事件)\s*(?:id(?![a-z]))?\s*[#:=]?\s*(\d+)"
+)
+_RANGE = re.compile(
+    r"\bbetween\s+(?:events?\s+|eids?\s+)?(\d+)\s+and\s+(?:events?\s+|eids?\s+)?(\d+)"
+    r"|(\d+)\s*(?:-|~|\bto\b|\bthrough\b|到|至)\s*(\d+)"
+)
+
+
+def _texture(text: str) -> Optional[Dict[str, Any]]:
+    match = _TEXTURE.search(text)
+    return {"texture_id": int(match.group(1))} if match else None
+
+
+def _texture_pixel(text: str) -> Optional[Dict[str, Any]]:
+    texture = _texture(text)
+    if texture is None:
+        return None
+    # Coordinates are searched outside the texture id so "texture 5 (10, 20)" reads x=10.
+    rest = _TEXTURE.sub(" ", text)
+    match = _PIXEL.search(rest)
+    if match is None:
+        return None
+    return dict(texture, x=int(match.group(1)), y=int(match.group(2)))
+
+
+def _event(text: str) -> Optional[Dict[str, Any]]:
+    match = _EVENT.search(text)
+    return {"event_id": int(match.group(1))} if match else None
+
+
+def _event_range(text: str) -> Dict[str, Any]:
+    match = _RANGE.search(text)
+    if match is None:
+        return {}
+    bounds = [int(value) for value in match.groups() if value is not None]
+    low, high = sorted(bounds)
+    return {"event_min": low, "event_max": high}
+
+
+def _none(text: str) -> Dict[str, Any]:
+    return {}
+
+
+_NAN_INF = r"(?:\bnan\b|\binf\b|\binfinity\b|非数|无穷)"
+
+# (family, pattern, tool, argument extractor). Within a family the first
+# matching pattern picks the tool; a question matching patterns of two
+# families is ambiguous and goes to the LLM, as does one whose extractor
+# returns None (required arguments missing).
+FAST_PATHS: List[Tuple[str, Pattern, str, Callable[[str], Optional[Dict[str, Any]]]]] = [
+    (
+        "nan",
+        re.compile(_NAN_INF + r".*\d+\s*,\s*\d+|\d+\s*,\s*\d+.*" + _NAN_INF),
+        "analyze_nan_inf",
+        _texture_pixel,
+    ),
+    ("nan", re.compile(_NAN_INF), "scan_texture_nan_inf", _texture),
+    ("pixel", re.compile(r"\bpixel\s*history\b|\bhistory\s+of\s+pixel|像素历史"), "pixel_history", _texture_pixel),
+    (
+        "pipeline",
+        re.compile(r"\btimeline\b|\bstate\s+changes?\b|状态变化|时间线"),
+        "pipeline_timeline",
+        _event_range,
+    ),
+    (
+        "pipeline",
+        # "render target 5" names a texture, not the pipeline state.
+        re.compile(
+            r"\b(?:pipeline|framebuffer)\b|\brender\s*targets?\b(?!\s*(?:id(?![a-z]))?\s*[#:=]?\s*\d)|管线|帧缓冲"
+        ),
+        "get_pipeline_state",
+        _event,
+    ),
+    (
+        "geometry",
+        re.compile(r"\b(?:geometry|mesh|vertex|vertices|uvs?)\b|几何|顶点|网格"),
+        "geometry_anomalies",
+        _event,
+    ),
+    ("counters", re.compile(r"\bcounters?\b|\bgpu\s*(?:time|duration)\b|计数器"), "enumerate_counters", _none),
+    (
+        "actions",
+        re.compile(
+            r"\b(?:list|enumerate|dump)\b.*\b(?:actions?|drawcalls?|draw\s+calls?|events?)\b"
+            r"|\baction\s+(?:list|tree)\b|列出.*(?:事件|绘制|动作)|动作列表"
+        ),
+        "iterate_actions",
+        _event_range,
+    ),
+]
+
+
+def fast_plan(question: str, capture_path: Optional[str]) -> Optional[Plan]:
+    """Return (tool, arguments) from the pattern table, or None to fall back to the LLM."""
+
+    if not capture_path:
+        return None
+    text = unicodedata.normalize("NFKC", question).casefold()
+    matched: Dict[str, Tuple[str, Callable[[str], Optional[Dict[str, Any]]]]] = {}
+    for family, pattern, tool, extract in FAST_PATHS:
+        if family not in matched and pattern.search(text):
+            matched[family] = (tool, extract)
+    if len(matched) != 1:
+        return None
+    tool, extract = next(iter(matched.values()))
+    arguments = extract(text)
+    if arguments is None:
+        return None
+    return tool, dict(arguments, capture_path=capture_path)
+
+
+# --- cache -----------------------------------------------------------------
+
+
+class PlannerCache:
+    """TTL + LRU cache of planner results, optionally persisted to a JSON file."""
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        ttl: float = 7 * 24 * 3600.0,
+        path: Optional[str] = None,
+        save_interval: float = 5.0,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.save_interval = save_interval
+        # key -> {"plan": [tool, arguments], "created": epoch seconds, "llmMs": float}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Serializes file writes so an older snapshot never replaces a newer one.
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = 0.0
+        self.saves = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.fast_path_hits = 0
+        self.llm_calls = 0
+        self.llm_ms = 0.0
+        self.saved_ms = 0.0
+        if path:
+            self._load()
+
+    def get(self, key: str) -> Optional[Plan]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry["created"] > self.ttl:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.saved_ms += entry["llmMs"]
+            tool, arguments = entry["plan"]
+            return tool, json.loads(json.dumps(arguments))
+
+    def put(self, key: str, plan: Plan, llm_ms: float) -> None:
+        with self._lock:
+            self._entries[key] = {"plan": [plan[0], plan[1]], "created": time.time(), "llmMs": round(llm_ms, 3)}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = bool(self.path)
+            due = self._dirty and time.monotonic() - self._last_save >= self.save_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending entries to ``path`` now (no-op when nothing changed)."""
+
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                snapshot = dict(self._entries)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            self._save(snapshot)
+
+    def record_llm(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_ms += elapsed_ms
+
+    def record_fast_path(self) -> None:
+        with self._lock:
+            self.fast_path_hits += 1
+            if self.llm_calls:
+                self.saved_ms += self.llm_ms / self.llm_calls
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            answered = self.fast_path_hits + self.hits + self.misses
+            return {
+                "fastPathHits": self.fast_path_hits,
+                "hits": self.hits,
+                "misses": self.misses,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hitRate": round((self.fast_path_hits + self.hits) / answered, 4) if answered else 0.0,
+                "llmCalls": self.llm_calls,
+                "llmMs": round(self.llm_ms, 3),
+                "savedMs": round(self.saved_ms, 3),
+                "saves": self.saves,
+                "path": self.path,
+            }
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as handle:
+                data = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            return
+        entries = data.get("entries")
+        if not isinstance(entries, dict):
+            return
+        now = time.time()
+        # A hand-edited or foreign file must not stop the orchestrator from starting.
+        valid = [(key, entry) for key, entry in entries.items() if _valid_entry(entry)]
+        ordered = sorted(valid, key=lambda item: item[1]["created"])
+        for key, entry in ordered[-self.max_entries :]:
+            if now - entry["created"] <= self.ttl:
+                self._entries[key] = entry
+
+    def _save(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".planner-", suffix=".tmp")
+        except OSError:
+            # Persistence is best effort; the in-memory cache keeps working.
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, handle, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.saves += 1
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def _valid_entry(entry: Any) -> bool:
+    if not isinstance(entry, dict) or not isinstance(entry.get("created"), (int, float)):
+        return False
+    plan = entry.get("plan")
+    return (
+        isinstance(plan, list)
+        and len(plan) == 2
+        and isinstance(plan[0], str)
+        and isinstance(plan[1], dict)
+        and isinstance(entry.get("llmMs"), (int, float))
+    )
@@ -1,18 +1,23 @@
-"""High-level runtime that connects LLM planning to RenderDoc tool execution."""
+"""High-level runtime that connects LLM planning to RenderDoc tool execution.
+
+Startup stays cheap: the RenderDoc bindings load on the first tool call
+(or on a background thread with ``renderdoc_prewarm``), and the MCP server,
+replay workers and tool descriptors are imported only when used.
+"""
 
 
-import asyncio
 import json
 import os
 import sys
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Optional
 
 from .config import AgentConfig
-from .mcp_server import serve
-from .renderdoc_adapter import load_renderdoc
+from .scheduler import ChainScheduler
+from .tools.capture_store import CaptureStore
 from .tools.renderdoc_tools import RenderdocTools
-from .mcp_renderdoc import tool_descriptors
+from .tools.result_cache import ToolResultCache
+from .mcp_renderdoc.session import RenderDocSessionManager
 
 
 @dataclass
@@ -21,21 +26,68 @@ class ToolCall:
     arguments: Dict[str, Any]
 
 
+def _tool_options(config: AgentConfig) -> Dict[str, Any]:
+    return {
+        "renderdoc_path": config.renderdoc_python_path,
+        "sessions": RenderDocSessionManager.from_config(config),
+        "cache_dir": config.cache_dir,
+        "result_cache": ToolResultCache(
+            max_bytes=config.result_cache_bytes,
+            disk_dir=os.path.join(config.cache_dir, "results") if config.result_cache_disk else None,
+        ),
+        "capture_store": (
+            CaptureStore(os.path.join(config.cache_dir, "captures"), hardlinks=config.capture_store_hardlinks)
+            if config.capture_store
+            else None
+        ),
+    }
+
+
+def build_tools(config: AgentConfig) -> RenderdocTools:
+    """Build RenderdocTools for a config; used inside replay worker processes."""
+
+    return RenderdocTools(**_tool_options(config))
+
+
 class RenderdocDebugAgent:
     """Connects natural language plans from LLMs to deterministic RenderDoc tools."""
 
     def __init__(self, config: AgentConfig):
         self.config = config
-        self.rd = None
-        self.renderdoc_error = None
+        # RenderDoc loads on first use, so the MCP server starts even without bindings.
+        self.tools = build_tools(config)
+        if config.renderdoc_prewarm:
+            self.tools.prewarm(on_error=lambda exc: self._warn(f"RenderDoc bindings not found: {exc}"))
+        self._replay_pool: Any = None
+        self.scheduler = ChainScheduler(self.tools, self.replay_pool, config.chain_workers)
+
+    def replay_pool(self) -> Any:
+        """The ReplayWorkerPool shared by parallel chains and the MCP server, started on first use."""
+
+        if self._replay_pool is None:
+            from .worker_pool import ReplayWorkerPool
+
+            self._replay_pool = ReplayWorkerPool(
+                build_tools,
+                (self.config,),
+                workers=max(self.config.replay_workers, self.config.chain_workers, 1),
+                call_timeout=self.config.replay_timeout,
+                local_tools=self.tools,
+            )
+        return self._replay_pool
+
+    @property
+    def rd(self):
+        """The RenderDoc module wrapper (loaded on first access), or None if unavailable."""
+
         try:
-            self.rd = load_renderdoc(config.renderdoc_python_path)
-            self.tools = RenderdocTools(self.rd)
-        except ImportError as exc:
-            # Allow MCP server to start even if RenderDoc bindings are missing.
-            self.renderdoc_error = str(exc)
-            self.tools = RenderdocTools()
-            self._warn(f"RenderDoc bindings not found: {self.renderdoc_error}")
+            return self.tools.rd
+        except ImportError:
+            return None
+
+    @property
+    def renderdoc_error(self) -> Optional[str]:
+        return self.tools.renderdoc_error
 
     @staticmethod
     def _warn(message: str) -> None:
@@ -52,26 +104,57 @@ class RenderdocDebugAgent:
         fully-qualified tool names) from runtime.agent.mcp_renderdoc.
         """
 
+        from .mcp_renderdoc import tool_descriptors
+
         return {
             "schema": self.tools.export_schema(),
             "descriptors": tool_descriptors(),
         }
 
     def execute_chain(self, actions: List[ToolCall]) -> List[Dict[str, Any]]:
-        """Execute a chain of tool calls produced by a planner model."""
+        """Execute a chain of tool calls produced by a planner model.
+
+        Calls on the same capture share one replay controller and the ones
+        naming an eventId run in eventId order; groups for different
+        captures run in parallel on the replay worker pool. Results keep the chain order and carry ``elapsedMs``;
+        the error of the earliest failing call is re-raised.
+        """
 
-        results: List[Dict[str, Any]] = []
-        for action in actions:
-            result = self.tools.dispatch(action.name, action.arguments)
-            results.append({"tool": action.name, "result": result})
-        return results
+        return self.scheduler.run([(action.name, action.arguments) for action in actions])
+
+    def close(self) -> None:
+        """Stop replay worker processes and close pooled replay controllers."""
+
+        self.scheduler.close()
+        self._close_replay_pool()
+        self.tools.close()
+
+    def _close_replay_pool(self) -> None:
+        if self._replay_pool is not None:
+            self._replay_pool.close()
+            self._replay_pool = None
 
     async def run_mcp_server(self, host: str = "127.0.0.1", port: int = 8765) -> None:
-        """Expose the RenderDoc tools over MCP-compatible WebSocket calls."""
+        """Expose the RenderDoc tools over MCP-compatible WebSocket calls.
+
+        With ``replay_workers`` > 0 tool calls replay in isolated worker
+        processes, so a crashing or hanging capture cannot take the server
+        down.
+        """
 
-        await serve(self.tools, host=host, port=port)
+        from .mcp_server import serve
+
+        if self.config.replay_workers <= 0:
+            await serve(self.tools, host=host, port=port)
+            return
+        try:
+            await serve(self.replay_pool(), host=host, port=port)
+        finally:
+            self._close_replay_pool()
 
     def run_mcp_server_sync(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        import asyncio
+
         coro = self.run_mcp_server(host, port)
         if hasattr(asyncio, "run"):
             asyncio.run(coro)
@@ -0,0 +1,163 @@
+"""Capture-aware scheduling for planner tool chains.
+
+A chain is split into stages at calls that do not target a capture (for
+example ``copy_capture``, whose output a later call may open); those run
+alone, in order. Inside a stage, calls are grouped by capture so each
+group shares one replay controller. Calls that name an eventId are put
+in eventId order to keep replay seeking forward; calls without one keep
+their place in the chain. Groups for different captures run in parallel
+on a ReplayWorkerPool, whose capture affinity keeps each group on the
+worker that already has its capture open. Results are returned in the
+original chain order.
+"""
+
+
+import os
+import pickle
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Arguments that identify the capture a tool call replays.
+CAPTURE_ARGUMENTS = ("capture_path",)
+
+# Arguments used to order calls within a capture group.
+EVENT_ARGUMENTS = ("event_id", "event_min")
+
+# (chain index, tool name, arguments)
+IndexedCall = Tuple[int, str, Dict[str, Any]]
+
+# (chain index, result, error, elapsed milliseconds)
+CallOutcome = Tuple[int, Any, Optional[BaseException], float]
+
+
+def capture_lock_key(arguments: Dict[str, Any]) -> Optional[str]:
+    """Return the serialization key for a tool call, or None if it needs none."""
+
+    for name in CAPTURE_ARGUMENTS:
+        value = arguments.get(name) if isinstance(arguments, dict) else None
+        if isinstance(value, str) and value:
+            return os.path.normcase(os.path.abspath(value))
+    return None
+
+
+def event_order(arguments: Dict[str, Any]) -> Optional[int]:
+    """The eventId a call seeks to, or None if it does not name one."""
+
+    for name in EVENT_ARGUMENTS:
+        value = arguments.get(name)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def order_group(group: List[IndexedCall]) -> List[IndexedCall]:
+    """Sort the calls that name an eventId among their own slots; others keep their position."""
+
+    slots = [position for position, call in enumerate(group) if event_order(call[2]) is not None]
+    seeking = sorted((group[position] for position in slots), key=lambda call: event_order(call[2]))
+    ordered = list(group)
+    for position, call in zip(slots, seeking):
+        ordered[position] = call
+    return ordered
+
+
+def plan_stages(calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[List[List[IndexedCall]]]:
+    """Split a chain into stages, each a list of per-capture call groups."""
+
+    stages: List[List[List[IndexedCall]]] = []
+    groups: Dict[str, List[IndexedCall]] = {}
+    for index, (name, arguments) in enumerate(calls):
+        key = capture_lock_key(arguments)
+        if key is None:
+            if groups:
+                stages.append(list(groups.values()))
+                groups = {}
+            stages.append([[(index, name, arguments)]])
+            continue
+        groups.setdefault(key, []).append((index, name, arguments))
+    if groups:
+        stages.append(list(groups.values()))
+    return [[order_group(group) for group in stage] for stage in stages]
+
+
+def run_group(tools: Any, calls: Sequence[IndexedCall]) -> List[CallOutcome]:
+    """Run one capture group; stops at the first failing call."""
+
+    outcomes: List[CallOutcome] = []
+    for index, name, arguments in calls:
+        started = time.perf_counter()
+        try:
+            result = tools.dispatch(name, arguments)
+        except Exception as exc:  # noqa: BLE001 - re-raised by the scheduler in chain order
+            outcomes.append((index, None, exc, _elapsed_ms(started)))
+            break
+        outcomes.append((index, result, None, _elapsed_ms(started)))
+    return outcomes
+
+
+def picklable_exception(exc: Optional[BaseException]) -> Optional[BaseException]:
+    if exc is None:
+        return None
+    try:
+        pickle.dumps(exc)
+        return exc
+    except Exception:
+        return RuntimeError(f"{type(exc).__name__}: {exc}")
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 3)
+
+
+class ChainScheduler:
+    """Run tool chains with per-capture grouping and cross-capture parallelism.
+
+    ``tools`` serves single-group stages in-process (keeping its warm
+    sessions). Stages with several capture groups run one group per thread
+    against ``replay_pool()``, a callable returning the ReplayWorkerPool
+    shared with the MCP server; it is only called once a chain needs it.
+    ``max_workers=0`` or no ``replay_pool`` runs every group in-process.
+    """
+
+    def __init__(self, tools: Any, replay_pool: Optional[Callable[[], Any]] = None, max_workers: int = 0):
+        self.tools = tools
+        self.replay_pool = replay_pool
+        self.max_workers = max_workers
+        self._threads: Any = None
+
+    def run(self, calls: Sequence[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+        for stage in plan_stages(calls):
+            outcomes: List[CallOutcome] = []
+            if len(stage) > 1 and self.replay_pool is not None and self.max_workers > 0:
+                pool = self.replay_pool()
+                threads = self._thread_pool()
+                futures = [threads.submit(run_group, pool, group) for group in stage]
+                for future in futures:
+                    outcomes.extend(future.result())
+            else:
+                for group in stage:
+                    outcomes.extend(run_group(self.tools, group))
+                    if outcomes and outcomes[-1][2] is not None:
+                        break
+
+            failed = [outcome for outcome in outcomes if outcome[2] is not None]
+            if failed:
+                raise min(failed, key=lambda outcome: outcome[0])[2]
+            for index, result, _, elapsed in outcomes:
+                results[index] = {"tool": calls[index][0], "result": result, "elapsedMs": elapsed}
+        return results  # type: ignore[return-value]
+
+    def _thread_pool(self) -> Any:
+        if self._threads is None:
+            # Imported on first parallel run. Threads only wait on worker pipes;
+            # replay runs in the pool's processes.
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._threads
+
+    def close(self) -> None:
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+            self._threads = None
@@ -0,0 +1,73 @@
+"""CaptureStore copy semantics."""
+
+
+import errno
+import os
+import stat
+
+import pytest
+
+from runtime.agent.tools import capture_store
+from runtime.agent.tools.capture_store import CaptureStore
+
+
+def _source(tmp_path, data: bytes = b"capture" * 1000) -> str:
+    path = tmp_path / "src.rdc"
+    path.write_bytes(data)
+    return str(path)
+
+
+def _writable(path: str) -> bool:
+    return bool(os.stat(path).st_mode & stat.S_IWUSR)
+
+
+def test_copies_are_writable_and_independent(tmp_path):
+    store = CaptureStore(str(tmp_path / "store"))
+    source = _source(tmp_path)
+    first, second = str(tmp_path / "out" / "a.rdc"), str(tmp_path / "out" / "b.rdc")
+    assert store.copy(source, first)["method"] in ("reflink", "copy")
+    assert store.copy(source, second)["method"] in ("reflink", "copy")
+    assert _writable(first) and _writable(second)
+    assert not os.path.samefile(first, second)
+    with open(first, "r+b") as handle:
+        handle.write(b"edited")
+    with open(second, "rb") as handle:
+        assert handle.read(6) == b"captur"
+
+
+def test_unadoptable_first_copy_is_written_once(tmp_path, monkeypatch):
+    # No reflink support: the store must not ingest a second full copy.
+    monkeypatch.setattr(capture_store, "_reflink", lambda source, dest: False)
+    store = CaptureStore(str(tmp_path / "store"))
+    result = store.copy(_source(tmp_path), str(tmp_path / "a.rdc"))
+    assert result["method"] == "copy"
+    assert not os.path.exists(store.object_path(result["fingerprint"]))
+    assert store.stats()["objects"] == 0
+
+
+def test_same_content_is_left_untouched(tmp_path):
+    store = CaptureStore(str(tmp_path / "store"))
+    source, dest = _source(tmp_path), str(tmp_path / "a.rdc")
+    store.copy(source, dest)
+    mtime = os.stat(dest).st_mtime_ns
+    assert store.copy(source, dest)["method"] == "existing"
+    assert os.stat(dest).st_mtime_ns == mtime
+
+
+def test_hardlinks_are_opt_in(tmp_path):
+    store = CaptureStore(str(tmp_path / "store"), hardlinks=True)
+    source = _source(tmp_path)
+    store.copy(source, str(tmp_path / "a.rdc"))
+    result = store.copy(source, str(tmp_path / "b.rdc"))
+    assert result["method"] in ("reflink", "hardlink")
+    if result["method"] == "hardlink":
+        assert not _writable(str(tmp_path / "b.rdc"))
+
+
+def test_short_kernel_copy_raises(tmp_path, monkeypatch):
+    monkeypatch.setattr(capture_store.os, "copy_file_range", lambda *args: 0, raising=False)
+    source, dest = _source(tmp_path), str(tmp_path / "a.rdc")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        with pytest.raises(OSError) as info:
+            capture_store._kernel_copy(src.fileno(), dst.fileno(), os.path.getsize(source))
+    assert info.value.errno == errno.EIO
@@ -0,0 +1,39 @@
+"""enumerate_counters against the fake renderdoc backend."""
+
+
+import pytest
+
+from runtime.agent.benchmarks.fake_renderdoc import fake_renderdoc
+from runtime.agent.tools.renderdoc_tools import RenderdocTools
+
+
+@pytest.fixture
+def tools(tmp_path):
+    tools = RenderdocTools(fake_renderdoc(actions=20, counters=3), cache_dir=str(tmp_path / "cache"))
+    yield tools
+    tools.close()
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = tmp_path / "counters.rdc"
+    path.write_bytes(b"counters")
+    return str(path)
+
+
+def test_values_read_the_member_matching_result_type(tools, capture):
+    result = tools.enumerate_counters(capture)
+    first = result["eventIds"][0]
+    assert result["values"]["EventGPUDuration"][0] == pytest.approx(first * 10 + 1)
+    assert isinstance(result["values"]["EventGPUDuration"][0], float)
+    assert result["values"]["Counter2"][0] == first * 10 + 2
+    assert isinstance(result["values"]["Counter2"][0], int)
+
+
+def test_cached_results_are_independent_copies(tools, capture):
+    first = tools.dispatch("enumerate_counters", {"capture_path": capture})
+    first["values"]["EventGPUDuration"][0] = None
+    first["eventIds"].clear()
+    second = tools.dispatch("enumerate_counters", {"capture_path": capture})
+    assert second["eventIds"] and second["values"]["EventGPUDuration"][0] is not None
+    assert tools.result_cache.stats()["hits"] == 1
@@ -0,0 +1,32 @@
+"""capture_fingerprint memoization."""
+
+
+import os
+
+from runtime.agent.tools import fingerprint
+from runtime.agent.tools.fingerprint import capture_fingerprint
+
+
+def test_rewritten_capture_replaces_its_entry(tmp_path):
+    path = tmp_path / "frame.rdc"
+    path.write_bytes(b"first")
+    first = capture_fingerprint(str(path))
+    path.write_bytes(b"second!")
+    os.utime(str(path), ns=(1, 1))
+    second = capture_fingerprint(str(path))
+    assert first != second
+    key = os.path.normcase(os.path.abspath(str(path)))
+    assert list(fingerprint._memo).count(key) == 1
+    assert fingerprint._memo[key][2] == second
+
+
+def test_memo_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(fingerprint, "_MEMO_ENTRIES", 3)
+    monkeypatch.setattr(fingerprint, "_memo", fingerprint.OrderedDict())
+    paths = []
+    for index in range(5):
+        path = tmp_path / f"{index}.rdc"
+        path.write_bytes(str(index).encode("ascii"))
+        paths.append(str(path))
+        capture_fingerprint(paths[-1])
+    assert list(fingerprint._memo) == [os.path.normcase(os.path.abspath(p)) for p in paths[2:]]
@@ -0,0 +1,34 @@
+"""geometry_anomalies against the fake renderdoc backend."""
+
+
+import pytest
+
+from runtime.agent.benchmarks.fake_renderdoc import fake_renderdoc
+from runtime.agent.tools.renderdoc_tools import RenderdocTools
+
+
+@pytest.fixture
+def tools(tmp_path):
+    tools = RenderdocTools(fake_renderdoc(actions=10, vertices=300, nan_every=97), cache_dir=str(tmp_path / "cache"))
+    yield tools
+    tools.close()
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = tmp_path / "frame.rdc"
+    path.write_bytes(b"capture")
+    return str(path)
+
+
+def test_geometry_anomalies_reads_vsout(tools, capture):
+    result = tools.geometry_anomalies(capture, 2)
+    assert result["vertexCount"] == 300
+    # Vertices 0, 97, 194 and 291 have a NaN x.
+    assert result["invalidPositionCount"] == 4
+
+
+def test_fake_rejects_stage_first_argument_order(tools, capture):
+    with tools._session(capture) as cap:
+        with pytest.raises(TypeError):
+            cap.controller.GetPostVSData(tools.rd.module.MeshDataStage.VSOut, 0)
@@ -0,0 +1,59 @@
+"""MCPClient reconnect and timeout behaviour against a scripted WebSocket server."""
+
+
+import asyncio
+import json
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from runtime.agent.mcp_client import MCPClient, MCPConnectionError, MCPTimeoutError  # noqa: E402
+
+
+def _run(script, tool, received, **client_options):
+    """Serve ``script(message_number)`` -> "drop" | "reply" | "ignore" and make one call."""
+
+    async def handler(websocket, *_):
+        async for raw in websocket:
+            message = json.loads(raw)
+            received.append(message["tool"])
+            action = script(len(received))
+            if action == "drop":
+                await websocket.close()
+                return
+            if action == "reply":
+                await websocket.send(json.dumps({"id": message["id"], "ok": True, "result": len(received)}))
+
+    async def main():
+        server = await websockets.serve(handler, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = MCPClient(port=port, reconnect_delay=0.01, **client_options)
+        try:
+            return await client.call(tool, {"capture_path": "a.rdc"})
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_read_only_call_is_retried_after_a_drop():
+    received = []
+    response = _run(lambda n: "drop" if n == 1 else "reply", "get_pipeline_state", received)
+    assert response["result"] == 2
+    assert received == ["get_pipeline_state", "get_pipeline_state"]
+
+
+def test_sent_write_call_is_not_retried():
+    received = []
+    with pytest.raises(MCPConnectionError) as excinfo:
+        _run(lambda n: "drop" if n == 1 else "reply", "copy_capture", received)
+    assert not isinstance(excinfo.value, MCPTimeoutError)
+    assert received == ["copy_capture"]
+
+
+def test_timeout_raises_client_error():
+    with pytest.raises(MCPTimeoutError):
+        _run(lambda n: "ignore", "iterate_actions", [], timeout=0.2)
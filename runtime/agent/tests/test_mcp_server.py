@@ -0,0 +1,86 @@
+"""MCPServer streaming, timings and capture locks over a real WebSocket."""
+
+
+import asyncio
+import itertools
+import json
+import threading
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from runtime.agent.mcp_server import MCPServer  # noqa: E402
+
+
+class StubTools:
+    def __init__(self):
+        self.stream_closed = threading.Event()
+
+    def dispatch(self, tool, arguments):
+        return {"tool": tool, "items": list(range(100))}
+
+    def stream(self, tool, arguments, chunk_size):
+        def chunks():
+            try:
+                for start in itertools.count(0, chunk_size):
+                    yield list(range(start, start + chunk_size))
+            finally:
+                self.stream_closed.set()
+
+        return chunks()
+
+    def export_schema(self):
+        return {}
+
+
+def _serve(tools, client):
+    async def main():
+        server = MCPServer(tools, "127.0.0.1", 0, timings=False)
+        async with server.listen() as listening:
+            port = listening.sockets[0].getsockname()[1]
+            async with websockets.connect(f"ws://127.0.0.1:{port}") as websocket:
+                return await client(server, websocket)
+
+    return asyncio.run(main())
+
+
+def test_stream_generator_closed_when_client_disconnects():
+    tools = StubTools()
+
+    async def client(server, websocket):
+        request = {"id": "1", "tool": "iterate_actions", "arguments": {"capture_path": "a.rdc"}, "stream": True}
+        await websocket.send(json.dumps(request))
+        first = json.loads(await websocket.recv())
+        assert (first["seq"], first["done"]) == (0, False)
+
+    _serve(tools, client)
+    assert tools.stream_closed.wait(5.0)
+
+
+def test_timings_include_serialization():
+    async def client(server, websocket):
+        request = {"id": "1", "tool": "get_pipeline_state", "arguments": {"capture_path": "a.rdc"}, "timings": True}
+        await websocket.send(json.dumps(request))
+        return json.loads(await websocket.recv())
+
+    response = _serve(StubTools(), client)
+    assert response["ok"] and response["result"]["items"][-1] == 99
+    assert response["timings"]["serializeMs"] >= 0
+    assert 0 < response["timings"]["responseBytes"] < len(json.dumps(response))
+
+
+def test_capture_locks_are_released_after_use():
+    async def client(server, websocket):
+        requests = [
+            {"id": str(i), "tool": "get_pipeline_state", "arguments": {"capture_path": f"{i % 3}.rdc"}}
+            for i in range(12)
+        ]
+        for request in requests:
+            await websocket.send(json.dumps(request))
+        responses = [json.loads(await websocket.recv()) for _ in requests]
+        return responses, dict(server._capture_locks)
+
+    responses, locks = _serve(StubTools(), client)
+    assert all(response["ok"] for response in responses)
+    assert locks == {}
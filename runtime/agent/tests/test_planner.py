@@ -0,0 +1,87 @@
+"""Planner fast path routing."""
+
+
+import pytest
+
+from runtime.agent.planner import PlannerCache, fast_plan
+
+CAPTURE = "frame.rdc"
+
+
+def _plan(question):
+    plan = fast_plan(question, CAPTURE)
+    if plan is None:
+        return None
+    tool, arguments = plan
+    arguments.pop("capture_path")
+    return tool, arguments
+
+
+@pytest.mark.parametrize(
+    "question, expected",
+    [
+        ("Scan texture 5 for NaN", ("scan_texture_nan_inf", {"texture_id": 5})),
+        ("NaN at (10, 20) in texture 5?", ("analyze_nan_inf", {"texture_id": 5, "x": 10, "y": 20})),
+        ("pixel history of rt5 at 3,4", ("pixel_history", {"texture_id": 5, "x": 3, "y": 4})),
+        ("pipeline state at event 40", ("get_pipeline_state", {"event_id": 40})),
+        ("show the timeline between 10 and 90", ("pipeline_timeline", {"event_min": 10, "event_max": 90})),
+        ("state changes from event 90 to 10", ("pipeline_timeline", {"event_min": 10, "event_max": 90})),
+        ("any broken uvs in draw 12?", ("geometry_anomalies", {"event_id": 12})),
+        ("list all drawcalls", ("iterate_actions", {})),
+        ("纹理 7 有没有 NaN", ("scan_texture_nan_inf", {"texture_id": 7})),
+    ],
+)
+def test_fast_path_routes(question, expected):
+    assert _plan(question) == expected
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        # "ve-rt-ex 12" / "sta-rt 3" must not read as render target ids.
+        "Are there NaN positions in vertex 12 of draw 40?",
+        "start 3 and check for nan in the output",
+        # Mentions draws but asks something no single pattern answers.
+        "Which drawcall writes texture 5 at (10, 20)?",
+        # Two families: pipeline state and geometry.
+        "pipeline state and mesh of draw 3",
+        # Required texture id missing.
+        "scan for nan",
+    ],
+)
+def test_ambiguous_or_incomplete_questions_go_to_llm(question):
+    assert _plan(question) is None
+
+
+def test_cache_saves_are_batched(tmp_path):
+    path = str(tmp_path / "planner.json")
+    cache = PlannerCache(path=path, save_interval=3600.0)
+    for index in range(5):
+        cache.put(f"key{index}", ("iterate_actions", {"capture_path": "a.rdc", "limit": index}), 10.0)
+    # The first put saves at once; the rest wait for the interval or a flush.
+    assert cache.stats()["saves"] == 1
+    assert PlannerCache(path=path).stats()["entries"] == 1
+
+    cache.flush()
+    cache.flush()
+    assert cache.stats()["saves"] == 2
+    reloaded = PlannerCache(path=path)
+    assert reloaded.get("key4") == ("iterate_actions", {"capture_path": "a.rdc", "limit": 4})
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        "[]",
+        "null",
+        '{"version": "1", "entries": []}',
+        '{"version": "1", "entries": {"a": null, "b": [1], "c": {"plan": "x", "created": 1}}}',
+    ],
+)
+def test_malformed_cache_file_is_ignored(tmp_path, content):
+    path = tmp_path / "planner.json"
+    path.write_text(content, encoding="utf-8")
+    cache = PlannerCache(path=str(path))
+    assert cache.stats()["entries"] == 0
+    cache.put("key", ("iterate_actions", {"capture_path": "a.rdc"}), 1.0)
+    assert PlannerCache(path=str(path)).get("key") == ("iterate_actions", {"capture_path": "a.rdc"})
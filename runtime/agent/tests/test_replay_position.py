@@ -0,0 +1,57 @@
+"""Tools on a pooled controller must not depend on where the previous call left it."""
+
+
+import pytest
+
+from runtime.agent.benchmarks.fake_renderdoc import fake_renderdoc
+from runtime.agent.tools.renderdoc_tools import RenderdocTools, _last_event_id
+
+
+@pytest.fixture
+def tools(tmp_path):
+    tools = RenderdocTools(fake_renderdoc(actions=40, pixel_history_depth=8), cache_dir=str(tmp_path / "cache"))
+    yield tools
+    tools.close()
+
+
+@pytest.fixture
+def capture(tmp_path):
+    path = tmp_path / "frame.rdc"
+    path.write_bytes(b"frame")
+    return str(path)
+
+
+def _controller_event(tools, capture):
+    with tools._session(capture) as cap:
+        return cap.controller.event_id, _last_event_id(cap.controller)
+
+
+def test_pixel_history_covers_the_frame_after_a_seek(tools, capture):
+    fresh = tools.pixel_history(capture, 10, 3, 4)
+    tools.get_pipeline_state(capture, 5)
+    assert tools.pixel_history(capture, 10, 3, 4) == fresh
+    assert len(fresh) > 1 and fresh[-1]["eventId"] > 5
+
+
+def test_analyze_nan_inf_covers_the_frame_after_a_seek(tools, capture):
+    tools.get_pipeline_state(capture, 2)
+    # nan_every=97 puts a NaN on the last modification of pixel (0, 0).
+    assert tools.analyze_nan_inf(capture, 10, 0, 0)
+
+
+def test_save_texture_defaults_to_the_end_of_the_frame(tools, capture, tmp_path):
+    tools.get_pipeline_state(capture, 5)
+    tools.save_texture(capture, 10, str(tmp_path / "end.png"))
+    current, last = _controller_event(tools, capture)
+    assert current == last
+
+    tools.save_texture(capture, 10, str(tmp_path / "at5.png"), event_id=5)
+    assert _controller_event(tools, capture)[0] == 5
+
+
+def test_pixel_history_region_covers_the_frame_after_a_seek(tools, capture):
+    rect = {"x": 1, "y": 1, "width": 4, "height": 4}  # (0, 0) holds a NaN, which never compares equal
+    fresh = tools.pixel_history_region(capture, 10, rect=rect)
+    tools.get_pipeline_state(capture, 5)
+    assert tools.pixel_history_region(capture, 10, rect=rect) == fresh
+    assert max(event["eventId"] for event in fresh["events"]) > 5
@@ -0,0 +1,80 @@
+"""ChainScheduler grouping, ordering and worker pool routing."""
+
+
+import threading
+
+import pytest
+
+from runtime.agent.scheduler import ChainScheduler, plan_stages
+
+
+class RecordingTools:
+    def __init__(self):
+        self.calls = []
+        self.threads = set()
+
+    def dispatch(self, name, arguments):
+        self.calls.append((name, dict(arguments)))
+        self.threads.add(threading.get_ident())
+        if name == "fail":
+            raise ValueError(arguments.get("capture_path"))
+        return {"tool": name, "arguments": arguments}
+
+
+def _names(group):
+    return [name for _, name, _ in group]
+
+
+def test_calls_without_event_keep_their_place():
+    chain = [
+        ("export_texture", {"capture_path": "a.rdc", "texture_id": 1}),
+        ("get_pipeline_state", {"capture_path": "a.rdc", "event_id": 40}),
+        ("iterate_actions", {"capture_path": "a.rdc"}),
+        ("geometry_anomalies", {"capture_path": "a.rdc", "event_id": 10}),
+        ("pipeline_timeline", {"capture_path": "a.rdc", "event_min": 20}),
+    ]
+    [[group]] = plan_stages(chain)
+    assert _names(group) == [
+        "export_texture",
+        "geometry_anomalies",
+        "iterate_actions",
+        "pipeline_timeline",
+        "get_pipeline_state",
+    ]
+
+
+def test_capture_free_calls_split_stages():
+    chain = [
+        ("iterate_actions", {"capture_path": "a.rdc"}),
+        ("copy_capture", {"source_path": "a.rdc", "dest_path": "b.rdc"}),
+        ("iterate_actions", {"capture_path": "b.rdc"}),
+    ]
+    assert [[_names(group) for group in stage] for stage in plan_stages(chain)] == [
+        [["iterate_actions"]],
+        [["copy_capture"]],
+        [["iterate_actions"]],
+    ]
+
+
+def test_parallel_stages_go_through_the_replay_pool():
+    local, pool = RecordingTools(), RecordingTools()
+    scheduler = ChainScheduler(local, lambda: pool, max_workers=2)
+    chain = [
+        ("get_pipeline_state", {"capture_path": "a.rdc", "event_id": 5}),
+        ("get_pipeline_state", {"capture_path": "b.rdc", "event_id": 5}),
+    ]
+    try:
+        results = scheduler.run(chain)
+    finally:
+        scheduler.close()
+    assert [result["result"]["arguments"]["capture_path"] for result in results] == ["a.rdc", "b.rdc"]
+    assert local.calls == [] and len(pool.calls) == 2
+
+
+def test_single_capture_stays_in_process_and_first_error_wins():
+    local = RecordingTools()
+    scheduler = ChainScheduler(local, None, max_workers=2)
+    results = scheduler.run([("iterate_actions", {"capture_path": "a.rdc"})])
+    assert results[0]["tool"] == "iterate_actions" and "elapsedMs" in results[0]
+    with pytest.raises(ValueError, match="a.rdc"):
+        scheduler.run([("fail", {"capture_path": "a.rdc"}), ("fail", {"capture_path": "b.rdc"})])
@@ -0,0 +1,116 @@
+"""RenderDocSessionManager against the fake renderdoc backend."""
+
+
+import os
+
+import pytest
+
+from runtime.agent.benchmarks.fake_renderdoc import fake_renderdoc
+from runtime.agent.mcp_renderdoc.session import RenderDocSessionManager
+
+
+@pytest.fixture
+def rd():
+    return fake_renderdoc(actions=10)
+
+
+def _capture(tmp_path, name: str, size: int = 16) -> str:
+    path = tmp_path / name
+    path.write_bytes(b"x" * size)
+    return str(path)
+
+
+def test_warm_hit_reuses_controller(rd, tmp_path):
+    pool = RenderDocSessionManager()
+    capture = _capture(tmp_path, "a.rdc")
+    with pool.acquire(rd, capture) as first:
+        controller = first.capture._controller
+    with pool.acquire(rd, capture) as second:
+        assert second is first
+        assert second.capture._controller is controller
+    stats = pool.stats()
+    assert (stats["misses"], stats["hits"], stats["openSessions"]) == (1, 1, 1)
+
+
+def test_miss_opens_one_session_per_capture(rd, tmp_path):
+    pool = RenderDocSessionManager()
+    with pool.acquire(rd, _capture(tmp_path, "a.rdc")) as first:
+        pass
+    with pool.acquire(rd, _capture(tmp_path, "b.rdc")) as second:
+        assert second is not first
+    assert pool.stats()["misses"] == 2
+    assert pool.stats()["openSessions"] == 2
+
+
+def test_lru_eviction_closes_least_recently_used(rd, tmp_path):
+    pool = RenderDocSessionManager(max_sessions=2)
+    a, b, c = (_capture(tmp_path, name) for name in ("a.rdc", "b.rdc", "c.rdc"))
+    with pool.acquire(rd, a) as session_a:
+        pass
+    with pool.acquire(rd, b) as session_b:
+        pass
+    with pool.acquire(rd, a):
+        pass
+    with pool.acquire(rd, c):
+        pass
+    assert session_b.closed and not session_a.closed
+    assert pool.stats()["evictions"] == 1
+    assert sorted(os.path.basename(p) for p in pool.stats()["captures"]) == ["a.rdc", "c.rdc"]
+
+
+def test_byte_budget_eviction(rd, tmp_path):
+    pool = RenderDocSessionManager(max_sessions=8, max_bytes=100)
+    with pool.acquire(rd, _capture(tmp_path, "a.rdc", 60)) as session_a:
+        pass
+    with pool.acquire(rd, _capture(tmp_path, "b.rdc", 60)):
+        pass
+    assert session_a.closed
+    stats = pool.stats()
+    assert stats["evictions"] == 1 and stats["openBytes"] == 60
+
+
+def test_idle_sessions_expire(rd, tmp_path):
+    pool = RenderDocSessionManager(idle_timeout=30.0)
+    with pool.acquire(rd, _capture(tmp_path, "a.rdc")) as session:
+        pass
+    assert pool.evict_idle() == 0
+    session.last_used -= 60.0
+    assert pool.evict_idle() == 1
+    assert session.closed and pool.stats()["expirations"] == 1
+
+
+def test_changed_capture_is_reopened(rd, tmp_path):
+    pool = RenderDocSessionManager()
+    capture = _capture(tmp_path, "a.rdc")
+    with pool.acquire(rd, capture) as old:
+        pass
+    _capture(tmp_path, "a.rdc", 32)
+    with pool.acquire(rd, capture) as new:
+        assert new is not old
+    assert old.closed
+    stats = pool.stats()
+    assert (stats["invalidations"], stats["openSessions"]) == (1, 1)
+
+
+def test_changed_mtime_is_reopened(rd, tmp_path):
+    pool = RenderDocSessionManager()
+    capture = _capture(tmp_path, "a.rdc")
+    with pool.acquire(rd, capture) as old:
+        pass
+    stat = os.stat(capture)
+    os.utime(capture, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+    with pool.acquire(rd, capture) as new:
+        assert new is not old
+    assert old.closed
+
+
+def test_busy_session_is_retired_not_closed(rd, tmp_path):
+    pool = RenderDocSessionManager()
+    capture = _capture(tmp_path, "a.rdc")
+    with pool.acquire(rd, capture) as busy:
+        _capture(tmp_path, "a.rdc", 32)
+        with pool.acquire(rd, capture) as fresh:
+            assert fresh is not busy
+        assert busy.retired and not busy.closed
+        assert busy.capture.controller is not None
+    assert busy.closed
@@ -0,0 +1,98 @@
+"""ReplayWorkerPool crash/hang isolation against the fake renderdoc backend."""
+
+
+import pytest
+
+from runtime.agent import worker_pool
+from runtime.agent.benchmarks.fake_renderdoc import fake_tools
+from runtime.agent.worker_pool import ReplayWorkerPool, WorkerCrashed, WorkerTimeout
+
+
+def _capture(tmp_path, name: str) -> str:
+    path = tmp_path / name
+    # Distinct contents: the action index and result cache are keyed by capture content.
+    path.write_bytes(name.encode("utf-8"))
+    return str(path)
+
+
+@pytest.fixture
+def pool_factory(tmp_path):
+    pools = []
+
+    def make(**kwargs):
+        options = dict({"actions": 10, "hang_seconds": 30.0}, **kwargs.pop("options", {}))
+        kwargs.setdefault("workers", 2)
+        pool = ReplayWorkerPool(fake_tools, (options, str(tmp_path / "cache")), **kwargs)
+        pools.append(pool)
+        return pool
+
+    yield make
+    for pool in pools:
+        pool.close()
+
+
+def _worker_for(pool, capture):
+    return next(worker for worker in pool.stats()["workers"] if capture in worker["captures"])
+
+
+def test_crash_restarts_only_its_worker(pool_factory, tmp_path):
+    pool = pool_factory()
+    good = _capture(tmp_path, "good.rdc")
+    pool.dispatch("iterate_actions", {"capture_path": good, "limit": 1})
+    healthy = _worker_for(pool, good)
+
+    with pytest.raises(WorkerCrashed) as excinfo:
+        pool.dispatch("iterate_actions", {"capture_path": _capture(tmp_path, "crash.rdc"), "limit": 1})
+    assert not isinstance(excinfo.value, WorkerTimeout)
+
+    stats = pool.stats()
+    assert (stats["crashes"], stats["timeouts"]) == (1, 0)
+    restarted = [worker for worker in stats["workers"] if worker["index"] != healthy["index"]]
+    assert [worker["restarts"] for worker in restarted] == [1]
+    # The other worker kept its process and its open capture.
+    assert _worker_for(pool, good)["pid"] == healthy["pid"]
+    assert _worker_for(pool, good)["restarts"] == 0
+    assert pool.dispatch("iterate_actions", {"capture_path": good, "limit": 1})
+
+
+def test_hang_times_out_and_restarts(pool_factory, tmp_path):
+    pool = pool_factory(call_timeout=1.0)
+    good = _capture(tmp_path, "good.rdc")
+    pool.dispatch("iterate_actions", {"capture_path": good, "limit": 1})
+    healthy = _worker_for(pool, good)
+
+    with pytest.raises(WorkerTimeout):
+        pool.dispatch("iterate_actions", {"capture_path": _capture(tmp_path, "hang.rdc"), "limit": 1})
+
+    stats = pool.stats()
+    assert (stats["crashes"], stats["timeouts"]) == (0, 1)
+    assert sum(worker["restarts"] for worker in stats["workers"]) == 1
+    assert _worker_for(pool, good)["pid"] == healthy["pid"]
+    assert pool.dispatch("iterate_actions", {"capture_path": good, "limit": 1})
+
+
+def test_restarted_worker_serves_new_calls(pool_factory, tmp_path):
+    pool = pool_factory(workers=1)
+    with pytest.raises(WorkerCrashed):
+        pool.dispatch("iterate_actions", {"capture_path": _capture(tmp_path, "crash.rdc"), "limit": 1})
+    assert pool.dispatch("iterate_actions", {"capture_path": _capture(tmp_path, "after.rdc"), "limit": 1})
+    assert pool.stats()["workers"][0]["restarts"] == 1
+
+
+@pytest.mark.skipif(worker_pool.shared_memory is None, reason="needs multiprocessing.shared_memory")
+def test_large_results_round_trip_through_shared_memory(pool_factory, tmp_path, monkeypatch):
+    capture = _capture(tmp_path, "big.rdc")
+    payload = {"capture_path": capture, "limit": 500}
+    expected = pool_factory(options={"actions": 500}).dispatch("iterate_actions", payload)
+
+    imported = []
+    original = worker_pool.import_result
+
+    def spy(value):
+        imported.append(isinstance(value, worker_pool.SharedResult))
+        return original(value)
+
+    monkeypatch.setattr(worker_pool, "import_result", spy)
+    pool = pool_factory(options={"actions": 500}, shm_threshold=1024)
+    assert pool.dispatch("iterate_actions", payload) == expected
+    assert imported == [True]
@@ -1,5 +1,30 @@
-"""Tool wrappers for RenderDoc MCP integration."""
+"""Tool wrappers for RenderDoc MCP integration.
 
-from .renderdoc_tools import RenderdocTools, CaptureError, serialize_result
+Public names are imported on first attribute access so that running a
+tool module as a script (``python -m runtime.agent.tools.capture_catalog``)
+does not import it twice.
+"""
+
+import importlib
+import sys
+
+_EXPORTS = {
+    "RenderdocTools": ".renderdoc_tools",
+    "CaptureError": ".renderdoc_tools",
+    "serialize_result": ".renderdoc_tools",
+}
 
 __all__ = ["RenderdocTools", "CaptureError", "serialize_result"]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+if sys.version_info < (3, 7):  # no module __getattr__ (PEP 562)
+    from .renderdoc_tools import RenderdocTools, CaptureError, serialize_result
@@ -0,0 +1,173 @@
+"""Persistent per-capture action-tree index.
+
+The action list of a capture never changes, so it is flattened once and
+stored in a small SQLite database under ``<cache_dir>/actions/``, named by
+the capture's content fingerprint. Later iterate_actions calls are answered
+from the index without opening a replay. eventId ranges use the primary
+key and name-prefix lookups use a BINARY-collated index on ``name``.
+"""
+
+
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+INDEX_VERSION = "1"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE actions (
+    event_id INTEGER PRIMARY KEY,
+    drawcall_id INTEGER NOT NULL,
+    parent INTEGER,
+    depth INTEGER NOT NULL,
+    flags INTEGER NOT NULL,
+    flags_text TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX actions_name ON actions (name);
+"""
+
+# (event_id, drawcall_id, parent, depth, flags, flags_text, name)
+ActionRow = Tuple[int, int, Optional[int], int, int, str, str]
+
+_COLUMNS = "event_id, drawcall_id, parent, depth, flags, flags_text, name"
+
+
+def row_to_action(row: ActionRow) -> Dict[str, Any]:
+    """Convert an index row into the iterate_actions JSON shape."""
+
+    event_id, drawcall_id, parent, depth, flags, flags_text, name = row
+    return {
+        "eventId": event_id,
+        "drawcallId": drawcall_id,
+        "flags": flags_text,
+        "flagsMask": flags,
+        "name": name,
+        "parentEventId": parent,
+        "depth": depth,
+    }
+
+
+class ActionIndex:
+    """SQLite-backed action list for one capture fingerprint."""
+
+    def __init__(self, cache_dir: str, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.path = os.path.join(cache_dir, "actions", f"{fingerprint}.sqlite")
+
+    def exists(self) -> bool:
+        if not os.path.isfile(self.path):
+            return False
+        try:
+            with closing(sqlite3.connect(self.path)) as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.Error:
+            return False
+        return row is not None and row[0] == INDEX_VERSION
+
+    def build(self, rows: Iterable[ActionRow], capture_path: str = "") -> int:
+        """Write all rows to a fresh index file and atomically publish it."""
+
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=".actions-", suffix=".tmp", dir=directory)
+        os.close(fd)
+        try:
+            with closing(sqlite3.connect(tmp_path)) as conn:
+                conn.executescript(_SCHEMA)
+                conn.executemany(f"INSERT INTO actions ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                count = conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+                conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    [("version", INDEX_VERSION), ("fingerprint", self.fingerprint), ("capture_path", capture_path)],
+                )
+                conn.commit()
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return count
+
+    def query(
+        self,
+        event_min: Optional[int] = None,
+        event_max: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        flags: Optional[int] = None,
+        after: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> List[ActionRow]:
+        """Return rows ordered by eventId.
+
+        Filters: eventId range, name prefix and ``flags`` (rows sharing any
+        bit with the mask). ``after`` is a keyset cursor (exclusive eventId);
+        ``offset``/``limit`` page through the filtered rows.
+        """
+
+        return list(self.iter_query(event_min, event_max, name_prefix, flags, after, offset, limit))
+
+    def iter_query(
+        self,
+        event_min: Optional[int] = None,
+        event_max: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        flags: Optional[int] = None,
+        after: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        batch_size: int = 1024,
+    ) -> Iterator[ActionRow]:
+        """Lazily yield matching rows, fetching ``batch_size`` rows at a time."""
+
+        sql, params = _where(event_min, event_max, name_prefix, flags, after)
+        sql = f"SELECT {_COLUMNS} FROM actions{sql} ORDER BY event_id"
+        if limit is not None or offset:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend([-1 if limit is None else int(limit), int(offset)])
+        # Streaming consumers may resume the generator from another worker thread.
+        with closing(sqlite3.connect(self.path, check_same_thread=False)) as conn:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield from rows
+
+    def count(self) -> int:
+        with closing(sqlite3.connect(self.path)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+
+
+def _where(
+    event_min: Optional[int],
+    event_max: Optional[int],
+    name_prefix: Optional[str],
+    flags: Optional[int] = None,
+    after: Optional[int] = None,
+) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    if event_min is not None:
+        clauses.append("event_id >= ?")
+        params.append(int(event_min))
+    if event_max is not None:
+        clauses.append("event_id <= ?")
+        params.append(int(event_max))
+    if after is not None:
+        clauses.append("event_id > ?")
+        params.append(int(after))
+    if name_prefix:
+        # Range scan instead of LIKE so the BINARY name index is used.
+        clauses.append("name >= ? AND name < ?")
+        params.extend([name_prefix, name_prefix + "\U0010ffff"])
+    if flags:
+        clauses.append("(flags & ?) != 0")
+        params.append(int(flags))
+    if not clauses:
+        return "", params
+    return " WHERE " + " AND ".join(clauses), params
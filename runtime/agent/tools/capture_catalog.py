@@ -0,0 +1,423 @@
+"""Catalog of capture files indexed without replaying them.
+
+``CaptureCatalog.scan`` walks a directory tree in parallel (one scandir
+task per directory on a thread pool), and for every new or modified
+``.rdc`` file reads the file-level metadata that CaptureFile.OpenFile
+exposes without OpenCapture: driver, machine ident, timestamp base, local
+replay support, section list and thumbnail, plus the content fingerprint.
+Rows live in ``<cache_dir>/catalog.sqlite``; files whose size and mtime
+are unchanged since the last scan are skipped and deleted files are
+dropped, so rescanning a nightly-runs directory only touches what changed.
+
+``CaptureCatalog.query`` answers driver/size/mtime/name/fingerprint
+filters from SQLite indexes without touching the captures:
+
+    python -m runtime.agent.tools.capture_catalog scan D:/captures
+    python -m runtime.agent.tools.capture_catalog query --driver vulkan --min-size 1G --modified-after 2026-10-17
+"""
+
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import closing
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .fingerprint import capture_fingerprint
+
+CATALOG_VERSION = "1"
+
+CAPTURE_EXTENSIONS = (".rdc",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS captures (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    fingerprint TEXT,
+    driver TEXT,
+    machine_ident TEXT,
+    timestamp_base INTEGER,
+    replay_support TEXT,
+    sections TEXT,
+    thumbnail_format TEXT,
+    thumbnail_width INTEGER,
+    thumbnail_height INTEGER,
+    error TEXT,
+    indexed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS captures_driver ON captures (driver COLLATE NOCASE, size);
+CREATE INDEX IF NOT EXISTS captures_size ON captures (size);
+CREATE INDEX IF NOT EXISTS captures_mtime ON captures (mtime_ns);
+CREATE INDEX IF NOT EXISTS captures_fingerprint ON captures (fingerprint);
+CREATE TABLE IF NOT EXISTS thumbnails (path TEXT PRIMARY KEY, format TEXT NOT NULL, data BLOB NOT NULL);
+"""
+
+_COLUMNS = (
+    "path, name, size, mtime_ns, fingerprint, driver, machine_ident, timestamp_base, replay_support, "
+    "sections, thumbnail_format, thumbnail_width, thumbnail_height, error, indexed"
+)
+_PLACEHOLDERS = ", ".join("?" * len(_COLUMNS.split(",")))
+
+# (path, size, mtime_ns)
+FileEntry = Tuple[str, int, int]
+
+# path -> {driver, machine_ident, timestamp_base, replay_support, sections, thumbnail: (format, w, h, bytes)}
+MetadataReader = Callable[[str], Dict[str, Any]]
+
+
+def walk_captures(
+    root: str, workers: int = 8, recursive: bool = True, extensions: Sequence[str] = CAPTURE_EXTENSIONS
+) -> List[FileEntry]:
+    """List capture files under ``root``, scanning directories in parallel.
+
+    Symlinked directories are not followed; unreadable directories are skipped.
+    """
+
+    found: List[FileEntry] = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = {pool.submit(_scan_directory, root, extensions)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, directories = future.result()
+                found.extend(files)
+                if recursive:
+                    pending.update(pool.submit(_scan_directory, path, extensions) for path in directories)
+    found.sort()
+    return found
+
+
+def _scan_directory(path: str, extensions: Sequence[str]) -> Tuple[List[FileEntry], List[str]]:
+    files: List[FileEntry] = []
+    directories: List[str] = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.name.lower().endswith(tuple(extensions)) and entry.is_file():
+                        info = entry.stat()
+                        files.append((_norm(entry.path), info.st_size, info.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return files, directories
+
+
+class CaptureCatalog:
+    """SQLite index of capture metadata, updated incrementally by size/mtime."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._ready = False
+
+    def scan(
+        self,
+        root: str,
+        read_metadata: Optional[MetadataReader],
+        workers: int = 8,
+        recursive: bool = True,
+        fingerprints: bool = True,
+    ) -> Dict[str, Any]:
+        """Index new and modified captures under ``root`` and drop deleted ones."""
+
+        started = time.perf_counter()
+        root = _norm(root)
+        if not os.path.isdir(root):
+            raise FileNotFoundError(f"Capture directory not found: {root}")
+        files = walk_captures(root, workers, recursive)
+        walked = time.perf_counter()
+
+        prefix = _prefix(root)
+        with closing(self._connect()) as conn:
+            known = {
+                path: (size, mtime_ns)
+                for path, size, mtime_ns in conn.execute(
+                    "SELECT path, size, mtime_ns FROM captures WHERE substr(path, 1, ?) = ?",
+                    (len(prefix), prefix),
+                )
+            }
+            present = set()
+            changed: List[FileEntry] = []
+            for entry in files:
+                path = entry[0]
+                if not recursive and os.path.dirname(path) != root:
+                    continue
+                present.add(path)
+                if known.get(path) != (entry[1], entry[2]):
+                    changed.append(entry)
+            removed = [
+                path for path in known if path not in present and (recursive or os.path.dirname(path) == root)
+            ]
+            with conn:
+                conn.executemany("DELETE FROM captures WHERE path = ?", [(path,) for path in removed])
+                conn.executemany("DELETE FROM thumbnails WHERE path = ?", [(path,) for path in removed])
+
+            errors = 0
+
+            def index(entry: FileEntry) -> Tuple[FileEntry, Dict[str, Any]]:
+                meta: Dict[str, Any] = {}
+                try:
+                    if fingerprints:
+                        meta["fingerprint"] = capture_fingerprint(entry[0])
+                    if read_metadata is not None:
+                        meta.update(read_metadata(entry[0]))
+                except Exception as exc:  # noqa: BLE001 - recorded per file
+                    meta["error"] = f"{type(exc).__name__}: {exc}"
+                return entry, meta
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                batch: List[Tuple[FileEntry, Dict[str, Any]]] = []
+                for entry, meta in pool.map(index, changed):
+                    errors += "error" in meta
+                    batch.append((entry, meta))
+                    if len(batch) >= 64:
+                        self._write(conn, batch)
+                        batch = []
+                self._write(conn, batch)
+
+        return {
+            "root": root,
+            "files": len(present),
+            "added": sum(1 for entry in changed if entry[0] not in known),
+            "updated": sum(1 for entry in changed if entry[0] in known),
+            "removed": len(removed),
+            "unchanged": len(present) - len(changed),
+            "errors": errors,
+            "walkMs": round((walked - started) * 1000.0, 3),
+            "elapsedMs": round((time.perf_counter() - started) * 1000.0, 3),
+        }
+
+    def query(
+        self,
+        driver: Optional[str] = None,
+        min_bytes: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        modified_after: Union[str, float, None] = None,
+        modified_before: Union[str, float, None] = None,
+        name_contains: Optional[str] = None,
+        root: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        include_sections: bool = False,
+        limit: Optional[int] = 100,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Return ``{total, captures}`` for captures matching every given filter, newest first."""
+
+        clauses: List[str] = []
+        params: List[Any] = []
+        if driver:
+            clauses.append("driver = ? COLLATE NOCASE")
+            params.append(driver)
+        if min_bytes is not None:
+            clauses.append("size >= ?")
+            params.append(int(min_bytes))
+        if max_bytes is not None:
+            clauses.append("size <= ?")
+            params.append(int(max_bytes))
+        if modified_after is not None:
+            clauses.append("mtime_ns >= ?")
+            params.append(int(parse_time(modified_after) * 1e9))
+        if modified_before is not None:
+            clauses.append("mtime_ns < ?")
+            params.append(int(parse_time(modified_before) * 1e9))
+        if name_contains:
+            clauses.append("instr(lower(name), ?) > 0")
+            params.append(name_contains.lower())
+        if root:
+            prefix = _prefix(root)
+            clauses.append("substr(path, 1, ?) = ?")
+            params.extend([len(prefix), prefix])
+        if fingerprint:
+            clauses.append("fingerprint = ?")
+            params.append(fingerprint)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        with closing(self._connect()) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM captures{where}", params).fetchone()[0]
+            sql = f"SELECT {_COLUMNS} FROM captures{where} ORDER BY mtime_ns DESC, path LIMIT ? OFFSET ?"
+            rows = conn.execute(sql, params + [-1 if limit is None else int(limit), int(offset)]).fetchall()
+        return {"total": total, "captures": [_row_to_capture(row, include_sections) for row in rows]}
+
+    def thumbnail(self, path: str) -> Optional[Tuple[str, bytes]]:
+        """Return (format, bytes) of the stored thumbnail for a capture, if any."""
+
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT format, data FROM thumbnails WHERE path = ?", (_norm(path),)).fetchone()
+        return (row[0], bytes(row[1])) if row else None
+
+    def _write(self, conn: sqlite3.Connection, batch: Iterable[Tuple[FileEntry, Dict[str, Any]]]) -> None:
+        now = time.time()
+        with conn:
+            for (path, size, mtime_ns), meta in batch:
+                thumb = meta.get("thumbnail")
+                sections = meta.get("sections")
+                conn.execute(
+                    f"INSERT OR REPLACE INTO captures ({_COLUMNS}) VALUES ({_PLACEHOLDERS})",
+                    (
+                        path,
+                        os.path.basename(path),
+                        size,
+                        mtime_ns,
+                        meta.get("fingerprint"),
+                        meta.get("driver"),
+                        meta.get("machine_ident"),
+                        meta.get("timestamp_base"),
+                        meta.get("replay_support"),
+                        json.dumps(sections) if sections is not None else None,
+                        thumb[0] if thumb else None,
+                        thumb[1] if thumb else None,
+                        thumb[2] if thumb else None,
+                        meta.get("error"),
+                        now,
+                    ),
+                )
+                if thumb:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO thumbnails (path, format, data) VALUES (?, ?, ?)",
+                        (path, thumb[0], sqlite3.Binary(thumb[3])),
+                    )
+                else:
+                    conn.execute("DELETE FROM thumbnails WHERE path = ?", (path,))
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30.0)
+        if not self._ready:
+            with conn:
+                conn.executescript(_SCHEMA)
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', ?)", (CATALOG_VERSION,))
+            self._ready = True
+        return conn
+
+
+def _row_to_capture(row: Tuple[Any, ...], include_sections: bool) -> Dict[str, Any]:
+    (path, name, size, mtime_ns, fingerprint, driver, machine_ident, timestamp_base, replay_support,
+     sections, thumb_format, thumb_width, thumb_height, error, _indexed) = row
+    capture = {
+        "path": path,
+        "name": name,
+        "size": size,
+        "mtime": mtime_ns / 1e9,
+        "fingerprint": fingerprint,
+        "driver": driver,
+        "machineIdent": machine_ident,
+        "timestampBase": timestamp_base,
+        "replaySupport": replay_support,
+        "thumbnail": (
+            {"format": thumb_format, "width": thumb_width, "height": thumb_height} if thumb_format else None
+        ),
+        "error": error,
+    }
+    if include_sections:
+        capture["sections"] = json.loads(sections) if sections else []
+    return capture
+
+
+def parse_time(value: Union[str, float]) -> float:
+    """Epoch seconds from a number or a local ISO date/datetime string (``2026-10-17``, ``2026-10-17T08:00``)."""
+
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return time.mktime(datetime.strptime(text, fmt).timetuple())
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognized time: {value!r} (expected epoch seconds or YYYY-MM-DD[THH:MM[:SS]])")
+
+
+def parse_size(text: str) -> int:
+    """Bytes from ``123``, ``512K``, ``64M``, ``1.5G`` (binary units)."""
+
+    text = text.strip().upper().rstrip("B").rstrip("I")
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _prefix(root: str) -> str:
+    """Path prefix matching files under ``root`` but not its siblings (``/a/b`` vs ``/a/bc``)."""
+
+    return _norm(root).rstrip(os.sep) + os.sep
+
+
+def main() -> None:
+    from ..config import AgentConfig
+    from .renderdoc_tools import RenderdocTools
+
+    parser = argparse.ArgumentParser(description="Index capture files without replaying them, and query the index.")
+    commands = parser.add_subparsers(dest="command")
+    scan = commands.add_parser("scan", help="Index new/modified captures under a directory.")
+    scan.add_argument("root")
+    scan.add_argument("--workers", type=int, default=8)
+    scan.add_argument("--no-recursive", action="store_true")
+    scan.add_argument("--no-fingerprints", action="store_true", help="Skip content hashing.")
+    query = commands.add_parser("query", help="Filter indexed captures.")
+    query.add_argument("--driver")
+    query.add_argument("--min-size", type=parse_size)
+    query.add_argument("--max-size", type=parse_size)
+    query.add_argument("--modified-after")
+    query.add_argument("--modified-before")
+    query.add_argument("--name")
+    query.add_argument("--root")
+    query.add_argument("--fingerprint")
+    query.add_argument("--sections", action="store_true", help="Include section lists.")
+    query.add_argument("--limit", type=int, default=100)
+    thumbnail = commands.add_parser("thumbnail", help="Write a capture's stored thumbnail to a file.")
+    thumbnail.add_argument("capture")
+    thumbnail.add_argument("output")
+    args = parser.parse_args()
+
+    config = AgentConfig()
+    tools = RenderdocTools(renderdoc_path=config.renderdoc_python_path, cache_dir=config.cache_dir)
+    if args.command == "scan":
+        result = tools.catalog_scan(args.root, not args.no_recursive, args.workers, not args.no_fingerprints)
+    elif args.command == "query":
+        result = tools.catalog_query(
+            driver=args.driver,
+            min_bytes=args.min_size,
+            max_bytes=args.max_size,
+            modified_after=args.modified_after,
+            modified_before=args.modified_before,
+            name_contains=args.name,
+            root=args.root,
+            fingerprint=args.fingerprint,
+            include_sections=args.sections,
+            limit=args.limit,
+        )
+    elif args.command == "thumbnail":
+        stored = tools.capture_catalog.thumbnail(args.capture)
+        if stored is None:
+            parser.exit(1, f"No thumbnail indexed for {args.capture}\n")
+        with open(args.output, "wb") as handle:
+            handle.write(stored[1])
+        result = {"format": stored[0], "bytes": len(stored[1]), "output": args.output}
+    else:
+        parser.print_help()
+        return
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,354 @@
+"""Capture-to-capture action alignment and counter join (diff_captures).
+
+Actions are compared by a token interned from ``(name, flags)``. Siblings
+are aligned level by level, starting with the top-level marker regions, so a
+marker matched in both captures anchors its children and draws are never
+matched across unrelated passes. Each sibling list is aligned in three
+steps. First the common prefix and suffix are trimmed. Then tokens that
+occur exactly once on both sides become anchors, taken as the longest
+increasing subsequence of their positions (patience diff). Finally the gaps
+between anchors go to difflib.SequenceMatcher. Frames built from nearly the
+same command stream are therefore aligned in close to linear time.
+
+Subtrees left unmatched are paired by token across the whole frame and
+reported as moved (reordered draws or passes); their children are aligned
+in turn. Anything still unmatched is inserted (capture B only) or removed
+(capture A only).
+"""
+
+
+import difflib
+from bisect import bisect_left
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .action_index import ActionRow
+
+# GPUCounter.EventGPUDuration, available on every replay driver.
+DEFAULT_COUNTERS = (1,)
+
+# Above this many token comparisons a gap is aligned with difflib's popular-token heuristic.
+EXACT_GAP_LIMIT = 4_000_000
+
+# (start_a, end_a, start_b, end_b) of a span still to align.
+_Span = Tuple[int, int, int, int]
+
+
+class _Tree:
+    """Index rows of one capture by parent, with interned tokens and subtree sizes."""
+
+    def __init__(self, rows: Sequence[ActionRow], tokens: Dict[Tuple[str, int], int]):
+        self.rows = rows
+        self.position = {row[0]: pos for pos, row in enumerate(rows)}
+        self.children: Dict[Optional[int], List[int]] = defaultdict(list)
+        for pos, row in enumerate(rows):
+            self.children[row[2]].append(pos)
+        self.tokens = [tokens.setdefault((row[6], row[4]), len(tokens)) for row in rows]
+        self.descendants = [0] * len(rows)
+        for pos in reversed(self._preorder()):
+            parent = self.position.get(self.rows[pos][2])
+            if parent is not None:
+                self.descendants[parent] += self.descendants[pos] + 1
+
+    def child_positions(self, pos: Optional[int]) -> List[int]:
+        return self.children.get(None if pos is None else self.rows[pos][0], [])
+
+    def parent_position(self, pos: int) -> Optional[int]:
+        return self.position.get(self.rows[pos][2])
+
+    def subtree(self, pos: int) -> List[int]:
+        found, stack = [], [pos]
+        while stack:
+            current = stack.pop()
+            found.append(current)
+            stack.extend(self.child_positions(current))
+        return found
+
+    def _preorder(self) -> List[int]:
+        order: List[int] = []
+        stack = list(reversed(self.children.get(None, [])))
+        while stack:
+            pos = stack.pop()
+            order.append(pos)
+            stack.extend(reversed(self.child_positions(pos)))
+        return order
+
+
+@dataclass
+class ActionDiff:
+    """Row-position level result of diff_actions."""
+
+    # (position in A, position in B, inside a moved subtree)
+    pairs: List[Tuple[int, int, bool]] = field(default_factory=list)
+    # Roots of moved subtrees as (position in A, position in B).
+    moved: List[Tuple[int, int]] = field(default_factory=list)
+    # Roots of unmatched subtrees.
+    removed: List[int] = field(default_factory=list)
+    inserted: List[int] = field(default_factory=list)
+    removed_count: int = 0
+    inserted_count: int = 0
+    tree_a: Optional[_Tree] = None
+    tree_b: Optional[_Tree] = None
+
+
+def align_sequences(a: Sequence[int], b: Sequence[int]) -> List[Tuple[int, int]]:
+    """Matched index pairs ``(i, j)`` of two token sequences, in increasing order."""
+
+    pairs: List[Tuple[int, int]] = []
+    spans: List[_Span] = [(0, len(a), 0, len(b))]
+    while spans:
+        a_lo, a_hi, b_lo, b_hi = spans.pop()
+        while a_lo < a_hi and b_lo < b_hi and a[a_lo] == b[b_lo]:
+            pairs.append((a_lo, b_lo))
+            a_lo += 1
+            b_lo += 1
+        while a_lo < a_hi and b_lo < b_hi and a[a_hi - 1] == b[b_hi - 1]:
+            a_hi -= 1
+            b_hi -= 1
+            pairs.append((a_hi, b_hi))
+        if a_lo >= a_hi or b_lo >= b_hi:
+            continue
+        anchors = _unique_anchors(a, b, a_lo, a_hi, b_lo, b_hi)
+        if not anchors:
+            pairs.extend(_difflib_pairs(a, b, a_lo, a_hi, b_lo, b_hi))
+            continue
+        pairs.extend(anchors)
+        for i, j in anchors:
+            spans.append((a_lo, i, b_lo, j))
+            a_lo, b_lo = i + 1, j + 1
+        spans.append((a_lo, a_hi, b_lo, b_hi))
+    pairs.sort()
+    return pairs
+
+
+def diff_actions(rows_a: Sequence[ActionRow], rows_b: Sequence[ActionRow]) -> ActionDiff:
+    """Align two flattened action lists (action index rows ordered by eventId)."""
+
+    tokens: Dict[Tuple[str, int], int] = {}
+    tree_a, tree_b = _Tree(rows_a, tokens), _Tree(rows_b, tokens)
+    diff = ActionDiff(tree_a=tree_a, tree_b=tree_b)
+    matched_a: Set[int] = set()
+    matched_b: Set[int] = set()
+
+    def descend(stack: List[Tuple[Optional[int], Optional[int], bool]]) -> None:
+        while stack:
+            parent_a, parent_b, moved = stack.pop()
+            children_a, children_b = tree_a.child_positions(parent_a), tree_b.child_positions(parent_b)
+            if not children_a or not children_b:
+                continue
+            aligned = align_sequences(
+                [tree_a.tokens[pos] for pos in children_a], [tree_b.tokens[pos] for pos in children_b]
+            )
+            for i, j in aligned:
+                pos_a, pos_b = children_a[i], children_b[j]
+                diff.pairs.append((pos_a, pos_b, moved))
+                matched_a.add(pos_a)
+                matched_b.add(pos_b)
+                stack.append((pos_a, pos_b, moved))
+
+    descend([(None, None, False)])
+    while True:
+        removed = _unmatched_roots(tree_a, matched_a)
+        inserted = _unmatched_roots(tree_b, matched_b)
+        waiting: Dict[int, "deque[int]"] = defaultdict(deque)
+        for pos in inserted:
+            waiting[tree_b.tokens[pos]].append(pos)
+        stack: List[Tuple[Optional[int], Optional[int], bool]] = []
+        for pos_a in removed:
+            candidates = waiting.get(tree_a.tokens[pos_a])
+            if candidates:
+                pos_b = candidates.popleft()
+                diff.moved.append((pos_a, pos_b))
+                diff.pairs.append((pos_a, pos_b, True))
+                matched_a.add(pos_a)
+                matched_b.add(pos_b)
+                stack.append((pos_a, pos_b, True))
+        if not stack:
+            break
+        descend(stack)
+
+    diff.pairs.sort()
+    diff.moved.sort()
+    diff.removed, diff.inserted = removed, inserted
+    diff.removed_count = len(rows_a) - len(matched_a)
+    diff.inserted_count = len(rows_b) - len(matched_b)
+    return diff
+
+
+def counter_columns(result: Dict[str, Any]) -> Dict[str, Dict[int, Any]]:
+    """``{counter name: {eventId: value}}`` from an enumerate_counters result."""
+
+    event_ids = result.get("eventIds", [])
+    return {name: dict(zip(event_ids, values)) for name, values in result.get("values", {}).items()}
+
+
+def report(
+    diff: ActionDiff, columns_a: Dict[str, Dict[int, Any]], columns_b: Dict[str, Dict[int, Any]], max_entries: int
+) -> Dict[str, Any]:
+    """JSON result of diff_captures: alignment summary plus counter deltas sorted by impact."""
+
+    tree_a, tree_b = diff.tree_a, diff.tree_b
+    rows_a, rows_b = tree_a.rows, tree_b.rows
+    names = [name for name in columns_a if name in columns_b]
+    limit = max(0, int(max_entries))
+
+    events: List[Dict[str, Any]] = []
+    for pos_a, pos_b, moved in diff.pairs:
+        eid_a, eid_b = rows_a[pos_a][0], rows_b[pos_b][0]
+        deltas = _deltas(names, columns_a, columns_b, eid_a, eid_b)
+        if deltas is not None:
+            status = "moved" if moved else "matched"
+            events.append(_event(status, rows_b[pos_b][6], eid_a, eid_b, deltas))
+    for pos in _expand(tree_a, diff.removed):
+        deltas = _deltas(names, columns_a, columns_b, rows_a[pos][0], None)
+        if deltas is not None:
+            events.append(_event("removed", rows_a[pos][6], rows_a[pos][0], None, deltas))
+    for pos in _expand(tree_b, diff.inserted):
+        deltas = _deltas(names, columns_a, columns_b, None, rows_b[pos][0])
+        if deltas is not None:
+            events.append(_event("inserted", rows_b[pos][6], None, rows_b[pos][0], deltas))
+
+    totals: Dict[str, Dict[str, float]] = {}
+    for name in names:
+        by_status: Dict[str, float] = defaultdict(float)
+        for event in events:
+            by_status[event["status"]] += event["deltas"].get(name, 0.0)
+        totals[name] = {
+            "a": _sum(columns_a[name].values()),
+            "b": _sum(columns_b[name].values()),
+            "delta": sum(by_status.values()),
+            "matchedDelta": by_status["matched"] + by_status["moved"],
+            "insertedDelta": by_status["inserted"],
+            "removedDelta": by_status["removed"],
+        }
+    if names:
+        events.sort(key=lambda event: tuple(-abs(event["deltas"].get(name, 0.0)) for name in names))
+
+    return {
+        "actionCountA": len(rows_a),
+        "actionCountB": len(rows_b),
+        "matchedCount": len(diff.pairs),
+        "movedCount": len(diff.moved),
+        "insertedCount": diff.inserted_count,
+        "removedCount": diff.removed_count,
+        "moved": [
+            {
+                "eventIdA": rows_a[pos_a][0],
+                "eventIdB": rows_b[pos_b][0],
+                "name": rows_b[pos_b][6],
+                "descendants": tree_b.descendants[pos_b],
+            }
+            for pos_a, pos_b in diff.moved[:limit]
+        ],
+        "inserted": [_action(tree_b, pos) for pos in diff.inserted[:limit]],
+        "removed": [_action(tree_a, pos) for pos in diff.removed[:limit]],
+        "counters": names,
+        "totals": totals,
+        "events": events[:limit],
+    }
+
+
+def _unique_anchors(
+    a: Sequence[int], b: Sequence[int], a_lo: int, a_hi: int, b_lo: int, b_hi: int
+) -> List[Tuple[int, int]]:
+    counts: Dict[int, List[int]] = {}
+    for i in range(a_lo, a_hi):
+        entry = counts.setdefault(a[i], [0, 0, i, -1])
+        entry[0] += 1
+    for j in range(b_lo, b_hi):
+        entry = counts.get(b[j])
+        if entry is not None:
+            entry[1] += 1
+            entry[3] = j
+    candidates = sorted((i, j) for count_a, count_b, i, j in counts.values() if count_a == 1 and count_b == 1)
+    if not candidates:
+        return []
+
+    # Longest increasing subsequence of the B positions (patience sorting).
+    tails: List[int] = []
+    tail_index: List[int] = []
+    previous = [-1] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        slot = bisect_left(tails, j)
+        if slot == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[slot] = j
+            tail_index[slot] = index
+        previous[index] = tail_index[slot - 1] if slot else -1
+    anchors: List[Tuple[int, int]] = []
+    index = tail_index[-1]
+    while index >= 0:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _difflib_pairs(
+    a: Sequence[int], b: Sequence[int], a_lo: int, a_hi: int, b_lo: int, b_hi: int
+) -> List[Tuple[int, int]]:
+    autojunk = (a_hi - a_lo) * (b_hi - b_lo) > EXACT_GAP_LIMIT
+    matcher = difflib.SequenceMatcher(None, a[a_lo:a_hi], b[b_lo:b_hi], autojunk=autojunk)
+    return [
+        (a_lo + i + offset, b_lo + j + offset)
+        for i, j, size in matcher.get_matching_blocks()
+        for offset in range(size)
+    ]
+
+
+def _unmatched_roots(tree: _Tree, matched: Set[int]) -> List[int]:
+    roots = []
+    for pos in range(len(tree.rows)):
+        parent = tree.parent_position(pos)
+        if pos not in matched and (parent is None or parent in matched):
+            roots.append(pos)
+    return roots
+
+
+def _expand(tree: _Tree, roots: List[int]) -> List[int]:
+    return [pos for root in roots for pos in tree.subtree(root)]
+
+
+def _deltas(
+    names: List[str],
+    columns_a: Dict[str, Dict[int, Any]],
+    columns_b: Dict[str, Dict[int, Any]],
+    eid_a: Optional[int],
+    eid_b: Optional[int],
+) -> Optional[Dict[str, float]]:
+    deltas: Dict[str, float] = {}
+    for name in names:
+        value_a = _number(columns_a[name].get(eid_a)) if eid_a is not None else None
+        value_b = _number(columns_b[name].get(eid_b)) if eid_b is not None else None
+        if value_a is None and value_b is None:
+            continue
+        deltas[name] = (value_b or 0.0) - (value_a or 0.0)
+    return deltas or None
+
+
+def _event(status: str, name: str, eid_a: Optional[int], eid_b: Optional[int], deltas: Dict[str, float]):
+    return {"status": status, "name": name, "eventIdA": eid_a, "eventIdB": eid_b, "deltas": deltas}
+
+
+def _action(tree: _Tree, pos: int) -> Dict[str, Any]:
+    event_id, _, parent, _, _, flags_text, name = tree.rows[pos]
+    return {
+        "eventId": event_id,
+        "name": name,
+        "flags": flags_text,
+        "parentEventId": parent,
+        "descendants": tree.descendants[pos],
+    }
+
+
+def _number(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def _sum(values: Any) -> float:
+    return sum(number for number in (_number(value) for value in values) if number is not None)
@@ -0,0 +1,440 @@
+"""Content-addressed capture store behind copy_capture.
+
+Every distinct capture (by capture_fingerprint) is stored at most once
+under ``<cache_dir>/captures/objects/<fp[:2]>/<fp>.rdc`` as a read-only
+file. Destinations are writable files independent of the object and of
+each other, created with the cheapest method the filesystem supports:
+
+1. ``reflink``: copy-on-write clone (Linux FICLONE; btrfs, XFS, bcachefs, ...)
+2. ``copy``: in-kernel copy with os.copy_file_range / os.sendfile, falling
+   back to a buffered copy
+
+With ``hardlinks=True`` (opt-in) a destination on the store's filesystem may
+instead be a ``hardlink``: a second name for the object's read-only inode,
+shared with every other hardlinked copy of that content.
+
+The first copy of a capture is written once, straight from the source; the
+store only adopts it when that is free (a reflink, or the opt-in hardlink),
+so a store on another filesystem never costs a second full write. A
+destination that already holds the same content is left untouched.
+``refs.sqlite`` records which paths were materialized from which object;
+gc() drops references whose path was deleted or modified and removes
+objects nothing refers to any more.
+
+Run ``python -m runtime.agent.tools.capture_store stats|gc`` to inspect or
+collect a store.
+"""
+
+
+import argparse
+import errno
+import json
+import os
+import shutil
+import sqlite3
+import stat
+import sys
+import threading
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .fingerprint import capture_fingerprint, remember_fingerprint
+
+STORE_VERSION = "1"
+
+# _IOW(0x94, 9, int): clone the whole source file into the destination.
+_FICLONE = 0x40049409
+# os.sendfile/copy_file_range transfer at most ~2 GiB per call.
+_KERNEL_COPY_MAX = 1 << 30
+_COPY_BUFFER = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS objects (fingerprint TEXT PRIMARY KEY, size INTEGER NOT NULL, created REAL NOT NULL);
+CREATE TABLE IF NOT EXISTS refs (
+    path TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS refs_fingerprint ON refs (fingerprint);
+"""
+
+
+def clone_file(source: str, dest: str, hardlink: bool = False) -> str:
+    """Create ``dest`` (which must not exist) with the bytes of ``source``.
+
+    Returns the method used: ``reflink``, ``hardlink`` or ``copy``.
+    """
+
+    if _reflink(source, dest):
+        return "reflink"
+    if hardlink:
+        try:
+            os.link(source, dest)
+            return "hardlink"
+        except OSError:
+            pass
+    _copy_bytes(source, dest)
+    return "copy"
+
+
+def copy_file(source: str, dest: str) -> str:
+    """Replace ``dest`` with a reflink or in-kernel copy of ``source`` (no store, no hardlinks).
+
+    Like shutil.copy2 the metadata is copied too; returns the clone_file method.
+    """
+
+    tmp = _temp_name(os.path.abspath(dest))
+    try:
+        method = clone_file(source, tmp)
+        shutil.copystat(source, tmp)
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.lexists(tmp):
+            _remove(tmp)
+        raise
+    return method
+
+
+def _reflink(source: str, dest: str) -> bool:
+    if not sys.platform.startswith("linux"):
+        return False
+    import fcntl
+
+    with open(source, "rb") as src:
+        dst_fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        try:
+            fcntl.ioctl(dst_fd, _FICLONE, src.fileno())
+        except OSError:
+            os.close(dst_fd)
+            os.remove(dest)
+            return False
+    os.close(dst_fd)
+    return True
+
+
+def _copy_bytes(source: str, dest: str) -> None:
+    with open(source, "rb") as src, open(dest, "xb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        try:
+            _kernel_copy(src.fileno(), dst.fileno(), size)
+        except OSError as exc:
+            if exc.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.EPERM):
+                raise
+            # The kernel cannot copy between these files (old kernel, cross-fs): start over in userspace.
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            shutil.copyfileobj(src, dst, _COPY_BUFFER)
+            if dst.tell() < size:
+                raise OSError(errno.EIO, f"Short copy: {dst.tell()} of {size} bytes written")
+
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> None:
+    copy_range = getattr(os, "copy_file_range", None)
+    if copy_range is None and not (hasattr(os, "sendfile") and sys.platform.startswith("linux")):
+        raise OSError(errno.ENOSYS, "no in-kernel copy available")
+    offset = 0
+    while offset < size:
+        count = min(_KERNEL_COPY_MAX, size - offset)
+        if copy_range is not None:
+            sent = copy_range(src_fd, dst_fd, count, offset, offset)
+        else:
+            sent = os.sendfile(dst_fd, src_fd, offset, count)
+        if sent == 0:
+            break
+        offset += sent
+    if offset < size:
+        raise OSError(errno.EIO, f"Short copy: {offset} of {size} bytes written")
+
+
+def _make_writable(path: str) -> None:
+    mode = os.stat(path).st_mode
+    if not mode & stat.S_IWUSR:
+        os.chmod(path, stat.S_IMODE(mode) | stat.S_IWUSR)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except PermissionError:
+        # Windows refuses to delete read-only files.
+        os.chmod(path, stat.S_IWUSR | stat.S_IRUSR)
+        os.remove(path)
+
+
+def _temp_name(path: str) -> str:
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+class CaptureStore:
+    """Stores each capture once and materializes copies by reflink/copy (or opt-in hardlink)."""
+
+    def __init__(self, root: str, hardlinks: bool = False, gc_grace: float = 60.0):
+        self.root = root
+        self.hardlinks = hardlinks
+        # Objects younger than this survive gc even when unreferenced (a copy may be in flight).
+        self.gc_grace = gc_grace
+        self._db_path = os.path.join(root, "refs.sqlite")
+        self._lock = threading.Lock()
+        self._ready = False
+
+    def object_path(self, fingerprint: str) -> str:
+        return os.path.join(self.root, "objects", fingerprint[:2], f"{fingerprint}.rdc")
+
+    def add(self, path: str, fingerprint: Optional[str] = None) -> str:
+        """Store the capture at ``path`` if its content is new; return its fingerprint."""
+
+        fingerprint = fingerprint or capture_fingerprint(path)
+        target = self.object_path(fingerprint)
+        if os.path.isfile(target):
+            return fingerprint
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = _temp_name(target)
+        try:
+            # Never hardlink the source in: writing to it in place would change the object.
+            clone_file(path, tmp)
+            shutil.copystat(path, tmp)
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp, target)
+        except BaseException:
+            if os.path.lexists(tmp):
+                _remove(tmp)
+            raise
+        self._record_object(fingerprint, os.path.getsize(target))
+        return fingerprint
+
+    def copy(self, source: str, dest: str, overwrite: bool = True) -> Dict[str, Any]:
+        """Materialize ``source`` at ``dest`` through the store.
+
+        Returns ``{fingerprint, method, bytes, overwritten}``; ``method`` is
+        ``existing`` when ``dest`` already held the same content.
+        """
+
+        fingerprint = capture_fingerprint(source)
+        size = os.path.getsize(source)
+        overwritten = os.path.lexists(dest)
+        if overwritten:
+            if not overwrite:
+                raise FileExistsError(f"Destination exists: {dest}")
+            if self._holds(dest, fingerprint, size):
+                self._add_ref(dest, fingerprint)
+                return {"fingerprint": fingerprint, "method": "existing", "bytes": size, "overwritten": False}
+
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+        tmp = _temp_name(os.path.abspath(dest))
+        try:
+            if not os.path.isfile(self.object_path(fingerprint)):
+                method = self._copy_and_adopt(source, tmp, fingerprint)
+            else:
+                method = self._materialize(source, tmp, fingerprint)
+            if overwritten and os.name == "nt":
+                _make_writable(dest)
+            os.replace(tmp, dest)
+        except BaseException:
+            if os.path.lexists(tmp):
+                _remove(tmp)
+            raise
+        remember_fingerprint(dest, fingerprint)
+        self._add_ref(dest, fingerprint)
+        return {"fingerprint": fingerprint, "method": method, "bytes": size, "overwritten": overwritten}
+
+    def refcount(self, fingerprint: str) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM refs WHERE fingerprint = ?", (fingerprint,)).fetchone()[0]
+
+    def release(self, path: str) -> None:
+        """Forget that ``path`` refers to a stored object (the file itself is left alone)."""
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM refs WHERE path = ?", (_norm(path),))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._connect() as conn:
+            objects, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM objects").fetchone()
+            refs = conn.execute("SELECT COUNT(*) FROM refs").fetchone()[0]
+        return {"root": self.root, "objects": objects, "bytes": size, "refs": refs}
+
+    def gc(self) -> Dict[str, Any]:
+        """Drop stale references and delete unreferenced objects.
+
+        A reference is stale when its path is gone or its size/mtime changed
+        since it was materialized (the file was overwritten or edited).
+        """
+
+        now = time.time()
+        dropped = removed = freed = 0
+        with self._lock, self._connect() as conn:
+            for path, size, mtime_ns in conn.execute("SELECT path, size, mtime_ns FROM refs").fetchall():
+                if _stat_pair(path) != (size, mtime_ns):
+                    conn.execute("DELETE FROM refs WHERE path = ?", (path,))
+                    dropped += 1
+            known = dict(conn.execute("SELECT fingerprint, created FROM objects").fetchall())
+            referenced = {row[0] for row in conn.execute("SELECT DISTINCT fingerprint FROM refs")}
+            for fingerprint, path in self._object_files():
+                if fingerprint in referenced:
+                    continue
+                try:
+                    info = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                # Untracked files (an interrupted add) are aged by ctime: mtime is copied from the source.
+                created = known.get(fingerprint, info.st_ctime)
+                if now - created < self.gc_grace:
+                    continue
+                _remove(path)
+                conn.execute("DELETE FROM objects WHERE fingerprint = ?", (fingerprint,))
+                removed += 1
+                freed += info.st_size
+            for fingerprint in set(known) - referenced:
+                if not os.path.exists(self.object_path(fingerprint)):
+                    conn.execute("DELETE FROM objects WHERE fingerprint = ?", (fingerprint,))
+        return {"refsDropped": dropped, "objectsRemoved": removed, "bytesFreed": freed}
+
+    def _materialize(self, source: str, tmp: str, fingerprint: str) -> str:
+        for attempt in range(2):
+            self.add(source, fingerprint)
+            try:
+                method = clone_file(self.object_path(fingerprint), tmp, hardlink=self.hardlinks)
+                break
+            except FileNotFoundError:
+                # A concurrent gc removed the object between add() and the clone.
+                if attempt:
+                    raise
+        if method != "hardlink":
+            shutil.copystat(self.object_path(fingerprint), tmp)
+            _make_writable(tmp)
+        return method
+
+    def _copy_and_adopt(self, source: str, tmp: str, fingerprint: str) -> str:
+        """First copy of a capture: write it once from the source, then adopt it if that is free.
+
+        The destination is reflinked into the store (an independent
+        copy-on-write clone), or with opt-in hardlinks made read-only and
+        linked. When neither is possible (other filesystem, no reflink
+        support) the store is skipped rather than ingesting a second copy.
+        """
+
+        method = clone_file(source, tmp)
+        shutil.copystat(source, tmp)
+        _make_writable(tmp)
+        target = self.object_path(fingerprint)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if self.hardlinks:
+            os.chmod(tmp, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            try:
+                os.link(tmp, target)
+            except OSError:
+                _make_writable(tmp)
+            else:
+                self._record_object(fingerprint, os.path.getsize(target))
+                return method
+        staged = _temp_name(target)
+        try:
+            adopted = _reflink(tmp, staged)
+        except OSError:
+            adopted = False
+        if adopted:
+            shutil.copystat(tmp, staged)
+            os.chmod(staged, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(staged, target)
+            self._record_object(fingerprint, os.path.getsize(target))
+        return method
+
+    def _record_object(self, fingerprint: str, size: int) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO objects (fingerprint, size, created) VALUES (?, ?, ?)",
+                (fingerprint, size, time.time()),
+            )
+
+    def _holds(self, dest: str, fingerprint: str, size: int) -> bool:
+        """True when ``dest`` already has the content ``fingerprint``."""
+
+        if not os.path.isfile(dest) or os.path.getsize(dest) != size:
+            return False
+        target = self.object_path(fingerprint)
+        if os.path.exists(target) and os.path.samefile(dest, target):
+            return True
+        # Hashing reads the file but is still cheaper than rewriting it.
+        return capture_fingerprint(dest) == fingerprint
+
+    def _add_ref(self, path: str, fingerprint: str) -> None:
+        size, mtime_ns = _stat_pair(path)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO refs (path, fingerprint, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                (_norm(path), fingerprint, size, mtime_ns),
+            )
+
+    def _object_files(self) -> Iterator[Tuple[str, str]]:
+        objects = os.path.join(self.root, "objects")
+        if not os.path.isdir(objects):
+            return
+        for shard in os.listdir(objects):
+            directory = os.path.join(objects, shard)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                yield name.split(".", 1)[0] if not name.startswith(".") else name, os.path.join(directory, name)
+
+    def _connect(self) -> sqlite3.Connection:
+        if not self._ready:
+            os.makedirs(self.root, exist_ok=True)
+            with closing(sqlite3.connect(self._db_path, timeout=30.0)) as conn, conn:
+                conn.executescript(_SCHEMA)
+                conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', ?)", (STORE_VERSION,))
+            self._ready = True
+        return _Transaction(self._db_path)
+
+
+class _Transaction:
+    """Short-lived connection used as ``with store._connect() as conn:`` (commit on success)."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, timeout=30.0)
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        finally:
+            self._conn.close()
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _stat_pair(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        info = os.stat(path)
+    except OSError:
+        return None
+    return info.st_size, info.st_mtime_ns
+
+
+def main() -> None:
+    from ..config import AgentConfig
+
+    parser = argparse.ArgumentParser(description="Inspect or garbage-collect the capture store.")
+    parser.add_argument("command", choices=("stats", "gc"))
+    parser.add_argument("--root", default=None, help="Store directory (default: <cache dir>/captures).")
+    args = parser.parse_args()
+
+    store = CaptureStore(args.root or os.path.join(AgentConfig().cache_dir, "captures"))
+    result = store.gc() if args.command == "gc" else store.stats()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Content fingerprints for capture files.
+
+Caches that outlive a replay session (action index, tool results, the
+capture store, ...) are keyed by a hash of the capture bytes rather than
+its path, so a capture that is copied or renamed keeps its cache entries
+and one that is overwritten in place gets new ones. Hashes are memoized per
+path together with its mtime and size, so a capture is only read once per
+process; a rewritten capture replaces its path's entry, and at most
+``_MEMO_ENTRIES`` paths are remembered (LRU).
+
+Files are hashed through read-only memory maps of ``_WINDOW_SIZE`` bytes,
+fed to BLAKE2b in ``_CHUNK_SIZE`` slices, so no chunk is copied into a
+Python bytes object and hashing runs without the GIL.
+"""
+
+
+import hashlib
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+
+_CHUNK_SIZE = 4 * 1024 * 1024
+# Multiple of mmap.ALLOCATIONGRANULARITY; bounds address space use on huge captures.
+_WINDOW_SIZE = 256 * 1024 * 1024
+
+# Paths whose fingerprint is remembered; catalog_scan over many captures must not grow it forever.
+_MEMO_ENTRIES = 4096
+
+# path -> (mtime_ns, size, fingerprint)
+_memo: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def _stat_key(path: str) -> Tuple[str, int, int]:
+    full = os.path.normcase(os.path.abspath(path))
+    stat = os.stat(full)
+    return full, stat.st_mtime_ns, stat.st_size
+
+
+def capture_fingerprint(path: str) -> str:
+    """Return a hex BLAKE2b digest of the capture file contents."""
+
+    key = _stat_key(path)
+    with _memo_lock:
+        cached = _memo.get(key[0])
+        if cached is not None and cached[:2] == key[1:]:
+            _memo.move_to_end(key[0])
+            return cached[2]
+
+    value = _hash_file(key[0], key[2])
+    _remember(key, value)
+    return value
+
+
+def remember_fingerprint(path: str, fingerprint: str) -> None:
+    """Record a known fingerprint for ``path`` (e.g. a file just cloned from the capture store)."""
+
+    _remember(_stat_key(path), fingerprint)
+
+
+def _remember(key: Tuple[str, int, int], fingerprint: str) -> None:
+    full, mtime_ns, size = key
+    with _memo_lock:
+        _memo[full] = (mtime_ns, size, fingerprint)
+        _memo.move_to_end(full)
+        while len(_memo) > _MEMO_ENTRIES:
+            _memo.popitem(last=False)
+
+
+def _hash_file(path: str, size: int) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        offset = 0
+        while offset < size:
+            length = min(_WINDOW_SIZE, size - offset)
+            try:
+                window = mmap.mmap(handle.fileno(), length, offset=offset, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Not mappable (special file, exotic filesystem): fall back to buffered reads.
+                handle.seek(offset)
+                for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                break
+            with window:
+                if hasattr(window, "madvise"):
+                    window.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(window)
+                try:
+                    for start in range(0, length, _CHUNK_SIZE):
+                        digest.update(view[start : start + _CHUNK_SIZE])
+                finally:
+                    view.release()
+            offset += length
+    return digest.hexdigest()
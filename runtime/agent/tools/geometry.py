@@ -0,0 +1,180 @@
+"""Post-VS vertex scans backing the geometry_anomalies tool.
+
+The vectorized path reads the post-VS vertex buffer in one GetBufferData
+call, views it as a NumPy structured array (position at offset 0, optional
+texcoord at a reflected offset) and evaluates the anomaly rules with array
+masks. The per-vertex Python loop is only used when NumPy is unavailable or
+the mesh format cannot be viewed in bulk.
+"""
+
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+# Positions with a component beyond this magnitude are reported as invalid.
+POSITION_LIMIT = 1e4
+
+
+def _summary(
+    path: str,
+    vertex_count: int,
+    position_count: int,
+    positions: List[Dict[str, Any]],
+    uv_checked: bool,
+    uv_count: int,
+    uvs: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    return {
+        "path": path,
+        "vertexCount": vertex_count,
+        "invalidPositionCount": position_count,
+        "uvOutOfRangeCount": uv_count,
+        "uvChecked": uv_checked,
+        "invalidPositions": positions,
+        "uvOutOfRange": uvs,
+    }
+
+
+def scan_python(positions: Sequence[Any], uvs: Optional[Sequence[Any]], max_samples: int = 32) -> Dict[str, Any]:
+    """Scan vertex objects exposing .x/.y/.z/.w (and .x/.y for UVs) one by one."""
+
+    bad_positions: List[Dict[str, Any]] = []
+    bad_uvs: List[Dict[str, Any]] = []
+    position_count = 0
+    uv_count = 0
+    for i, pos in enumerate(positions):
+        x, y, z, w = pos.x, pos.y, pos.z, pos.w
+        if any(math.isnan(v) or math.isinf(v) for v in (x, y, z)) or any(abs(v) > POSITION_LIMIT for v in (x, y, z)):
+            position_count += 1
+            if len(bad_positions) < max_samples:
+                bad_positions.append({"index": i, "position": [float(x), float(y), float(z), float(w)]})
+        if uvs is not None:
+            uv = uvs[i]
+            u, v = uv.x, uv.y
+            if u < 0 or u > 1 or v < 0 or v > 1:
+                uv_count += 1
+                if len(bad_uvs) < max_samples:
+                    bad_uvs.append({"index": i, "uv": [float(u), float(v)]})
+    return _summary("python", len(positions), position_count, bad_positions, uvs is not None, uv_count, bad_uvs)
+
+
+def scan_arrays(positions: "np.ndarray", uvs: Optional["np.ndarray"], max_samples: int = 32) -> Dict[str, Any]:
+    """Scan (N, C) position and (N, 2) UV arrays with vectorized masks."""
+
+    xyz = positions[:, :3]
+    with np.errstate(invalid="ignore"):
+        bad_pos = (~np.isfinite(xyz) | (np.abs(xyz) > POSITION_LIMIT)).any(axis=1)
+    pos_idx = np.flatnonzero(bad_pos)
+    samples = pos_idx[:max_samples]
+    padded = np.zeros((len(samples), 4), dtype=np.float64)
+    padded[:, : min(4, positions.shape[1])] = positions[samples, :4]
+    bad_positions = [{"index": int(i), "position": row.tolist()} for i, row in zip(samples, padded)]
+
+    bad_uvs: List[Dict[str, Any]] = []
+    uv_count = 0
+    if uvs is not None:
+        uv = uvs[:, :2]
+        with np.errstate(invalid="ignore"):
+            bad_uv = ((uv < 0) | (uv > 1)).any(axis=1)
+        uv_idx = np.flatnonzero(bad_uv)
+        uv_count = int(uv_idx.size)
+        bad_uvs = [{"index": int(i), "uv": uv[i].astype(np.float64).tolist()} for i in uv_idx[:max_samples]]
+
+    return _summary(
+        "numpy", int(positions.shape[0]), int(pos_idx.size), bad_positions, uvs is not None, uv_count, bad_uvs
+    )
+
+
+def vertex_dtype(stride: int, position_components: int, texcoord_offset: Optional[int]) -> "np.dtype":
+    """Structured dtype for one interleaved post-VS vertex."""
+
+    names = ["position"]
+    formats: List[Any] = [(np.float32, (position_components,))]
+    offsets = [0]
+    if texcoord_offset is not None and texcoord_offset + 8 <= stride:
+        names.append("texcoord")
+        formats.append((np.float32, (2,)))
+        offsets.append(texcoord_offset)
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": stride})
+
+
+def supports_bulk(mesh: Any) -> bool:
+    """True when a MeshFormat can be read back and viewed as float32 vertices."""
+
+    if np is None or not hasattr(mesh, "vertexResourceId"):
+        return False
+    fmt = getattr(mesh, "format", None)
+    if fmt is None or getattr(fmt, "compByteWidth", 4) != 4:
+        return False
+    components = int(getattr(fmt, "compCount", 4))
+    return 3 <= components <= 4 and int(getattr(mesh, "vertexByteStride", 0)) >= components * 4
+
+
+def texcoord_offset(rd: Any, controller: Any) -> Optional[int]:
+    """Byte offset of the first 2+ component TEXCOORD/UV output in post-VS data.
+
+    RenderDoc stores post-VS outputs interleaved in signature order with the
+    position moved to the front; each element takes compCount 32-bit slots.
+    """
+
+    try:
+        reflection = controller.GetPipelineState().GetShaderReflection(rd.module.ShaderStage.Vertex)
+        signature = list(reflection.outputSignature)
+    except Exception:
+        return None
+    position = getattr(getattr(rd.module, "ShaderBuiltin", None), "Position", None)
+    signature.sort(key=lambda sig: 0 if getattr(sig, "systemValue", None) == position else 1)
+    offset = 0
+    for sig in signature:
+        name = (getattr(sig, "semanticName", "") or getattr(sig, "varName", "") or "").upper()
+        components = int(getattr(sig, "compCount", 4))
+        if offset > 0 and components >= 2 and ("TEXCOORD" in name or "UV" in name):
+            return offset
+        offset += components * 4
+    return None
+
+
+def read_postvs_arrays(
+    controller: Any, mesh: Any, uv_offset: Optional[int]
+) -> Tuple["np.ndarray", Optional["np.ndarray"]]:
+    """Read a post-VS MeshFormat in bulk and return (positions, uvs) per index."""
+
+    stride = int(mesh.vertexByteStride)
+    components = int(mesh.format.compCount)
+    raw = controller.GetBufferData(mesh.vertexResourceId, int(mesh.vertexByteOffset), 0)
+    dtype = vertex_dtype(stride, components, uv_offset)
+    vertices = np.frombuffer(raw, dtype=dtype, count=len(raw) // stride)
+
+    num_indices = int(mesh.numIndices)
+    index_stride = int(getattr(mesh, "indexByteStride", 0) or 0)
+    index_resource = getattr(mesh, "indexResourceId", None)
+    if index_stride in (2, 4) and resource_valid(index_resource):
+        index_bytes = controller.GetBufferData(index_resource, int(mesh.indexByteOffset), num_indices * index_stride)
+        indices = np.frombuffer(index_bytes, dtype=np.uint16 if index_stride == 2 else np.uint32, count=num_indices)
+        indices = indices.astype(np.int64) + int(getattr(mesh, "baseVertex", 0))
+        indices = np.clip(indices, 0, max(len(vertices) - 1, 0))
+        selected = vertices[indices] if len(vertices) else vertices
+    else:
+        selected = vertices[:num_indices]
+
+    uvs = selected["texcoord"] if "texcoord" in dtype.names else None
+    return selected["position"], uvs
+
+
+def resource_valid(resource_id: Any) -> bool:
+    """True if ``resource_id`` names a resource (not None or ResourceId.Null())."""
+
+    if resource_id is None:
+        return False
+    value = getattr(resource_id, "value", None)
+    if value is not None:
+        return bool(value)
+    try:
+        return resource_id != type(resource_id).Null()
+    except Exception:
+        return bool(resource_id)
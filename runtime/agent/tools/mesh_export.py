@@ -0,0 +1,201 @@
+"""Mesh buffer export to memory-mappable .npy files (export_mesh).
+
+Every buffer is read back once with GetBufferData and written unchanged
+after a .npy header whose structured dtype describes the interleaved
+vertex layout (field offsets plus ``itemsize`` = stride), so readers can
+``np.load(path, mmap_mode="r")`` and index fields such as
+``vertices["position"]`` without parsing or copying.
+
+- ``vsout`` / ``gsout``: GetPostVSData output. Fields follow the shader's
+  output signature with the position moved to the front, each element
+  taking compCount 32-bit slots (see geometry.texcoord_offset).
+- ``vsin``: GetPostVSData has no input data, so each bound vertex buffer is
+  written as its own array with the vertex input attributes that read it.
+
+Index buffers are written as plain uint16/uint32 arrays and never
+expanded: vertex ``i`` of the draw is ``vertices[indices[i] + baseVertex]``.
+A JSON descriptor next to the arrays records files, strides, fields,
+formats and counts.
+"""
+
+
+import json
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+from .texture_scan import enum_name
+
+# Tool stage names -> MeshDataStage members.
+STAGES = {"vsin": "VSIn", "vsout": "VSOut", "gsout": "GSOut"}
+
+# (name, byte offset, numpy dtype, semantic / source description)
+Field = Tuple[str, int, Any, str]
+
+_KINDS = {
+    "Float": "f",
+    "UInt": "u",
+    "UNorm": "u",
+    "UScaled": "u",
+    "SInt": "i",
+    "SNorm": "i",
+    "SScaled": "i",
+    "Double": "f",
+}
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("numpy is required to export meshes")
+
+
+def field_dtype(comp_type: Any, comp_width: int, comp_count: int) -> Any:
+    """NumPy dtype for ``comp_count`` components stored as ``comp_type`` of ``comp_width`` bytes."""
+
+    kind = _KINDS.get(enum_name(comp_type), "f")
+    if kind == "f" and comp_width not in (2, 4, 8):
+        kind = "u"
+    base = np.dtype(f"<{kind}{comp_width}")
+    return np.dtype((base, (comp_count,))) if comp_count > 1 else base
+
+
+def structured_dtype(fields: List[Field], stride: int) -> Any:
+    return np.dtype(
+        {
+            "names": [name for name, _, _, _ in fields],
+            "formats": [dtype for _, _, dtype, _ in fields],
+            "offsets": [offset for _, offset, _, _ in fields],
+            "itemsize": stride,
+        }
+    )
+
+
+def signature_fields(rd: Any, controller: Any, stage: str, position_components: int) -> List[Field]:
+    """Fields of an interleaved post-VS/GS vertex from the stage's output signature."""
+
+    shader_stage = getattr(rd.module, "ShaderStage", None)
+    candidates = ("Vertex",) if stage == "vsout" else ("Geometry", "Domain")
+    signature: List[Any] = []
+    try:
+        pipe = controller.GetPipelineState()
+        for name in candidates:
+            reflection = pipe.GetShaderReflection(getattr(shader_stage, name))
+            if reflection is not None:
+                signature = list(reflection.outputSignature)
+                break
+    except Exception:
+        signature = []
+    if not signature:
+        return [("position", 0, field_dtype("Float", 4, position_components), "position")]
+
+    position = getattr(getattr(rd.module, "ShaderBuiltin", None), "Position", None)
+    signature.sort(key=lambda sig: 0 if getattr(sig, "systemValue", None) == position else 1)
+    fields: List[Field] = []
+    offset = 0
+    for index, sig in enumerate(signature):
+        components = int(getattr(sig, "compCount", 4))
+        comp_type = getattr(sig, "varType", None) or getattr(sig, "compType", None) or "Float"
+        semantic = _semantic(sig)
+        name = "position" if index == 0 and getattr(sig, "systemValue", None) == position else semantic
+        fields.append((name, offset, field_dtype(comp_type, 4, components), semantic))
+        offset += components * 4
+    return _unique(fields)
+
+
+def attribute_fields(attributes: List[Any], slot: int, stride: int) -> List[Field]:
+    """Fields of vertex buffer ``slot`` from the pipeline's vertex input attributes."""
+
+    fields: List[Field] = []
+    for attr in attributes:
+        if int(getattr(attr, "vertexBuffer", -1)) != slot or not getattr(attr, "used", True):
+            continue
+        fmt = attr.format
+        offset = int(attr.byteOffset)
+        if enum_name(getattr(fmt, "type", "Regular")) != "Regular":
+            # Packed formats (R10G10B10A2, R11G11B10, ...) are kept as their raw 32-bit word.
+            dtype = np.dtype("<u4")
+        else:
+            dtype = field_dtype(fmt.compType, int(fmt.compByteWidth), int(fmt.compCount))
+        if stride and offset + dtype.itemsize > stride:
+            continue
+        name = _clean(str(getattr(attr, "name", "")))
+        fields.append((name, offset, dtype, _format_name(fmt)))
+    return _unique(fields)
+
+
+def write_npy(path: str, raw: bytes, dtype: Any, count: int) -> List[int]:
+    """Write ``count`` items of ``raw`` as a .npy file without converting the data; return the shape."""
+
+    array = np.frombuffer(raw, dtype=dtype, count=count)
+    with open(path, "wb") as handle:
+        np.lib.format.write_array(handle, array, allow_pickle=False)
+    return list(array.shape)
+
+
+def describe_fields(fields: List[Field]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "name": name,
+            "offset": offset,
+            "dtype": (dtype.base if dtype.shape else dtype).str,
+            "components": int(dtype.shape[0]) if dtype.shape else 1,
+            "source": source,
+        }
+        for name, offset, dtype, source in fields
+    ]
+
+
+def write_descriptor(path: str, descriptor: Dict[str, Any]) -> None:
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(descriptor, handle, ensure_ascii=False, indent=2)
+
+
+def find_action(controller: Any, event_id: int) -> Optional[Any]:
+    stack = list(controller.GetRootActions())
+    while stack:
+        action = stack.pop()
+        if int(action.eventId) == event_id:
+            return action
+        stack.extend(action.children)
+    return None
+
+
+def _semantic(sig: Any) -> str:
+    name = getattr(sig, "semanticName", "") or getattr(sig, "varName", "") or "attr"
+    index = getattr(sig, "semanticIndex", 0)
+    if index and not name[-1:].isdigit():
+        name = f"{name}{index}"
+    return _clean(name)
+
+
+def _clean(name: str) -> str:
+    return re.sub(r"\W+", "_", name).strip("_").lower() or "attr"
+
+
+def _unique(fields: List[Field]) -> List[Field]:
+    seen: Dict[str, int] = {}
+    unique: List[Field] = []
+    for name, offset, dtype, source in fields:
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        unique.append((f"{name}_{count}" if count else name, offset, dtype, source))
+    return unique
+
+
+def _format_name(fmt: Any) -> str:
+    name = getattr(fmt, "Name", None)
+    return name() if callable(name) else str(fmt)
+
+
+def output_prefix(output_dir: str, event_id: int, instance: int, view: int) -> str:
+    prefix = f"eid{event_id}"
+    if instance:
+        prefix += f"_inst{instance}"
+    if view:
+        prefix += f"_view{view}"
+    return os.path.join(output_dir, prefix)
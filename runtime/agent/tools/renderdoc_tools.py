@@ -1,14 +1,40 @@
 """Thin MCP-friendly wrappers around common RenderDoc Python API calls."""
 
 
+import hashlib
+import inspect
 import json
 import math
-import shutil
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
+from .. import metrics
+from ..config import default_cache_dir
 from ..renderdoc_adapter import RenderdocModule, load_renderdoc
+from .action_index import ActionIndex, ActionRow, row_to_action
+from .capture_catalog import CaptureCatalog
+from .capture_store import CaptureStore, copy_file
+from .fingerprint import capture_fingerprint
+from .result_cache import UNCACHED_TOOLS, ToolResultCache, result_key
+from .schema import ToolSchema
+
+
+# Page size used by iterate_actions when a cursor/offset is given without a limit.
+DEFAULT_PAGE_SIZE = 1000
+
+# Encode jobs allowed to hold readback buffers per export_textures worker.
+EXPORT_QUEUE_DEPTH = 2
+
+# Tools batch_query accepts: each positions the replay at an event_id before reading.
+BATCH_TOOLS = frozenset(
+    {"get_pipeline_state", "geometry_anomalies", "scan_texture_nan_inf", "export_textures", "export_mesh"}
+)
 
 
 class CaptureError(RuntimeError):
@@ -23,33 +49,26 @@ class RenderdocCapture:
     capture_path: Path
 
     def __enter__(self):
-        self._file = self.rd.open_capture_file()
-        try:
-            status = self._file.OpenFile(str(self.capture_path), "", None)
-        except TypeError:
-            status = self._file.OpenFile(str(self.capture_path), "")
-        if not _status_ok(self.rd, status):
-            raise CaptureError(f"Failed to open capture: {self.capture_path} (status={status})")
+        return self.open()
 
-        if not self.rd.local_replay_supported():
-            raise CaptureError("Local replay unsupported on this platform or installation.")
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
 
-        if not self._file.LocalReplaySupport():
-            raise CaptureError("Capture file not suitable for local replay.")
+    def open(self) -> "RenderdocCapture":
+        """Open the capture and acquire a replay controller."""
 
+        self._controller = None
+        self._file = self.rd.open_capture_file()
         try:
-            result, controller = self._file.OpenCapture(self.rd.module.ReplayOptions(), None)
-            if not _status_ok(self.rd, result) or controller is None:
-                raise CaptureError(f"Failed to acquire replay controller (status={result}).")
-            self._controller = controller
-        except TypeError:
-            controller = self._file.OpenCapture(allowExecution=True)
-            if controller is None:
-                raise CaptureError("Failed to acquire replay controller.")
-            self._controller = controller
+            self._open_controller()
+        except Exception:
+            self.close()
+            raise
         return self
 
-    def __exit__(self, exc_type, exc, tb):
+    def close(self) -> None:
+        """Shut down the replay controller and the capture file handle."""
+
         try:
             if getattr(self, "_controller", None):
                 self._controller.Shutdown()
@@ -59,53 +78,237 @@ class RenderdocCapture:
             self._controller = None
             self._file = None
 
+    def _open_controller(self) -> None:
+        with metrics.span("open_file"):
+            try:
+                status = self._file.OpenFile(str(self.capture_path), "", None)
+            except TypeError:
+                status = self._file.OpenFile(str(self.capture_path), "")
+        if not _status_ok(self.rd, status):
+            raise CaptureError(f"Failed to open capture: {self.capture_path} (status={status})")
+
+        if not self.rd.local_replay_supported():
+            raise CaptureError("Local replay unsupported on this platform or installation.")
+
+        if not self._file.LocalReplaySupport():
+            raise CaptureError("Capture file not suitable for local replay.")
+
+        with metrics.span("open_capture"):
+            try:
+                result, controller = self._file.OpenCapture(self.rd.module.ReplayOptions(), None)
+                if not _status_ok(self.rd, result) or controller is None:
+                    raise CaptureError(f"Failed to acquire replay controller (status={result}).")
+                self._controller = controller
+            except TypeError:
+                controller = self._file.OpenCapture(allowExecution=True)
+                if controller is None:
+                    raise CaptureError("Failed to acquire replay controller.")
+                self._controller = controller
+        self._timed = _TimedController(self._controller)
+
     @property
     def controller(self):
-        return self._controller
+        """The replay controller, with calls recorded as metrics spans."""
+
+        return self._timed if self._controller is not None else None
+
+
+class _TimedController:
+    """Proxy adding ReplayController calls to the active metrics collector.
+
+    Calls are summed as ``set_frame_event``/``replay_call``; outside a
+    collector (direct library use) the controller's methods are returned
+    unwrapped.
+    """
+
+    def __init__(self, controller: Any):
+        self._controller = controller
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._controller, name)
+        if not callable(attr) or metrics.current() is None:
+            return attr
+        phase = "set_frame_event" if name == "SetFrameEvent" else "replay_call"
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                metrics.record(phase, time.perf_counter() - start)
+
+        return timed
 
 
 class RenderdocTools:
     """Expose deterministic RenderDoc operations suitable for MCP tool wiring."""
 
-    def __init__(self, rd: Optional[RenderdocModule] = None):
+    def __init__(
+        self,
+        rd: Optional[RenderdocModule] = None,
+        sessions=None,
+        cache_dir: Optional[str] = None,
+        result_cache: Optional[ToolResultCache] = None,
+        renderdoc_path: Optional[str] = None,
+        capture_store: Optional[CaptureStore] = None,
+    ):
         self._rd: Optional[RenderdocModule] = rd
+        self._rd_lock = threading.Lock()
+        self.renderdoc_path = renderdoc_path
+        self.renderdoc_error: Optional[str] = None
+        self._sessions = sessions
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.result_cache = result_cache if result_cache is not None else ToolResultCache()
+        self.capture_store = capture_store
+        self.capture_catalog = CaptureCatalog(os.path.join(self.cache_dir, "catalog.sqlite"))
 
     def _require_rd(self) -> RenderdocModule:
         if self._rd is None:
-            self._rd = load_renderdoc()
+            with self._rd_lock:
+                if self._rd is None:
+                    try:
+                        self._rd = load_renderdoc(self.renderdoc_path)
+                    except ImportError as exc:
+                        self.renderdoc_error = str(exc)
+                        raise
+                    self.renderdoc_error = None
         return self._rd
 
+    def prewarm(self, on_error: Optional[Any] = None) -> threading.Thread:
+        """Load the RenderDoc bindings on a daemon thread ahead of the first call.
+
+        ``on_error`` is called with the ImportError if loading fails; the
+        first tool call then retries and raises it.
+        """
+
+        def load() -> None:
+            try:
+                self._require_rd()
+            except ImportError as exc:
+                if on_error is not None:
+                    on_error(exc)
+
+        thread = threading.Thread(target=load, name="renderdoc-prewarm", daemon=True)
+        thread.start()
+        return thread
+
     @property
     def rd(self) -> RenderdocModule:
         return self._require_rd()
 
-    def iterate_actions(self, capture_path: str) -> List[Dict[str, Any]]:
-        """Return the flattened action tree for a capture."""
-
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
-            structured = None
-            if hasattr(cap.controller, "GetStructuredFile"):
-                structured = cap.controller.GetStructuredFile()
-            actions = []
-            for action in cap.controller.GetRootActions():
-                actions.extend(self._flatten_action(action, structured))
-            return actions
-
-    def _flatten_action(self, action, structured) -> Iterable[Dict[str, Any]]:
-        yield {
-            "eventId": action.eventId,
-            "drawcallId": action.drawcallId,
-            "flags": str(action.flags),
-            "name": _action_name(action, structured),
+    @property
+    def sessions(self):
+        """Pool of warm replay controllers shared by all tool calls."""
+
+        if self._sessions is None:
+            # Imported lazily: mcp_renderdoc imports this module at package load.
+            from ..mcp_renderdoc.session import RenderDocSessionManager
+
+            self._sessions = RenderDocSessionManager()
+        return self._sessions
+
+    def _session(self, capture_path: str):
+        return self.sessions.acquire(self.rd, capture_path)
+
+    def session_stats(self) -> Dict[str, Any]:
+        """Return replay session pool and result cache counters."""
+
+        stats = self.sessions.stats()
+        stats["resultCache"] = self.result_cache.stats()
+        return stats
+
+    def close(self) -> None:
+        """Shut down every pooled replay controller."""
+
+        if self._sessions is not None:
+            self._sessions.close_all()
+
+    def iterate_actions(
+        self,
+        capture_path: str,
+        event_min: Optional[int] = None,
+        event_max: Optional[int] = None,
+        name_prefix: Optional[str] = None,
+        flags: Optional[int] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Any:
+        """Return the flattened action tree for a capture.
+
+        The first call replays the capture and writes a persistent action
+        index; later calls are answered from the index without replay.
+        Without ``offset``/``limit``/``cursor`` the full (filtered) list is
+        returned; otherwise one page ``{actions, nextCursor}`` is returned,
+        where ``nextCursor`` resumes after the last eventId of the page.
+        """
+
+        index = self._action_index(capture_path)
+        filters = {"event_min": event_min, "event_max": event_max, "name_prefix": name_prefix, "flags": flags}
+        if offset is None and limit is None and cursor is None:
+            return [row_to_action(row) for row in index.query(**filters)]
+
+        page_size = DEFAULT_PAGE_SIZE if limit is None else max(0, int(limit))
+        after = int(cursor) if cursor else None
+        # Fetch one extra row to know whether another page exists.
+        rows = index.query(after=after, offset=offset or 0, limit=page_size + 1, **filters)
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        return {
+            "actions": [row_to_action(row) for row in rows],
+            "nextCursor": str(rows[-1][0]) if has_more and rows else None,
         }
-        for child in action.children:
-            yield from self._flatten_action(child, structured)
+
+    def stream(self, tool_name: str, payload: Dict[str, Any], chunk_size: int = 1000) -> Iterator[List[Any]]:
+        """Return an iterator of bounded result chunks for a streamable tool.
+
+        Any expensive setup (e.g. building the action index) happens before
+        this returns, so callers can release per-capture locks while
+        draining the iterator.
+        """
+
+        if tool_name != "iterate_actions":
+            raise ValueError(f"Tool does not support streaming: {tool_name}")
+        payload = dict(payload)
+        index = self._action_index(payload.pop("capture_path"))
+        for unsupported in ("offset", "limit", "cursor"):
+            payload.pop(unsupported, None)
+        return _chunked((row_to_action(row) for row in index.iter_query(**payload)), max(1, int(chunk_size)))
+
+    def _action_index(self, capture_path: str) -> ActionIndex:
+        index = ActionIndex(self.cache_dir, capture_fingerprint(capture_path))
+        if not index.exists():
+            with self._session(capture_path) as cap:
+                structured = None
+                if hasattr(cap.controller, "GetStructuredFile"):
+                    structured = cap.controller.GetStructuredFile()
+                index.build(self._flatten_actions(cap.controller.GetRootActions(), structured), str(capture_path))
+        return index
+
+    def _flatten_actions(self, roots, structured) -> Iterable[ActionRow]:
+        stack = [(action, None, 0) for action in reversed(list(roots))]
+        while stack:
+            action, parent, depth = stack.pop()
+            yield (
+                int(action.eventId),
+                int(action.drawcallId),
+                parent,
+                depth,
+                _flags_mask(action.flags),
+                str(action.flags),
+                _action_name(action, structured),
+            )
+            for child in reversed(list(action.children)):
+                stack.append((child, int(action.eventId), depth + 1))
 
     def pixel_history(self, capture_path: str, texture_id: int, x: int, y: int, sample: int = 0) -> List[Dict[str, Any]]:
         """Return sanitized pixel history for a location."""
 
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
+        with self._session(capture_path) as cap:
+            # PixelHistory only reports up to the current event; cover the whole frame.
+            _seek(cap, _last_event_id(cap.controller))
             history = cap.controller.PixelHistory(_resource_id(self.rd, texture_id), x, y, sample)
+            _position_lost(cap)
             cleaned = [
                 {
                     "eventId": _event_id(mod),
@@ -117,34 +320,175 @@ class RenderdocTools:
             ]
             return cleaned
 
-    def enumerate_counters(self, capture_path: str) -> List[Dict[str, Any]]:
-        """List available GPU counters and fetch their values."""
+    def enumerate_counters(self, capture_path: str, counters: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Fetch GPU counters per event in a columnar layout.
 
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
-            counters = cap.controller.EnumerateCounters()
-            values = cap.controller.FetchCounters(counters)
-            return [
-                {
-                    "name": cap.controller.GetCounterDescription(c).name,
-                    "value": v.value,
-                }
-                for c, v in zip(counters, values)
-            ]
+        ``counters`` selects counters by name or numeric id (all available
+        counters when omitted). Results are ``eventIds`` plus one value
+        array per counter name, aligned with ``eventIds``. Counter
+        descriptions are cached per replay session; results are memoized
+        by ``dispatch`` like other read-only tools.
+        """
 
-    def save_texture(self, capture_path: str, resource_id: int, output_path: str, mip: int = 0, slice: int = 0) -> str:
-        """Save a texture to disk using RenderDoc's TextureSave helper."""
+        with self._session(capture_path) as cap:
+            descriptions = _counter_descriptions(cap)
+            selected = _select_counters(descriptions, counters)
+            _position_lost(cap)
+            results = cap.controller.FetchCounters([counter for counter, _ in selected]) if selected else []
 
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
-            save_data = self.rd.module.TextureSave()
-            save_data.resourceId = _resource_id(self.rd, resource_id)
-            save_data.destType = self.rd.module.FileType.PNG
-            save_data.mip = mip
-            save_data.slice.sliceIndex = slice
-            cap.controller.SaveTexture(save_data, output_path)
+        columns: Dict[Any, Dict[int, Any]] = {counter: {} for counter, _ in selected}
+        event_ids = set()
+        for res in results:
+            desc = descriptions.get(res.counter)
+            if res.counter not in columns or desc is None:
+                continue
+            eid = _event_id(res)
+            event_ids.add(eid)
+            columns[res.counter][eid] = _counter_value(desc, res.value)
+
+        ordered_events = sorted(event_ids)
+        return {
+            "eventIds": ordered_events,
+            "counters": [_counter_info(counter, desc) for counter, desc in selected],
+            "values": {desc.name: [columns[counter].get(eid) for eid in ordered_events] for counter, desc in selected},
+        }
+
+    def save_texture(
+        self,
+        capture_path: str,
+        resource_id: int,
+        output_path: str,
+        mip: int = 0,
+        slice: int = 0,
+        event_id: Optional[int] = None,
+    ) -> str:
+        """Save a texture to disk using RenderDoc's TextureSave helper.
+
+        The texture is saved as of ``event_id`` (the end of the frame by
+        default), wherever the pooled controller was left.
+        """
+
+        with self._session(capture_path) as cap:
+            _seek(cap, event_id if event_id is not None else _last_event_id(cap.controller))
+            _native_save(self.rd, cap.controller, _resource_id(self.rd, resource_id), "png", mip, slice, output_path)
             return output_path
 
+    def export_textures(
+        self,
+        capture_path: str,
+        textures: List[Dict[str, Any]],
+        output_dir: str,
+        file_type: str = "png",
+        event_id: Optional[int] = None,
+        max_workers: int = 4,
+    ) -> Dict[str, Any]:
+        """Export many texture subresources through one replay controller.
+
+        ``textures`` items are ``{resource_id, mips, slices}`` where
+        ``mips``/``slices`` are ``[first, last]`` (inclusive), ``"all"`` or
+        omitted for 0. Subresources are read back on the replay thread while
+        a thread pool encodes and writes the previous ones; EXR and formats
+        the built-in PNG/DDS encoders cannot represent go through
+        RenderDoc's SaveTexture instead. Per-file failures are reported in
+        the entry's ``error`` field.
+        """
+
+        # NumPy-backed helpers load on first use to keep package import fast.
+        from . import texture_export
+
+        file_type = file_type.lower()
+        if file_type not in texture_export.FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported file_type: {file_type} (expected png, exr or dds)")
+        extension = texture_export.FILE_EXTENSIONS[file_type]
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        files: List[Dict[str, Any]] = []
+        pending: "deque[Any]" = deque()
+        workers = max(1, int(max_workers))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            with self._session(capture_path) as cap:
+                controller = cap.controller
+                _seek(cap, event_id if event_id is not None else _last_event_id(controller))
+                textures_by_id = {_resource_id_to_str(tex.resourceId): tex for tex in controller.GetTextures()}
+                for item in textures:
+                    key = _resource_id_to_str(_resource_id(self.rd, item["resource_id"]))
+                    tex = textures_by_id.get(key)
+                    if tex is None:
+                        files.append({"resourceId": item["resource_id"], "error": "Texture not found in capture"})
+                        continue
+                    for mip in _subresource_range(item.get("mips"), int(getattr(tex, "mips", 1) or 1)):
+                        for slice in _subresource_range(item.get("slices"), int(getattr(tex, "arraysize", 1) or 1)):
+                            path = str(Path(output_dir) / f"res{key}_mip{mip}_slice{slice}.{extension}")
+                            entry = {"resourceId": item["resource_id"], "mip": mip, "slice": slice, "path": path}
+                            files.append(entry)
+                            job = self._export_subresource(cap, tex, entry, file_type)
+                            if job is not None:
+                                pending.append(pool.submit(job))
+                            # Bound the readback buffers waiting for an encoder.
+                            while len(pending) > workers * EXPORT_QUEUE_DEPTH:
+                                pending.popleft().result()
+            for future in pending:
+                future.result()
+
+        written = [entry for entry in files if "error" not in entry]
+        return {
+            "outputDir": output_dir,
+            "fileType": file_type,
+            "fileCount": len(written),
+            "errorCount": len(files) - len(written),
+            "bytesWritten": sum(entry["bytes"] for entry in written),
+            "elapsedMs": round((time.perf_counter() - started) * 1000.0, 3),
+            "files": files,
+        }
+
+    def _export_subresource(self, cap: Any, tex: Any, entry: Dict[str, Any], file_type: str):
+        """Read one subresource; return an encode job or None if already handled."""
+
+        from . import texture_export, texture_scan
+
+        mip, slice, path = entry["mip"], entry["slice"], entry["path"]
+        started = time.perf_counter()
+        try:
+            dxgi = texture_export.dxgi_format(tex.format) if file_type == "dds" else None
+            image = raw = None
+            if file_type == "png" or dxgi is not None:
+                raw, width, height = texture_scan.read_subresource(self.rd, cap.controller, tex, mip, slice, 0)
+                if file_type == "png":
+                    image = texture_export.to_rgba8(raw, tex.format, width, height)
+            if image is None and dxgi is None:
+                _native_save(self.rd, cap.controller, tex.resourceId, file_type, mip, slice, path)
+                entry.update(encoder="renderdoc", bytes=os.path.getsize(path), readMs=_elapsed_ms(started))
+                return None
+        except Exception as exc:  # noqa: BLE001 - one bad subresource must not abort the batch
+            entry["error"] = str(exc)
+            return None
+        entry.update(encoder="builtin", readMs=_elapsed_ms(started))
+
+        def encode() -> None:
+            encode_started = time.perf_counter()
+            try:
+                if image is not None:
+                    data = texture_export.encode_png(image)
+                else:
+                    data = texture_export.encode_dds(raw, dxgi, width, height)
+                with open(path, "wb") as handle:
+                    handle.write(data)
+                entry.update(bytes=len(data), encodeMs=_elapsed_ms(encode_started))
+            except Exception as exc:  # noqa: BLE001
+                entry["error"] = str(exc)
+
+        return encode
+
     def copy_capture(self, source_path: str, dest_path: str, overwrite: bool = True) -> Dict[str, Any]:
-        """Copy a capture file to a destination path."""
+        """Copy a capture file to a destination path.
+
+        The destination is an independent, writable file: a reflink when the
+        filesystem allows it, otherwise an in-kernel copy. With a capture
+        store it is a no-op when ``dest_path`` already holds the same
+        capture, and copies may be hardlinks to the stored object if
+        hardlinks were enabled.
+        """
 
         source = Path(source_path)
         if not source.exists() or not source.is_file():
@@ -157,18 +501,111 @@ class RenderdocTools:
         if overwritten and not overwrite:
             raise FileExistsError(f"Destination exists: {dest_path}")
 
-        shutil.copy2(source, dest)
-        return {"sourcePath": str(source), "destPath": str(dest), "overwritten": overwritten}
+        if self.capture_store is not None:
+            stored = self.capture_store.copy(str(source), str(dest), overwrite)
+            return {
+                "sourcePath": str(source),
+                "destPath": str(dest),
+                "overwritten": stored["overwritten"],
+                "fingerprint": stored["fingerprint"],
+                "method": stored["method"],
+            }
+
+        method = copy_file(str(source), str(dest))
+        return {"sourcePath": str(source), "destPath": str(dest), "overwritten": overwritten, "method": method}
+
+    def catalog_scan(
+        self, root: str, recursive: bool = True, workers: int = 8, fingerprints: bool = True
+    ) -> Dict[str, Any]:
+        """Index the captures under ``root`` from file metadata only (no replay).
+
+        Only files added or modified since the last scan are opened.
+        """
+
+        # Fail once up front instead of recording the same ImportError on every file.
+        self._require_rd()
+        return self.capture_catalog.scan(root, self._capture_file_metadata, workers, recursive, fingerprints)
+
+    def catalog_query(
+        self,
+        driver: Optional[str] = None,
+        min_bytes: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        modified_after: Optional[Any] = None,
+        modified_before: Optional[Any] = None,
+        name_contains: Optional[str] = None,
+        root: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+        include_sections: bool = False,
+        limit: int = 100,
+        offset: int = 0,
+    ) -> Dict[str, Any]:
+        """Filter the capture catalog; answered from the index without opening captures."""
+
+        return self.capture_catalog.query(
+            driver,
+            min_bytes,
+            max_bytes,
+            modified_after,
+            modified_before,
+            name_contains,
+            root,
+            fingerprint,
+            include_sections,
+            limit,
+            offset,
+        )
+
+    def _capture_file_metadata(self, capture_path: str) -> Dict[str, Any]:
+        """Read what CaptureFile.OpenFile exposes without OpenCapture.
+
+        Accessors missing from older bindings are skipped.
+        """
+
+        capture = self.rd.open_capture_file()
+        try:
+            try:
+                status = capture.OpenFile(capture_path, "", None)
+            except TypeError:
+                status = capture.OpenFile(capture_path, "")
+            if not _status_ok(self.rd, status):
+                raise CaptureError(f"Failed to open capture: {capture_path} (status={status})")
+
+            meta: Dict[str, Any] = {}
+            if hasattr(capture, "DriverName"):
+                meta["driver"] = str(capture.DriverName())
+            if hasattr(capture, "RecordedMachineIdent"):
+                meta["machine_ident"] = str(capture.RecordedMachineIdent())
+            if hasattr(capture, "TimestampBase"):
+                meta["timestamp_base"] = int(capture.TimestampBase())
+            if hasattr(capture, "LocalReplaySupport"):
+                meta["replay_support"] = str(capture.LocalReplaySupport())
+            if hasattr(capture, "GetSectionCount"):
+                meta["sections"] = [
+                    _section_properties(capture.GetSectionProperties(i)) for i in range(capture.GetSectionCount())
+                ]
+            file_type = getattr(getattr(self.rd.module, "FileType", None), "JPG", None)
+            if hasattr(capture, "GetThumbnail") and file_type is not None:
+                thumbnail = capture.GetThumbnail(file_type, 0)
+                data = bytes(getattr(thumbnail, "data", b"") or b"")
+                if data:
+                    meta["thumbnail"] = (str(thumbnail.format), int(thumbnail.width), int(thumbnail.height), data)
+            return meta
+        finally:
+            capture.Shutdown()
 
     def analyze_nan_inf(self, capture_path: str, texture_id: int, x: int, y: int, sample: int = 0) -> List[Dict[str, Any]]:
         """Analyze NaN/Inf anomalies in pixel history for a given location."""
 
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
+        with self._session(capture_path) as cap:
+            # PixelHistory only reports up to the current event; cover the whole frame.
+            _seek(cap, _last_event_id(cap.controller))
             history = cap.controller.PixelHistory(_resource_id(self.rd, texture_id), x, y, sample)
+            _position_lost(cap)
             anomalies: List[Dict[str, Any]] = []
             for mod in history:
                 colour = mod.postMod.colour
-                if any(math.isnan(c) or math.isinf(c) for c in colour):
+                if _has_nan_inf(colour):
                     anomalies.append(
                         {
                             "eventId": _event_id(mod),
@@ -177,93 +614,447 @@ class RenderdocTools:
                     )
             return anomalies
 
-    def geometry_anomalies(self, capture_path: str, event_id: int, mesh_slot: int = 0) -> List[Dict[str, Any]]:
-        """Detect basic geometric anomalies (invalid positions / UV out of range)."""
-
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
-            cap.controller.SetFrameEvent(event_id, True)
-            vsout = cap.controller.GetPostVSData(self.rd.module.MeshDataStage.VSOut, mesh_slot)
-            issues: List[Dict[str, Any]] = []
-            for i in range(vsout.numIndices):
-                pos = vsout.positions[i]
-                x, y, z, w = pos.x, pos.y, pos.z, pos.w
-                if any(math.isnan(v) or math.isinf(v) for v in (x, y, z)) or any(
-                    abs(v) > 1e4 for v in (x, y, z)
-                ):
-                    issues.append(
-                        {
-                            "index": i,
-                            "position": [float(x), float(y), float(z), float(w)],
-                            "reason": "invalid_position",
-                        }
-                    )
-                if vsout.numTexCoords > 0:
-                    uv = vsout.texcoords[0][i]
-                    u, v = uv.x, uv.y
-                    if u < 0 or u > 1 or v < 0 or v > 1:
-                        issues.append(
-                            {
-                                "index": i,
-                                "uv": [float(u), float(v)],
-                                "reason": "uv_out_of_range",
-                            }
-                        )
-            return issues
+    def scan_texture_nan_inf(
+        self,
+        capture_path: str,
+        texture_id: int,
+        event_id: Optional[int] = None,
+        mip: int = 0,
+        slice: int = 0,
+        sample: int = 0,
+        mask_size: int = 64,
+        max_regions: int = 16,
+        max_samples: int = 16,
+    ) -> Dict[str, Any]:
+        """Scan a whole texture subresource for NaN/Inf texels in one readback.
+
+        The texture is read as of ``event_id`` (the end of the frame when
+        omitted). Returns counts, an overall bounding box, connected regions,
+        a downsampled ``#``/``.`` mask and one sample coordinate per region.
+        """
+
+        from . import texture_scan
+
+        with self._session(capture_path) as cap:
+            controller = cap.controller
+            _seek(cap, event_id if event_id is not None else _last_event_id(controller))
+            wanted = _resource_id_to_str(_resource_id(self.rd, texture_id))
+            tex = texture_scan.find_texture(controller.GetTextures(), wanted)
+            if tex is None:
+                raise ValueError(f"Texture not found in capture: {texture_id}")
+            raw, width, height = texture_scan.read_subresource(self.rd, controller, tex, mip, slice, sample)
+
+        texels = texture_scan.decode_texels(raw, tex.format, width, height)
+        result = texture_scan.scan_texels(texels, mask_size, max_regions, max_samples)
+        result.update(
+            {"textureId": texture_id, "mip": mip, "slice": slice, "format": texture_scan.format_name(tex.format)}
+        )
+        return result
+
+    def pixel_history_region(
+        self,
+        capture_path: str,
+        texture_id: int,
+        points: Optional[List[Any]] = None,
+        rect: Optional[Dict[str, int]] = None,
+        stride: int = 1,
+        sample: int = 0,
+        nan_inf_only: bool = False,
+        max_pixels: int = 4096,
+    ) -> Dict[str, Any]:
+        """Run pixel history for many pixels on one replay controller.
+
+        Pixels come from ``points`` ([x, y] pairs or {x, y} objects) and/or a
+        ``rect`` ({x, y, width, height}) sampled every ``stride`` pixels.
+        Modifications are aggregated per eventId; each pixel only lists the
+        eventIds that touched it plus its final colour.
+        """
+
+        pixels = _region_pixels(points, rect, stride)
+        if not pixels:
+            raise ValueError("pixel_history_region needs 'points' or 'rect'")
+        if len(pixels) > max_pixels:
+            raise ValueError(f"Region has {len(pixels)} pixels, above max_pixels={max_pixels}; raise stride")
+
+        events: Dict[int, Dict[str, int]] = {}
+        touched: List[Dict[str, Any]] = []
+        with self._session(capture_path) as cap:
+            # PixelHistory only reports up to the current event; cover the whole frame.
+            _seek(cap, _last_event_id(cap.controller))
+            _position_lost(cap)
+            res_id = _resource_id(self.rd, texture_id)
+            for x, y in pixels:
+                event_ids: List[int] = []
+                colour = None
+                for mod in cap.controller.PixelHistory(res_id, x, y, sample):
+                    post = mod.postMod.colour
+                    bad = _has_nan_inf(post)
+                    if nan_inf_only and not bad:
+                        continue
+                    if not nan_inf_only and mod.preMod.colour == post:
+                        continue
+                    eid = _event_id(mod)
+                    entry = events.get(eid)
+                    if entry is None:
+                        entry = events[eid] = {"eventId": eid, "pixelCount": 0, "nanInfCount": 0}
+                    if not event_ids or event_ids[-1] != eid:
+                        event_ids.append(eid)
+                        entry["pixelCount"] += 1
+                    if bad:
+                        entry["nanInfCount"] += 1
+                    colour = post
+                if event_ids:
+                    touched.append({"x": x, "y": y, "eventIds": event_ids, "postColour": [float(v) for v in colour]})
+
+        return {
+            "textureId": texture_id,
+            "sample": sample,
+            "pixelCount": len(pixels),
+            "touchedPixelCount": len(touched),
+            "events": [events[eid] for eid in sorted(events)],
+            "pixels": touched,
+        }
+
+    def geometry_anomalies(
+        self, capture_path: str, event_id: int, mesh_slot: int = 0, max_samples: int = 32
+    ) -> Dict[str, Any]:
+        """Detect basic geometric anomalies (invalid positions / UV out of range).
+
+        Returns counts plus the first ``max_samples`` offending indices. The
+        post-VS buffer is read in bulk and scanned with NumPy when available;
+        otherwise each vertex is checked in Python.
+        """
+
+        from . import geometry
+
+        with self._session(capture_path) as cap:
+            _seek(cap, event_id)
+            # GetPostVSData(instance, view, stage); mesh_slot selects the instance.
+            vsout = cap.controller.GetPostVSData(mesh_slot, 0, self.rd.module.MeshDataStage.VSOut)
+            if geometry.supports_bulk(vsout):
+                uv_offset = geometry.texcoord_offset(self.rd, cap.controller)
+                positions, uvs = geometry.read_postvs_arrays(cap.controller, vsout, uv_offset)
+                return geometry.scan_arrays(positions, uvs, max_samples)
+
+            count = vsout.numIndices
+            positions = [vsout.positions[i] for i in range(count)]
+            uvs = [vsout.texcoords[0][i] for i in range(count)] if vsout.numTexCoords > 0 else None
+            return geometry.scan_python(positions, uvs, max_samples)
+
+    def export_mesh(
+        self,
+        capture_path: str,
+        event_id: int,
+        output_dir: str,
+        stages: Optional[List[str]] = None,
+        instance: int = 0,
+        view: int = 0,
+    ) -> Dict[str, Any]:
+        """Write a drawcall's mesh buffers to memory-mappable .npy files.
+
+        ``stages`` picks any of ``vsin``, ``vsout`` (default) and ``gsout``.
+        Each buffer is read back once and written as-is under a structured
+        dtype matching its interleaved layout; index buffers go to their own
+        uint16/uint32 file. Strides, fields, formats and counts are in the
+        JSON descriptor, so the result only lists file paths and shapes.
+        Load with ``np.load(path, mmap_mode="r")``.
+        """
+
+        from . import mesh_export
+
+        mesh_export.require_numpy()
+        stages = list(stages or ["vsout"])
+        unknown = [stage for stage in stages if stage not in mesh_export.STAGES]
+        if unknown:
+            raise ValueError(f"Unsupported mesh stage: {', '.join(unknown)} (expected vsin, vsout or gsout)")
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        prefix = mesh_export.output_prefix(output_dir, event_id, instance, view)
+
+        descriptor: Dict[str, Any] = {"eventId": event_id, "instance": instance, "view": view, "stages": {}}
+        files: List[Dict[str, Any]] = []
+        with self._session(capture_path) as cap:
+            _seek(cap, event_id)
+            for stage in dict.fromkeys(stages):
+                if stage == "vsin":
+                    entry = self._export_vertex_inputs(cap.controller, event_id, prefix, files)
+                else:
+                    entry = self._export_postvs(cap.controller, stage, instance, view, prefix, files)
+                descriptor["stages"][stage] = entry
+
+        descriptor_path = f"{prefix}_mesh.json"
+        mesh_export.write_descriptor(descriptor_path, descriptor)
+        return {"eventId": event_id, "descriptor": descriptor_path, "files": files}
+
+    def _export_postvs(
+        self, controller: Any, stage: str, instance: int, view: int, prefix: str, files: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        from . import geometry, mesh_export
+
+        data_stage = getattr(self.rd.module.MeshDataStage, mesh_export.STAGES[stage])
+        mesh = controller.GetPostVSData(instance, view, data_stage)
+        if not geometry.resource_valid(getattr(mesh, "vertexResourceId", None)) or not mesh.numIndices:
+            return {"error": f"No {stage} data at this event"}
+
+        stride = int(mesh.vertexByteStride)
+        fields = mesh_export.signature_fields(self.rd, controller, stage, int(getattr(mesh.format, "compCount", 4)))
+        if sum(dtype.itemsize for _, _, dtype, _ in fields) > stride:
+            fields = fields[:1]
+        raw = controller.GetBufferData(mesh.vertexResourceId, int(mesh.vertexByteOffset), 0)
+        path = f"{prefix}_{stage}_vertices.npy"
+        shape = mesh_export.write_npy(path, raw, mesh_export.structured_dtype(fields, stride), len(raw) // stride)
+        files.append({"stage": stage, "kind": "vertices", "path": path, "shape": shape})
+        entry: Dict[str, Any] = {
+            "vertices": {
+                "file": os.path.basename(path),
+                "shape": shape,
+                "stride": stride,
+                "fields": mesh_export.describe_fields(fields),
+            },
+            "indices": None,
+            "numIndices": int(mesh.numIndices),
+            "baseVertex": int(getattr(mesh, "baseVertex", 0)),
+            "topology": mesh_export.enum_name(getattr(mesh, "topology", "Unknown")),
+        }
+
+        index_stride = int(getattr(mesh, "indexByteStride", 0) or 0)
+        if index_stride in (2, 4) and geometry.resource_valid(getattr(mesh, "indexResourceId", None)):
+            index_bytes = controller.GetBufferData(
+                mesh.indexResourceId, int(mesh.indexByteOffset), int(mesh.numIndices) * index_stride
+            )
+            count = int(mesh.numIndices)
+            entry["indices"] = self._write_indices(index_bytes, index_stride, count, stage, prefix, files)
+        return entry
+
+    def _export_vertex_inputs(
+        self, controller: Any, event_id: int, prefix: str, files: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        from . import geometry, mesh_export
+
+        pipe = controller.GetPipelineState()
+        attributes = list(pipe.GetVertexInputs())
+        action = mesh_export.find_action(controller, event_id)
+        indexed_flag = int(getattr(self.rd.module.ActionFlags, "Indexed", 0))
+        indexed = action is not None and bool(int(action.flags) & indexed_flag)
+        entry: Dict[str, Any] = {
+            "buffers": [],
+            "indices": None,
+            "numIndices": int(getattr(action, "numIndices", 0)),
+            "indexed": indexed,
+            "firstVertex": int(getattr(action, "vertexOffset", 0)),
+            "baseVertex": int(getattr(action, "baseVertex", 0)),
+            "numInstances": int(getattr(action, "numInstances", 1)),
+            "firstInstance": int(getattr(action, "instanceOffset", 0)),
+        }
+        for slot, vb in enumerate(pipe.GetVBuffers()):
+            stride = int(vb.byteStride)
+            fields = mesh_export.attribute_fields(attributes, slot, stride)
+            if not fields or not stride or not geometry.resource_valid(vb.resourceId):
+                continue
+            size = int(getattr(vb, "byteSize", 0) or 0)
+            # byteSize is UINT64_MAX for "rest of the buffer".
+            raw = controller.GetBufferData(vb.resourceId, int(vb.byteOffset), size if size < 1 << 62 else 0)
+            path = f"{prefix}_vsin_vb{slot}.npy"
+            shape = mesh_export.write_npy(path, raw, mesh_export.structured_dtype(fields, stride), len(raw) // stride)
+            files.append({"stage": "vsin", "kind": f"vb{slot}", "path": path, "shape": shape})
+            per_instance = any(
+                getattr(attr, "perInstance", False) for attr in attributes if int(attr.vertexBuffer) == slot
+            )
+            entry["buffers"].append(
+                {
+                    "slot": slot,
+                    "file": os.path.basename(path),
+                    "shape": shape,
+                    "stride": stride,
+                    "perInstance": per_instance,
+                    "fields": mesh_export.describe_fields(fields),
+                }
+            )
+
+        ib = pipe.GetIBuffer()
+        index_stride = int(getattr(ib, "byteStride", 0) or 0)
+        if indexed and index_stride in (1, 2, 4) and geometry.resource_valid(getattr(ib, "resourceId", None)):
+            count = entry["numIndices"]
+            offset = int(ib.byteOffset) + int(getattr(action, "indexOffset", 0)) * index_stride
+            index_bytes = controller.GetBufferData(ib.resourceId, offset, count * index_stride)
+            entry["indices"] = self._write_indices(index_bytes, index_stride, count, "vsin", prefix, files)
+        return entry
+
+    @staticmethod
+    def _write_indices(
+        raw: bytes, stride: int, count: int, stage: str, prefix: str, files: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        from . import mesh_export
+
+        dtype = {1: "<u1", 2: "<u2", 4: "<u4"}[stride]
+        path = f"{prefix}_{stage}_indices.npy"
+        shape = mesh_export.write_npy(path, raw, dtype, min(count, len(raw) // stride))
+        files.append({"stage": stage, "kind": "indices", "path": path, "shape": shape})
+        return {"file": os.path.basename(path), "shape": shape, "dtype": dtype}
 
     def get_pipeline_state(self, capture_path: str, event_id: int) -> Dict[str, Any]:
         """Summarize pipeline framebuffer attachments for a given drawcall."""
 
-        with RenderdocCapture(self.rd, Path(capture_path)) as cap:
-            cap.controller.SetFrameEvent(event_id, True)
+        with self._session(capture_path) as cap:
+            _seek(cap, event_id)
+            return _pipeline_summary(cap.controller)
 
-            color_targets: List[Dict[str, Any]] = []
-            depth_target: Optional[Dict[str, Any]] = None
-            try:
-                pipe = cap.controller.GetPipelineState()
-                framebuffer = getattr(pipe, "GetFramebuffer", None)
-                if callable(framebuffer):
-                    fb = framebuffer()
-                    if hasattr(fb, "colorAttachments"):
-                        for idx, att in enumerate(fb.colorAttachments):
-                            res_id = getattr(att, "resourceId", None)
-                            if res_id:
-                                color_targets.append(
-                                    {
-                                        "index": idx,
-                                        "resourceId": _resource_id_to_str(res_id),
-                                        "name": getattr(att, "name", f"RT{idx}"),
-                                    }
-                                )
-                    depth_att = getattr(fb, "depthAttachment", None)
-                    if depth_att and getattr(depth_att, "resourceId", None):
-                        depth_target = {
-                            "resourceId": _resource_id_to_str(depth_att.resourceId),
-                            "name": getattr(depth_att, "name", "Depth"),
-                        }
-            except Exception:
-                pass
+    def pipeline_timeline(
+        self,
+        capture_path: str,
+        event_min: Optional[int] = None,
+        event_max: Optional[int] = None,
+        flags: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Track pipeline summaries across an eventId range in one forward replay.
 
-            highlight = None
-            if depth_target is None:
-                highlight = "RS"
+        Events come from the action index (optionally filtered by an
+        ActionFlags mask) and are visited in ascending order without forcing
+        a replay. Identical summaries are interned in ``states``; ``changes``
+        only lists events whose summary differs from the previous one, with
+        the top-level keys that changed.
+        """
 
-            return {
-                "highlightStage": highlight,
-                "warningMessage": None if highlight is None else "Depth attachment missing; RS highlighted",
-                "colorTargets": color_targets,
-                "depthTarget": depth_target,
-            }
+        event_ids = [row[0] for row in self._action_index(capture_path).iter_query(event_min, event_max, None, flags)]
+        states: List[Dict[str, Any]] = []
+        interned: Dict[str, int] = {}
+        changes: List[Dict[str, Any]] = []
+        previous: Optional[Dict[str, Any]] = None
+        with self._session(capture_path) as cap:
+            for eid in event_ids:
+                _seek(cap, eid)
+                summary = _pipeline_summary(cap.controller)
+                canonical = json.dumps(summary, sort_keys=True, separators=(",", ":"))
+                state = interned.get(canonical)
+                if state is None:
+                    state = interned[canonical] = len(states)
+                    digest = hashlib.blake2b(canonical.encode("utf-8"), digest_size=8).hexdigest()
+                    states.append({"hash": digest, "state": summary})
+                if changes and changes[-1]["state"] == state:
+                    continue
+                changed = sorted(key for key in summary if previous is None or previous.get(key) != summary[key])
+                changes.append({"eventId": eid, "state": state, "changed": changed})
+                previous = summary
+
+        return {
+            "eventMin": event_ids[0] if event_ids else None,
+            "eventMax": event_ids[-1] if event_ids else None,
+            "eventCount": len(event_ids),
+            "states": states,
+            "changes": changes,
+        }
+
+    def diff_captures(
+        self,
+        capture_a: str,
+        capture_b: str,
+        counters: Optional[List[Any]] = None,
+        max_entries: int = 100,
+    ) -> Dict[str, Any]:
+        """Align the action lists of two captures and join per-event counter deltas.
+
+        Actions are matched on (name, flags) with marker regions as anchors
+        (see capture_diff); unmatched draws are reported as inserted, removed
+        or moved. ``counters`` (names or ids, default GPU duration; ``[]``
+        for none) are fetched per capture and compared for every aligned,
+        inserted and removed event, sorted by absolute delta. Action lists
+        come from the persistent action index and counters from the
+        fingerprint-keyed result cache, so repeated diffs do not replay.
+        """
+
+        from . import capture_diff
+
+        started = time.perf_counter()
+        rows_a = list(self._action_index(capture_a).iter_query())
+        rows_b = list(self._action_index(capture_b).iter_query())
+        diff = capture_diff.diff_actions(rows_a, rows_b)
+        aligned_ms = _elapsed_ms(started)
+
+        selection = list(capture_diff.DEFAULT_COUNTERS if counters is None else counters)
+        columns: List[Dict[str, Dict[int, Any]]] = [{}, {}]
+        if selection:
+            for index, path in enumerate((capture_a, capture_b)):
+                fetched = self.dispatch("enumerate_counters", {"capture_path": path, "counters": selection})
+                columns[index] = capture_diff.counter_columns(fetched)
+
+        result = capture_diff.report(diff, columns[0], columns[1], max_entries)
+        result.update({"captureA": capture_a, "captureB": capture_b})
+        result["alignMs"] = aligned_ms
+        result["elapsedMs"] = _elapsed_ms(started)
+        return result
+
+    def batch_query(self, capture_path: str, queries: List[Any]) -> Dict[str, Any]:
+        """Run many event-positioned tool calls on one capture in a single forward pass.
+
+        ``queries`` items are ``{tool, event_id, arguments}`` objects or
+        ``[tool, event_id, arguments]`` arrays for the tools in BATCH_TOOLS.
+        They run in eventId order (queries without ``event_id`` last, at the
+        end of the frame) on one held replay session, so the controller only
+        seeks forward and queries at the event it is already on skip the
+        replay. Results keep request order as ``{ok, result}`` or
+        ``{ok: false, error}``.
+        """
+
+        parsed = [_batch_query(query) for query in queries]
+        order = sorted(range(len(parsed)), key=lambda i: (parsed[i][1] is None, parsed[i][1] or 0, i))
+        results: List[Optional[Dict[str, Any]]] = [None] * len(parsed)
+        started = time.perf_counter()
+        with self._session(capture_path) as cap:
+            seeks, skipped = getattr(cap, "seeks", 0), getattr(cap, "seeks_skipped", 0)
+            for index in order:
+                tool, event_id, arguments = parsed[index]
+                payload = dict(arguments, capture_path=capture_path)
+                if event_id is not None:
+                    payload["event_id"] = event_id
+                try:
+                    results[index] = {"ok": True, "result": self.dispatch(tool, payload)}
+                except Exception as exc:  # noqa: BLE001 - reported per query
+                    results[index] = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+            seeks = getattr(cap, "seeks", 0) - seeks
+            skipped = getattr(cap, "seeks_skipped", 0) - skipped
+        return {
+            "results": results,
+            "queryCount": len(parsed),
+            "seeks": seeks,
+            "seeksSkipped": skipped,
+            "elapsedMs": round((time.perf_counter() - started) * 1000.0, 3),
+        }
 
     def export_schema(self) -> Dict[str, Any]:
-        """Return JSON-serializable MCP tool schema metadata."""
+        """Return JSON-serializable MCP tool schema metadata (shared; do not mutate)."""
+
+        return self.tool_schema().schema
+
+    @classmethod
+    def tool_schema(cls) -> ToolSchema:
+        """Return the schema, descriptors, etag and prompt rendering, built once per class."""
+
+        cached = cls.__dict__.get("_tool_schema")
+        if cached is None:
+            cached = ToolSchema(cls.schema_definition())
+            cls._tool_schema = cached
+        return cached
+
+    @staticmethod
+    def schema_definition() -> Dict[str, Any]:
+        """Build the tool schema dict; callers should use the cached ``tool_schema``."""
 
         return {
             "iterate_actions": {
-                "description": "Flatten the RenderDoc action tree for a capture",
+                "description": (
+                    "Flatten the RenderDoc action tree for a capture (served from a persistent index after "
+                    "the first call); optionally filter by eventId range and name prefix"
+                ),
                 "parameters": {
                     "type": "object",
                     "properties": {
-                        "capture_path": {"type": "string", "description": "Path to the .rdc capture"}
+                        "capture_path": {"type": "string", "description": "Path to the .rdc capture"},
+                        "event_min": {"type": "integer", "description": "Lowest eventId to include"},
+                        "event_max": {"type": "integer", "description": "Highest eventId to include"},
+                        "name_prefix": {"type": "string", "description": "Only actions whose name starts with this"},
+                        "flags": {"type": "integer", "description": "Only actions sharing a bit with this ActionFlags mask"},
+                        "offset": {"type": "integer", "description": "Skip this many matching actions (enables paging)"},
+                        "limit": {"type": "integer", "description": "Page size (enables paging, default 1000)"},
+                        "cursor": {"type": "string", "description": "nextCursor from the previous page"},
                     },
                     "required": ["capture_path"],
                 },
@@ -283,10 +1074,20 @@ class RenderdocTools:
                 },
             },
             "enumerate_counters": {
-                "description": "Enumerate GPU counters and fetch their current values",
+                "description": (
+                    "Fetch GPU counters per event (columnar: eventIds plus one value array per counter); "
+                    "optionally restrict to selected counters"
+                ),
                 "parameters": {
                     "type": "object",
-                    "properties": {"capture_path": {"type": "string"}},
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "counters": {
+                            "type": "array",
+                            "items": {"type": ["string", "integer"]},
+                            "description": "Counter names or numeric ids; all counters when omitted",
+                        },
+                    },
                     "required": ["capture_path"],
                 },
             },
@@ -300,10 +1101,52 @@ class RenderdocTools:
                         "output_path": {"type": "string"},
                         "mip": {"type": "integer", "default": 0},
                         "slice": {"type": "integer", "default": 0},
+                        "event_id": {
+                            "type": "integer",
+                            "description": "Save as of this event (default: end of frame)",
+                        },
                     },
                     "required": ["capture_path", "resource_id", "output_path"],
                 },
             },
+            "export_textures": {
+                "description": (
+                    "Bulk-export texture mips/slices (PNG, EXR or DDS) through one replay, encoding on a "
+                    "thread pool; reports per-file timing and bytes written"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "textures": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "resource_id": {"type": "integer"},
+                                    "mips": {
+                                        "type": ["array", "string"],
+                                        "description": "[first, last] inclusive, or \"all\"; default mip 0",
+                                    },
+                                    "slices": {
+                                        "type": ["array", "string"],
+                                        "description": "[first, last] inclusive, or \"all\"; default slice 0",
+                                    },
+                                },
+                                "required": ["resource_id"],
+                            },
+                        },
+                        "output_dir": {"type": "string"},
+                        "file_type": {"type": "string", "enum": ["png", "exr", "dds"], "default": "png"},
+                        "event_id": {
+                            "type": "integer",
+                            "description": "Export as of this event (default: end of frame)",
+                        },
+                        "max_workers": {"type": "integer", "default": 4},
+                    },
+                    "required": ["capture_path", "textures", "output_dir"],
+                },
+            },
             "copy_capture": {
                 "description": "Copy a capture file to a destination path",
                 "parameters": {
@@ -330,18 +1173,102 @@ class RenderdocTools:
                     "required": ["capture_path", "texture_id", "x", "y"],
                 },
             },
+            "scan_texture_nan_inf": {
+                "description": (
+                    "Read a whole texture mip/slice back and locate every NaN/Inf texel "
+                    "(RGBA16F, RGBA32F, R11G11B10 and other float formats); returns counts, bounding boxes, "
+                    "a downsampled mask and sample coordinates for pixel_history"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "texture_id": {"type": "integer"},
+                        "event_id": {
+                            "type": "integer",
+                            "description": "Read the texture as of this event (default: end of frame)",
+                        },
+                        "mip": {"type": "integer", "default": 0},
+                        "slice": {"type": "integer", "default": 0},
+                        "sample": {"type": "integer", "default": 0},
+                        "mask_size": {"type": "integer", "default": 64, "description": "Longest side of the mask grid"},
+                        "max_regions": {"type": "integer", "default": 16},
+                        "max_samples": {"type": "integer", "default": 16},
+                    },
+                    "required": ["capture_path", "texture_id"],
+                },
+            },
+            "pixel_history_region": {
+                "description": (
+                    "Batched pixel history over a list of points or a strided rectangle in one replay; "
+                    "modifications are aggregated per eventId"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "texture_id": {"type": "integer"},
+                        "points": {
+                            "type": "array",
+                            "items": {"type": "array", "items": {"type": "integer"}, "minItems": 2, "maxItems": 2},
+                            "description": "Pixel coordinates as [x, y] pairs",
+                        },
+                        "rect": {
+                            "type": "object",
+                            "properties": {
+                                "x": {"type": "integer"},
+                                "y": {"type": "integer"},
+                                "width": {"type": "integer"},
+                                "height": {"type": "integer"},
+                            },
+                            "required": ["x", "y", "width", "height"],
+                        },
+                        "stride": {"type": "integer", "default": 1},
+                        "sample": {"type": "integer", "default": 0},
+                        "nan_inf_only": {"type": "boolean", "default": False},
+                        "max_pixels": {"type": "integer", "default": 4096},
+                    },
+                    "required": ["capture_path", "texture_id"],
+                },
+            },
             "geometry_anomalies": {
-                "description": "Detect basic geometric anomalies for a given drawcall",
+                "description": (
+                    "Detect invalid positions and out-of-range UVs for a drawcall; "
+                    "returns counts plus the first offending vertex indices"
+                ),
                 "parameters": {
                     "type": "object",
                     "properties": {
                         "capture_path": {"type": "string"},
                         "event_id": {"type": "integer"},
-                        "mesh_slot": {"type": "integer", "default": 0},
+                        "mesh_slot": {"type": "integer", "default": 0, "description": "Instance index"},
+                        "max_samples": {"type": "integer", "default": 32},
                     },
                     "required": ["capture_path", "event_id"],
                 },
             },
+            "export_mesh": {
+                "description": (
+                    "Write a drawcall's VSIn/VSOut/GSOut vertex and index buffers to memory-mappable .npy files "
+                    "plus a JSON descriptor (stride, fields, formats, counts); returns file paths and shapes only"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "event_id": {"type": "integer"},
+                        "output_dir": {"type": "string"},
+                        "stages": {
+                            "type": "array",
+                            "items": {"type": "string", "enum": ["vsin", "vsout", "gsout"]},
+                            "default": ["vsout"],
+                        },
+                        "instance": {"type": "integer", "default": 0},
+                        "view": {"type": "integer", "default": 0},
+                    },
+                    "required": ["capture_path", "event_id", "output_dir"],
+                },
+            },
             "get_pipeline_state": {
                 "description": "Summarize framebuffer attachments for a specific drawcall",
                 "parameters": {
@@ -353,11 +1280,148 @@ class RenderdocTools:
                     "required": ["capture_path", "event_id"],
                 },
             },
+            "pipeline_timeline": {
+                "description": (
+                    "Walk an eventId range in one forward replay and return a delta-encoded log of "
+                    "framebuffer/pipeline summary changes with interned unique states"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "event_min": {"type": "integer", "description": "Lowest eventId to visit"},
+                        "event_max": {"type": "integer", "description": "Highest eventId to visit"},
+                        "flags": {
+                            "type": "integer",
+                            "description": "Only visit actions sharing a bit with this ActionFlags mask",
+                        },
+                    },
+                    "required": ["capture_path"],
+                },
+            },
+            "catalog_scan": {
+                "description": (
+                    "Index the .rdc files under a directory into the local capture catalog from file metadata "
+                    "only (driver, sections, thumbnail, size, fingerprint; no replay). Incremental by size/mtime"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "root": {"type": "string"},
+                        "recursive": {"type": "boolean", "default": True},
+                        "workers": {"type": "integer", "default": 8},
+                        "fingerprints": {"type": "boolean", "default": True},
+                    },
+                    "required": ["root"],
+                },
+            },
+            "catalog_query": {
+                "description": "Find indexed captures by driver, size, modification time, name or fingerprint",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "driver": {"type": "string", "description": "Driver name, case-insensitive (e.g. Vulkan)"},
+                        "min_bytes": {"type": "integer"},
+                        "max_bytes": {"type": "integer"},
+                        "modified_after": {
+                            "type": ["string", "number"],
+                            "description": "Epoch seconds or local YYYY-MM-DD[THH:MM[:SS]]",
+                        },
+                        "modified_before": {"type": ["string", "number"]},
+                        "name_contains": {"type": "string"},
+                        "root": {"type": "string", "description": "Only captures under this directory"},
+                        "fingerprint": {"type": "string"},
+                        "include_sections": {"type": "boolean", "default": False},
+                        "limit": {"type": "integer", "default": 100},
+                        "offset": {"type": "integer", "default": 0},
+                    },
+                },
+            },
+            "diff_captures": {
+                "description": (
+                    "Diff two captures: align action lists on name+flags with marker regions as anchors, report "
+                    "inserted/removed/moved draws and per-event counter deltas sorted by impact"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_a": {"type": "string", "description": "Baseline capture"},
+                        "capture_b": {"type": "string", "description": "Capture compared against the baseline"},
+                        "counters": {
+                            "type": "array",
+                            "items": {"type": ["string", "integer"]},
+                            "description": "GPU counter names or ids (default: GPU duration; [] for none)",
+                        },
+                        "max_entries": {"type": "integer", "default": 100},
+                    },
+                    "required": ["capture_a", "capture_b"],
+                },
+            },
+            "batch_query": {
+                "description": (
+                    "Run many get_pipeline_state / geometry_anomalies / scan_texture_nan_inf / export_textures / "
+                    "export_mesh queries on one capture in one forward replay pass sorted by eventId; "
+                    "results keep request order"
+                ),
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "capture_path": {"type": "string"},
+                        "queries": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "tool": {"type": "string", "enum": sorted(BATCH_TOOLS)},
+                                    "event_id": {"type": "integer"},
+                                    "arguments": {
+                                        "type": "object",
+                                        "description": "Tool arguments other than capture_path and event_id",
+                                    },
+                                },
+                                "required": ["tool"],
+                            },
+                        },
+                    },
+                    "required": ["capture_path", "queries"],
+                },
+            },
+            "session_stats": {
+                "description": (
+                    "Report replay session pool counters (hits, misses, evictions, open captures) "
+                    "and tool result cache counters"
+                ),
+                "parameters": {"type": "object", "properties": {}},
+            },
         }
 
     def dispatch(self, tool_name: str, payload: Dict[str, Any]) -> Any:
-        """Execute a tool call described by its name and JSON payload."""
+        """Execute a tool call described by its name and JSON payload.
+
+        Read-only tools that take a ``capture_path`` are memoized on the
+        capture's content fingerprint; side-effecting tools always run.
+        """
 
+        capture_path = payload.get("capture_path")
+        if tool_name in UNCACHED_TOOLS or not isinstance(capture_path, str):
+            return self._dispatch(tool_name, payload)
+
+        method = getattr(self, tool_name, None)
+        try:
+            # Bind defaults so {"sample": 0} and {} share one cache entry.
+            bound = inspect.signature(method).bind(**payload)
+        except (TypeError, ValueError):
+            return self._dispatch(tool_name, payload)
+        bound.apply_defaults()
+        key = result_key(tool_name, dict(bound.arguments), capture_fingerprint(capture_path))
+        hit, cached = self.result_cache.get(key)
+        if hit:
+            return cached
+        result = self._dispatch(tool_name, payload)
+        self.result_cache.put(key, result)
+        return result
+
+    def _dispatch(self, tool_name: str, payload: Dict[str, Any]) -> Any:
         if tool_name == "iterate_actions":
             return self.iterate_actions(**payload)
         if tool_name == "pixel_history":
@@ -366,21 +1430,53 @@ class RenderdocTools:
             return self.enumerate_counters(**payload)
         if tool_name == "save_texture":
             return self.save_texture(**payload)
+        if tool_name == "export_textures":
+            return self.export_textures(**payload)
         if tool_name == "copy_capture":
             return self.copy_capture(**payload)
         if tool_name == "analyze_nan_inf":
             return self.analyze_nan_inf(**payload)
+        if tool_name == "scan_texture_nan_inf":
+            return self.scan_texture_nan_inf(**payload)
+        if tool_name == "pixel_history_region":
+            return self.pixel_history_region(**payload)
         if tool_name == "geometry_anomalies":
             return self.geometry_anomalies(**payload)
+        if tool_name == "export_mesh":
+            return self.export_mesh(**payload)
         if tool_name == "get_pipeline_state":
             return self.get_pipeline_state(**payload)
+        if tool_name == "pipeline_timeline":
+            return self.pipeline_timeline(**payload)
+        if tool_name == "catalog_scan":
+            return self.catalog_scan(**payload)
+        if tool_name == "catalog_query":
+            return self.catalog_query(**payload)
+        if tool_name == "diff_captures":
+            return self.diff_captures(**payload)
+        if tool_name == "batch_query":
+            return self.batch_query(**payload)
+        if tool_name == "session_stats":
+            return self.session_stats(**payload)
         raise KeyError(f"Unknown tool: {tool_name}")
 
 
 def serialize_result(result: Any) -> str:
     """Serialize tool output into a compact JSON string for MCP responses."""
 
-    return json.dumps(result, ensure_ascii=False, indent=2)
+    with metrics.span("serialize"):
+        return json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+
+
+def _section_properties(props: Any) -> Dict[str, Any]:
+    return {
+        "name": str(props.name),
+        "type": str(props.type),
+        "version": int(props.version),
+        "compressedSize": int(props.compressedSize),
+        "uncompressedSize": int(props.uncompressedSize),
+        "flags": str(props.flags),
+    }
 
 
 def _status_ok(rd: RenderdocModule, status: Any) -> bool:
@@ -411,6 +1507,229 @@ def _resource_id_to_str(resource_id: Any) -> str:
     return str(resource_id)
 
 
+def _counter_descriptions(cap: Any) -> "OrderedDict[Any, Any]":
+    """Return {counter: description} for a session, cached on the session."""
+
+    cached = cap.cache.get("counter_descriptions")
+    if cached is not None:
+        return cached
+    controller = cap.controller
+    describe = getattr(controller, "DescribeCounter", None) or controller.GetCounterDescription
+    descriptions = OrderedDict((counter, describe(counter)) for counter in controller.EnumerateCounters())
+    cap.cache["counter_descriptions"] = descriptions
+    return descriptions
+
+
+def _select_counters(descriptions: "OrderedDict[Any, Any]", wanted: Optional[List[Any]]) -> List[Any]:
+    if not wanted:
+        return list(descriptions.items())
+    by_name = {desc.name.lower(): counter for counter, desc in descriptions.items()}
+    by_id = {_counter_id(counter): counter for counter in descriptions}
+    selected = []
+    for item in wanted:
+        if isinstance(item, int) or (isinstance(item, str) and item.isdigit()):
+            counter = by_id.get(int(item))
+        else:
+            counter = by_name.get(str(item).lower())
+        if counter is None:
+            raise ValueError(f"Unknown GPU counter: {item}")
+        if counter not in [c for c, _ in selected]:
+            selected.append((counter, descriptions[counter]))
+    return selected
+
+
+def _counter_id(counter: Any) -> int:
+    try:
+        return int(counter)
+    except (TypeError, ValueError):
+        return int(getattr(counter, "value", 0))
+
+
+def _counter_info(counter: Any, desc: Any) -> Dict[str, Any]:
+    unit = getattr(desc, "unit", None)
+    return {
+        "id": _counter_id(counter),
+        "name": desc.name,
+        "unit": getattr(unit, "name", None) or (str(unit) if unit is not None else None),
+        "description": getattr(desc, "description", ""),
+    }
+
+
+def _counter_value(desc: Any, value: Any) -> Any:
+    """Read a CounterValue union through the member its description declares."""
+
+    result_type = getattr(desc, "resultType", "")
+    result_type = getattr(result_type, "name", None) or str(result_type)
+    width = int(getattr(desc, "resultByteWidth", 8) or 8)
+    if "Float" in result_type or "Double" in result_type:
+        return float(value.f) if width == 4 else float(value.d)
+    return int(value.u32) if width == 4 else int(value.u64)
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    chunk: List[Any] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _has_nan_inf(colour: Iterable[float]) -> bool:
+    return any(math.isnan(c) or math.isinf(c) for c in colour)
+
+
+def _region_pixels(points: Optional[List[Any]], rect: Optional[Dict[str, int]], stride: int) -> List[Any]:
+    pixels: List[Any] = []
+    seen = set()
+
+    def add(x: int, y: int) -> None:
+        if (x, y) not in seen:
+            seen.add((x, y))
+            pixels.append((x, y))
+
+    for point in points or []:
+        if isinstance(point, dict):
+            add(int(point["x"]), int(point["y"]))
+        else:
+            add(int(point[0]), int(point[1]))
+    if rect:
+        step = max(1, int(stride))
+        x0, y0 = int(rect["x"]), int(rect["y"])
+        for y in range(y0, y0 + int(rect["height"]), step):
+            for x in range(x0, x0 + int(rect["width"]), step):
+                add(x, y)
+    return pixels
+
+
+def _pipeline_summary(controller: Any) -> Dict[str, Any]:
+    color_targets: List[Dict[str, Any]] = []
+    depth_target: Optional[Dict[str, Any]] = None
+    try:
+        pipe = controller.GetPipelineState()
+        framebuffer = getattr(pipe, "GetFramebuffer", None)
+        if callable(framebuffer):
+            fb = framebuffer()
+            if hasattr(fb, "colorAttachments"):
+                for idx, att in enumerate(fb.colorAttachments):
+                    res_id = getattr(att, "resourceId", None)
+                    if res_id:
+                        color_targets.append(
+                            {
+                                "index": idx,
+                                "resourceId": _resource_id_to_str(res_id),
+                                "name": getattr(att, "name", f"RT{idx}"),
+                            }
+                        )
+            depth_att = getattr(fb, "depthAttachment", None)
+            if depth_att and getattr(depth_att, "resourceId", None):
+                depth_target = {
+                    "resourceId": _resource_id_to_str(depth_att.resourceId),
+                    "name": getattr(depth_att, "name", "Depth"),
+                }
+    except Exception:
+        pass
+
+    highlight = None
+    if depth_target is None:
+        highlight = "RS"
+
+    return {
+        "highlightStage": highlight,
+        "warningMessage": None if highlight is None else "Depth attachment missing; RS highlighted",
+        "colorTargets": color_targets,
+        "depthTarget": depth_target,
+    }
+
+
+def _native_save(
+    rd: RenderdocModule, controller: Any, resource_id: Any, file_type: str, mip: int, slice: int, output_path: str
+) -> None:
+    save_data = rd.module.TextureSave()
+    save_data.resourceId = resource_id
+    save_data.destType = getattr(rd.module.FileType, file_type.upper())
+    save_data.mip = mip
+    save_data.slice.sliceIndex = slice
+    controller.SaveTexture(save_data, output_path)
+
+
+def _subresource_range(spec: Any, count: int) -> range:
+    if spec is None:
+        return range(0, 1)
+    if spec == "all":
+        return range(0, count)
+    if isinstance(spec, int):
+        return range(spec, spec + 1)
+    first, last = int(spec[0]), int(spec[1])
+    return range(max(0, first), min(last, count - 1) + 1)
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000.0, 3)
+
+
+def _batch_query(query: Any) -> Any:
+    """Normalize a batch_query item to (tool, event_id, arguments)."""
+
+    if isinstance(query, dict):
+        tool, event_id, arguments = query.get("tool"), query.get("event_id"), query.get("arguments")
+    elif isinstance(query, (list, tuple)) and 1 <= len(query) <= 3:
+        tool, event_id, arguments = (list(query) + [None, None])[:3]
+    else:
+        raise ValueError(f"Invalid batch query: {query!r}")
+    if tool not in BATCH_TOOLS:
+        expected = ", ".join(sorted(BATCH_TOOLS))
+        raise ValueError(f"Tool not supported in batch_query: {tool} (expected one of {expected})")
+    if event_id is not None and not isinstance(event_id, int):
+        raise ValueError(f"Invalid event_id in batch query: {event_id!r}")
+    arguments = dict(arguments or {})
+    for reserved in ("capture_path", "event_id"):
+        arguments.pop(reserved, None)
+    return tool, event_id, arguments
+
+
+def _seek(cap: Any, event_id: int) -> None:
+    """Move a session's controller to ``event_id``, skipping the replay when it is already there.
+
+    The session tracks the event it was last moved to. From an unknown
+    position (new controller, after a failed seek or a call that replays
+    internally) the replay is forced, as every tool did before.
+    """
+
+    current = getattr(cap, "current_event", None)
+    if current == event_id:
+        cap.seeks_skipped = getattr(cap, "seeks_skipped", 0) + 1
+        return
+    cap.current_event = None
+    cap.controller.SetFrameEvent(event_id, current is None)
+    cap.current_event = event_id
+    cap.seeks = getattr(cap, "seeks", 0) + 1
+
+
+def _position_lost(cap: Any) -> None:
+    """Forget the tracked event after PixelHistory/FetchCounters, which replay the frame internally."""
+
+    cap.current_event = None
+
+
+def _last_event_id(controller: Any) -> int:
+    actions = list(controller.GetRootActions())
+    event_id = 0
+    while actions:
+        event_id = int(actions[-1].eventId)
+        actions = list(actions[-1].children)
+    return event_id
+
+
+def _flags_mask(flags: Any) -> int:
+    try:
+        return int(flags)
+    except (TypeError, ValueError):
+        return int(getattr(flags, "value", 0) or 0)
+
+
 def _event_id(mod: Any) -> int:
     if hasattr(mod, "eventId"):
         return int(mod.eventId)
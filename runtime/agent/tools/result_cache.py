@@ -0,0 +1,137 @@
+"""Memoization of tool results keyed on capture content.
+
+Results are keyed by tool name, canonicalized arguments (with the capture
+path replaced by the capture's content fingerprint) and stored as compact
+JSON. The in-memory tier is an LRU bounded by total encoded bytes; the
+optional on-disk tier keeps one file per key under ``<cache_dir>/results``
+so results survive server restarts. Each hit decodes a fresh copy, so
+callers can never mutate a cached value.
+"""
+
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Tools that write files or copy captures must always run.
+# batch_query results are not cached as a whole; its individual queries are.
+# diff_captures has no capture_path to fingerprint; its action lists and counters are cached.
+UNCACHED_TOOLS = frozenset(
+    {"save_texture", "export_textures", "export_mesh", "copy_capture", "session_stats", "batch_query", "diff_captures"}
+)
+
+CACHE_VERSION = "1"
+
+
+def result_key(tool_name: str, payload: Dict[str, Any], fingerprint: str) -> str:
+    """Return a stable hex key for a tool call against a capture fingerprint."""
+
+    arguments = {k: v for k, v in payload.items() if k != "capture_path" and v is not None}
+    canonical = json.dumps(
+        {"v": CACHE_VERSION, "tool": tool_name, "args": arguments, "capture": fingerprint},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ToolResultCache:
+    """Two-tier (memory LRU + optional disk) cache of encoded tool results."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if encoded is None and self.disk_dir:
+            encoded = self._read_disk(key)
+            if encoded is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, encoded)
+        if encoded is None:
+            with self._lock:
+                self.misses += 1
+            return False, None
+        return True, json.loads(encoded)
+
+    def put(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        self._remember(key, encoded)
+        if self.disk_dir:
+            self._write_disk(key, encoded)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "diskHits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "diskDir": self.disk_dir,
+            }
+
+    def _remember(self, key: str, encoded: str) -> None:
+        size = len(encoded)
+        # A single result larger than a quarter of the budget would flush everything else.
+        if size > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = encoded
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as handle:
+                return handle.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, encoded: str) -> None:
+        path = self._disk_path(key)
+        tmp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(prefix=".result-", suffix=".tmp", dir=os.path.dirname(path))
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(encoded)
+            os.replace(tmp_path, path)
+        except OSError:
+            # The disk tier is best effort; the in-memory entry is still valid.
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
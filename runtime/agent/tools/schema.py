@@ -0,0 +1,117 @@
+"""Precomputed tool schema with a content hash and a compact prompt form.
+
+The schema is static for a given build, so it is rendered once per process:
+the JSON schema dict, the MCP descriptors (``renderdoc.<tool>`` names), an
+``etag`` (hash of the canonical JSON plus SCHEMA_VERSION) that clients use
+to skip re-downloading it, and ``prompt``, a one-line-per-tool signature
+rendering for LLM planners that costs far fewer tokens than indented JSON:
+
+    - pixel_history(capture_path:str, texture_id:int, x:int, y:int, sample?:int=0): Retrieve ...
+"""
+
+
+import hashlib
+import json
+from typing import Any, Dict, List, Optional
+
+SCHEMA_VERSION = "0.1"
+
+_TYPE_NAMES = {"string": "str", "integer": "int", "number": "float", "boolean": "bool", "null": "null"}
+
+
+class ToolSchema:
+    """Tool schema, MCP descriptors, etag and prompt rendering computed once.
+
+    The dicts are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, schema: Dict[str, Any], prefix: str = "renderdoc."):
+        self.version = SCHEMA_VERSION
+        self.schema = schema
+        self.descriptors = tool_descriptors(schema, prefix)
+        canonical = json.dumps(schema, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        self.etag = hashlib.sha256(f"{SCHEMA_VERSION}\n{canonical}".encode("utf-8")).hexdigest()[:16]
+        self.prompt = render_compact(schema)
+
+    def response(self, if_none_match: Optional[str] = None) -> Dict[str, Any]:
+        """Result of the ``mcp.schema`` call; omits the body when the etag matches."""
+
+        if if_none_match == self.etag:
+            return {"version": self.version, "etag": self.etag, "notModified": True}
+        return {
+            "version": self.version,
+            "etag": self.etag,
+            "notModified": False,
+            "schema": self.schema,
+            "descriptors": self.descriptors,
+            "prompt": self.prompt,
+        }
+
+
+def tool_descriptors(schema: Dict[str, Any], prefix: str = "renderdoc.") -> List[Dict[str, Any]]:
+    """Return MCP tool descriptors (name/description/parameters) for a schema."""
+
+    return [
+        {
+            "name": f"{prefix}{name}",
+            "description": spec.get("description", ""),
+            "parameters": spec.get("parameters", {"type": "object", "properties": {}}),
+        }
+        for name, spec in schema.items()
+    ]
+
+
+def render_compact(schema: Dict[str, Any]) -> str:
+    """Render the schema as one signature line per tool plus parameter notes."""
+
+    lines = []
+    for name, spec in schema.items():
+        parameters = spec.get("parameters") or {}
+        required = set(parameters.get("required") or ())
+        args = []
+        notes = []
+        for arg, prop in (parameters.get("properties") or {}).items():
+            text = arg if arg in required else arg + "?"
+            text += ":" + _type_text(prop)
+            if "default" in prop:
+                text += "=" + json.dumps(prop["default"], ensure_ascii=False)
+            args.append(text)
+            _notes(arg, prop, notes)
+        lines.append(f"- {name}({', '.join(args)}): {spec.get('description', '')}")
+        if notes:
+            lines.append("  " + "; ".join(notes))
+    return "\n".join(lines)
+
+
+def _notes(path: str, prop: Dict[str, Any], notes: List[str]) -> None:
+    if prop.get("description"):
+        notes.append(f"{path}: {prop['description']}")
+    while prop.get("type") == "array" and isinstance(prop.get("items"), dict):
+        prop, path = prop["items"], path + "[]"
+    for key, value in (prop.get("properties") or {}).items():
+        _notes(f"{path}.{key}", value, notes)
+
+
+def _type_text(prop: Dict[str, Any]) -> str:
+    if "enum" in prop:
+        return "|".join(json.dumps(value, ensure_ascii=False) for value in prop["enum"])
+    kinds = prop.get("type", "any")
+    if isinstance(kinds, list):
+        return "|".join(_kind_text(kind, prop) for kind in kinds)
+    return _kind_text(kinds, prop)
+
+
+def _kind_text(kind: str, prop: Dict[str, Any]) -> str:
+    if kind == "array":
+        items = prop.get("items")
+        return f"[{_type_text(items)}]" if items else "list"
+    if kind == "object":
+        properties = prop.get("properties")
+        if not properties:
+            return "object"
+        required = set(prop.get("required") or ())
+        fields = [
+            (key if key in required else key + "?") + ":" + _type_text(value) for key, value in properties.items()
+        ]
+        return "{" + ",".join(fields) + "}"
+    return _TYPE_NAMES.get(kind, kind)
@@ -0,0 +1,127 @@
+"""Encoders backing the export_textures tool.
+
+Texture subresources are read back on the replay thread with
+GetTextureData and encoded here on worker threads: PNG via zlib (which
+releases the GIL) and DDS as a DX10 header followed by the raw texels.
+Formats these encoders cannot represent return None so the caller can fall
+back to RenderDoc's own SaveTexture on the replay thread.
+"""
+
+
+import struct
+import zlib
+from typing import Any, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+from .texture_scan import decode_texels, enum_name
+
+FILE_EXTENSIONS = {"png": "png", "exr": "exr", "dds": "dds"}
+
+# (format type, component type, component count, component byte width, BGRA) -> DXGI_FORMAT
+_DXGI_FORMATS = {
+    ("Regular", "Float", 4, 4, False): 2,
+    ("Regular", "Float", 3, 4, False): 6,
+    ("Regular", "Float", 4, 2, False): 10,
+    ("Regular", "UNorm", 4, 2, False): 11,
+    ("Regular", "Float", 2, 4, False): 16,
+    ("Regular", "UNorm", 4, 1, False): 28,
+    ("Regular", "UNormSRGB", 4, 1, False): 29,
+    ("Regular", "Float", 2, 2, False): 34,
+    ("Regular", "Float", 1, 4, False): 41,
+    ("Regular", "UNorm", 2, 1, False): 49,
+    ("Regular", "Float", 1, 2, False): 54,
+    ("Regular", "UNorm", 1, 1, False): 61,
+    ("Regular", "UNorm", 4, 1, True): 87,
+    ("Regular", "UNormSRGB", 4, 1, True): 91,
+    ("R10G10B10A2", "UNorm", 4, 1, False): 24,
+    ("R11G11B10", "Float", 3, 1, False): 26,
+}
+
+_PNG_COLOUR_TYPES = {1: 0, 3: 2, 4: 6}
+
+
+def _bgra(fmt: Any) -> bool:
+    order = getattr(fmt, "BGRAOrder", None)
+    return bool(order()) if callable(order) else False
+
+
+def dxgi_format(fmt: Any) -> Optional[int]:
+    key = (
+        enum_name(getattr(fmt, "type", "Regular")),
+        enum_name(getattr(fmt, "compType", "")),
+        int(getattr(fmt, "compCount", 0)),
+        int(getattr(fmt, "compByteWidth", 0)),
+        _bgra(fmt),
+    )
+    return _DXGI_FORMATS.get(key)
+
+
+def to_rgba8(raw: bytes, fmt: Any, width: int, height: int) -> Optional["np.ndarray"]:
+    """Convert a subresource to a (H, W, C) uint8 image, or None if unsupported."""
+
+    if np is None:
+        return None
+    fmt_type = enum_name(getattr(fmt, "type", "Regular"))
+    comp_type = enum_name(getattr(fmt, "compType", ""))
+    components = int(getattr(fmt, "compCount", 4))
+    comp_width = int(getattr(fmt, "compByteWidth", 4))
+
+    if fmt_type == "R11G11B10" or (fmt_type == "Regular" and comp_type == "Float"):
+        try:
+            texels = decode_texels(raw, fmt, width, height)
+        except ValueError:
+            return None
+        # Same mapping as RenderDoc's LDR export: clamp to [0, 1], NaN -> 0.
+        image = np.rint(np.clip(np.nan_to_num(texels, nan=0.0), 0.0, 1.0) * 255.0).astype(np.uint8)
+    elif fmt_type == "Regular" and comp_type in ("UNorm", "UNormSRGB", "UInt") and comp_width in (1, 2):
+        dtype = np.uint8 if comp_width == 1 else np.dtype("<u2")
+        image = np.frombuffer(raw, dtype=dtype, count=width * height * components).reshape(height, width, components)
+        if comp_width == 2:
+            image = (image >> 8).astype(np.uint8)
+        if _bgra(fmt) and components >= 3:
+            image = image[:, :, [2, 1, 0] + list(range(3, components))]
+    else:
+        return None
+
+    if image.shape[2] == 2:
+        # PNG has no RG layout; export as RGB with an empty blue channel.
+        image = np.concatenate([image, np.zeros(image.shape[:2] + (1,), dtype=np.uint8)], axis=2)
+    return image
+
+
+def encode_png(image: "np.ndarray", level: int = 6) -> bytes:
+    """Encode a (H, W, 1|3|4) uint8 image as a PNG."""
+
+    height, width, channels = image.shape
+    rows = np.empty((height, 1 + width * channels), dtype=np.uint8)
+    rows[:, 0] = 0  # filter type None for every scanline
+    rows[:, 1:] = image.reshape(height, width * channels)
+    header = struct.pack(">IIBBBBB", width, height, 8, _PNG_COLOUR_TYPES[channels], 0, 0, 0)
+    return b"".join(
+        [
+            b"\x89PNG\r\n\x1a\n",
+            _png_chunk(b"IHDR", header),
+            _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), level)),
+            _png_chunk(b"IEND", b""),
+        ]
+    )
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+
+def encode_dds(raw: bytes, dxgi: int, width: int, height: int) -> bytes:
+    """Wrap one tightly packed 2D surface in a DDS file with a DX10 header."""
+
+    pitch = len(raw) // max(1, height)
+    pixel_format = struct.pack("<II4sIIIII", 32, 0x4, b"DX10", 0, 0, 0, 0, 0)
+    # CAPS | HEIGHT | WIDTH | PITCH | PIXELFORMAT
+    header = struct.pack("<7I", 124, 0x100F, height, width, pitch, 0, 1) + b"\0" * 44 + pixel_format
+    header += struct.pack("<5I", 0x1000, 0, 0, 0, 0)
+    dx10 = struct.pack("<5I", dxgi, 3, 0, 1, 0)  # TEXTURE2D, array size 1
+    return b"DDS " + header + dx10 + raw
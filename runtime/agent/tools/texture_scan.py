@@ -0,0 +1,204 @@
+"""Whole-texture NaN/Inf scans backing the scan_texture_nan_inf tool.
+
+A mip/slice is read back with one GetTextureData call and decoded into a
+(height, width, channels) float array: 16- and 32-bit float formats are
+viewed directly, R11G11B10 is unpacked bit-wise. NaN/Inf texels are found
+with array masks and summarized as counts, connected regions (bounding
+boxes), a downsampled mask and one representative coordinate per region,
+which can be fed to pixel_history / pixel_history_region.
+"""
+
+
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore
+
+
+def format_name(fmt: Any) -> str:
+    name = getattr(fmt, "Name", None)
+    if callable(name):
+        try:
+            return str(name())
+        except Exception:
+            pass
+    return str(getattr(fmt, "type", fmt))
+
+
+def enum_name(value: Any) -> str:
+    return getattr(value, "name", None) or str(value).rsplit(".", 1)[-1]
+
+
+def decode_texels(raw: bytes, fmt: Any, width: int, height: int) -> "np.ndarray":
+    """Decode one tightly packed 2D subresource into a (H, W, C) float array."""
+
+    if np is None:
+        raise RuntimeError("numpy is required to scan textures")
+    texels = width * height
+    if enum_name(getattr(fmt, "type", "Regular")) == "R11G11B10":
+        packed = np.frombuffer(raw, dtype="<u4", count=texels)
+        return unpack_r11g11b10(packed).reshape(height, width, 3)
+
+    if enum_name(getattr(fmt, "compType", "")) != "Float" or enum_name(getattr(fmt, "type", "Regular")) != "Regular":
+        raise ValueError(f"Unsupported texture format for NaN/Inf scan: {format_name(fmt)}")
+    width_bytes = int(getattr(fmt, "compByteWidth", 4))
+    components = int(getattr(fmt, "compCount", 4))
+    dtype = {2: "<f2", 4: "<f4"}.get(width_bytes)
+    if dtype is None:
+        raise ValueError(f"Unsupported float component width: {width_bytes}")
+    data = np.frombuffer(raw, dtype=dtype, count=texels * components)
+    return data.reshape(height, width, components)
+
+
+def unpack_r11g11b10(packed: "np.ndarray") -> "np.ndarray":
+    """Unpack R11G11B10_FLOAT words into an (N, 3) float32 array."""
+
+    channels = [
+        _unsigned_float(packed & 0x7FF, 6),
+        _unsigned_float((packed >> 11) & 0x7FF, 6),
+        _unsigned_float((packed >> 22) & 0x3FF, 5),
+    ]
+    return np.stack(channels, axis=-1)
+
+
+def _unsigned_float(bits: "np.ndarray", mantissa_bits: int) -> "np.ndarray":
+    # 5-bit exponent (bias 15), no sign bit; exponent 31 encodes Inf/NaN.
+    exponent = (bits >> mantissa_bits).astype(np.int32)
+    mantissa = (bits & ((1 << mantissa_bits) - 1)).astype(np.float32) / float(1 << mantissa_bits)
+    normal = (1.0 + mantissa) * np.exp2(exponent - 15).astype(np.float32)
+    denormal = mantissa * np.float32(2.0 ** -14)
+    values = np.where(exponent == 0, denormal, normal).astype(np.float32)
+    special = exponent == 31
+    values[special & (mantissa == 0)] = np.inf
+    values[special & (mantissa != 0)] = np.nan
+    return values
+
+
+def scan_texels(
+    texels: "np.ndarray",
+    mask_size: int = 64,
+    max_regions: int = 16,
+    max_samples: int = 16,
+) -> Dict[str, Any]:
+    """Find NaN/Inf texels in a (H, W, C) array and summarize where they are."""
+
+    height, width, channels = texels.shape
+    nan = np.isnan(texels)
+    inf = np.isinf(texels)
+    bad = (nan | inf).any(axis=2)
+
+    cell = max(1, -(-max(width, height) // max(1, int(mask_size))))
+    grid_h, grid_w = -(-height // cell), -(-width // cell)
+    padded = np.zeros((grid_h * cell, grid_w * cell), dtype=bool)
+    padded[:height, :width] = bad
+    tiles = padded.reshape(grid_h, cell, grid_w, cell).any(axis=(1, 3))
+
+    regions = _regions(bad, tiles, cell)
+    regions.sort(key=lambda region: -region["texelCount"])
+    samples: List[Dict[str, Any]] = []
+    for index, region in enumerate(regions[:max_samples]):
+        x, y = region.pop("_sample")
+        samples.append({"x": x, "y": y, "region": index, "value": texels[y, x].astype(np.float64).tolist()})
+    for region in regions:
+        region.pop("_sample", None)
+
+    ys, xs = np.nonzero(bad)
+    bbox = None
+    if xs.size:
+        bbox = _box(int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max()))
+    return {
+        "width": width,
+        "height": height,
+        "channels": channels,
+        "badTexelCount": int(xs.size),
+        "nanTexelCount": int(nan.any(axis=2).sum()),
+        "infTexelCount": int(inf.any(axis=2).sum()),
+        "channelCounts": {
+            "nan": nan.sum(axis=(0, 1)).astype(np.int64).tolist(),
+            "inf": inf.sum(axis=(0, 1)).astype(np.int64).tolist(),
+        },
+        "bbox": bbox,
+        "regionCount": len(regions),
+        "regions": regions[:max_regions],
+        "mask": {
+            "width": grid_w,
+            "height": grid_h,
+            "cellSize": cell,
+            "rows": ["".join("#" if v else "." for v in row) for row in tiles.tolist()],
+        },
+        "samples": samples,
+    }
+
+
+def _regions(bad: "np.ndarray", tiles: "np.ndarray", cell: int) -> List[Dict[str, Any]]:
+    """8-connected components of the tile mask, refined to exact texel boxes."""
+
+    grid_h, grid_w = tiles.shape
+    label = np.zeros(tiles.shape, dtype=np.int32)
+    regions: List[Dict[str, Any]] = []
+    for start in zip(*np.nonzero(tiles)):
+        if label[start]:
+            continue
+        current = len(regions) + 1
+        label[start] = current
+        stack = [start]
+        while stack:
+            ty, tx = stack.pop()
+            for ny in range(max(ty - 1, 0), min(ty + 2, grid_h)):
+                for nx in range(max(tx - 1, 0), min(tx + 2, grid_w)):
+                    if tiles[ny, nx] and not label[ny, nx]:
+                        label[ny, nx] = current
+                        stack.append((ny, nx))
+        regions.append(_region_summary(bad, label == current, cell))
+    return regions
+
+
+def _region_summary(bad: "np.ndarray", members: "np.ndarray", cell: int) -> Dict[str, Any]:
+    rows, cols = np.nonzero(members)
+    ty0, ty1, tx0, tx1 = int(rows.min()), int(rows.max()), int(cols.min()), int(cols.max())
+    y0, x0 = ty0 * cell, tx0 * cell
+    window = bad[y0 : (ty1 + 1) * cell, x0 : (tx1 + 1) * cell]
+    # Texels in tiles of other regions that fall inside this bounding box are excluded.
+    owned = np.repeat(np.repeat(members[ty0 : ty1 + 1, tx0 : tx1 + 1], cell, axis=0), cell, axis=1)
+    window = window & owned[: window.shape[0], : window.shape[1]]
+    ys, xs = np.nonzero(window)
+    cy, cx = ys.mean(), xs.mean()
+    nearest = int(np.argmin((ys - cy) ** 2 + (xs - cx) ** 2))
+    region = _box(x0 + int(xs.min()), y0 + int(ys.min()), x0 + int(xs.max()), y0 + int(ys.max()))
+    region["texelCount"] = int(xs.size)
+    region["_sample"] = (x0 + int(xs[nearest]), y0 + int(ys[nearest]))
+    return region
+
+
+def _box(x0: int, y0: int, x1: int, y1: int) -> Dict[str, int]:
+    return {"x": x0, "y": y0, "width": x1 - x0 + 1, "height": y1 - y0 + 1}
+
+
+def find_texture(textures: List[Any], resource_key: str) -> Optional[Any]:
+    for tex in textures:
+        res_id = tex.resourceId
+        value = getattr(res_id, "value", None)
+        if str(int(value) if value is not None else res_id) == resource_key:
+            return tex
+    return None
+
+
+def read_subresource(rd: Any, controller: Any, tex: Any, mip: int, slice: int, sample: int) -> Tuple[bytes, int, int]:
+    """Read one mip/slice of a texture; returns (bytes, width, height)."""
+
+    width = max(1, int(tex.width) >> mip)
+    height = max(1, int(tex.height) >> mip)
+    subresource = getattr(rd.module, "Subresource", None)
+    if subresource is not None:
+        raw = controller.GetTextureData(tex.resourceId, subresource(mip, slice, sample))
+    else:
+        raw = controller.GetTextureData(tex.resourceId, slice, mip)
+    raw = bytes(raw)
+    depth = max(1, int(getattr(tex, "depth", 1) or 1) >> mip)
+    if depth > 1 and slice < depth:
+        # 3D mips come back whole; keep the requested depth slice.
+        plane = len(raw) // depth
+        raw = raw[slice * plane : (slice + 1) * plane]
+    return raw, width, height
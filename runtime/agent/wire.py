@@ -0,0 +1,106 @@
+"""Wire encodings for MCP messages.
+
+Every connection starts with compact JSON text frames. A client can switch
+its connection to another encoding by calling the ``mcp.negotiate`` tool
+with an ordered list of preferences; binary encodings (msgpack, CBOR) are
+then sent as binary WebSocket frames. msgpack and cbor2 are optional
+dependencies and are only offered when installed.
+
+The JSON codec uses the stdlib encoder by default. Setting
+``MCP_JSON_BACKEND=orjson`` (or ``ujson``) opts into a faster encoder when
+installed; note that orjson writes NaN/Inf as ``null``, which hides exactly
+the values the NaN/Inf tools report.
+"""
+
+
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+try:
+    import msgpack  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None  # type: ignore
+
+try:
+    import cbor2  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    cbor2 = None  # type: ignore
+
+Frame = Union[str, bytes]
+
+
+class Codec:
+    """Encode/decode MCP messages for one wire format."""
+
+    def __init__(self, name: str, binary: bool, dumps: Callable[[Any], Frame], loads: Callable[[Frame], Any]):
+        self.name = name
+        self.binary = binary
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self) -> str:
+        return f"Codec({self.name!r})"
+
+
+def _stdlib_json_dumps(obj: Any) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _json_dumps_for(backend: str) -> Callable[[Any], str]:
+    if backend == "orjson":
+        try:
+            import orjson  # type: ignore
+        except ImportError:
+            return _stdlib_json_dumps
+        return lambda obj: orjson.dumps(obj).decode("utf-8")
+    if backend == "ujson":
+        try:
+            import ujson  # type: ignore
+        except ImportError:
+            return _stdlib_json_dumps
+        return lambda obj: ujson.dumps(obj, ensure_ascii=False)
+    return _stdlib_json_dumps
+
+
+def _json_loads(data: Frame) -> Any:
+    return json.loads(data)
+
+
+def json_codec(backend: Optional[str] = None) -> Codec:
+    """Compact JSON codec; ``backend`` defaults to $MCP_JSON_BACKEND or stdlib."""
+
+    backend = (backend or os.environ.get("MCP_JSON_BACKEND") or "stdlib").lower()
+    return Codec("json", False, _json_dumps_for(backend), _json_loads)
+
+
+def _codecs() -> Dict[str, Codec]:
+    codecs = {"json": json_codec()}
+    if msgpack is not None:
+        codecs["msgpack"] = Codec(
+            "msgpack",
+            True,
+            lambda obj: msgpack.packb(obj, use_bin_type=True),
+            lambda data: msgpack.unpackb(data, raw=False),
+        )
+    if cbor2 is not None:
+        codecs["cbor"] = Codec("cbor", True, cbor2.dumps, cbor2.loads)
+    return codecs
+
+
+CODECS: Dict[str, Codec] = _codecs()
+DEFAULT_CODEC: Codec = CODECS["json"]
+
+
+def available_encodings() -> List[str]:
+    return list(CODECS)
+
+
+def negotiate(preferences: Sequence[str]) -> Codec:
+    """Return the first supported codec from a client's preference list."""
+
+    for name in preferences or ():
+        codec = CODECS.get(str(name).lower())
+        if codec is not None:
+            return codec
+    return DEFAULT_CODEC
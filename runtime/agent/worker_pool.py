@@ -0,0 +1,284 @@
+"""Process-isolated replay workers.
+
+Replay runs in native code: a bad capture can crash or hang the process
+that opened it, and the GIL keeps two in-process replays from overlapping.
+ReplayWorkerPool runs RenderdocTools in worker subprocesses (one
+``renderdoc`` module and session pool each) and exposes the same
+``dispatch``/``stream``/``export_schema`` surface, so MCPServer can use it
+in place of an in-process RenderdocTools.
+
+- Calls are routed to the worker that already has the capture open
+  (capture affinity); new captures go to the worker with the fewest.
+- A worker that dies is restarted and the call fails with WorkerCrashed; a
+  call exceeding ``call_timeout`` kills and restarts its worker and fails
+  with WorkerTimeout. Other workers are unaffected.
+- Results whose JSON encoding is at least ``shm_threshold`` bytes (large
+  action lists, counter tables) are encoded once in the worker and handed
+  over through ``multiprocessing.shared_memory`` instead of being pickled
+  through the pipe (Python 3.8+; older interpreters pickle them). They come
+  back as the JSON round trip of the result, which is what the result
+  cache and MCP serialization see anyway.
+
+Workers are started with the ``spawn`` method, so ``factory`` must be a
+picklable top-level callable; it builds the worker's tools and is the
+injection point for a fake renderdoc module.
+"""
+
+
+import itertools
+import json
+import multiprocessing
+import threading
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover - Python < 3.8
+    shared_memory = None  # type: ignore
+
+from . import metrics
+from .scheduler import capture_lock_key, picklable_exception
+
+# Results whose JSON encoding is at least this large travel through shared memory.
+SHM_THRESHOLD = 1024 * 1024
+
+
+class WorkerCrashed(RuntimeError):
+    """Raised when a replay worker exits while handling a call."""
+
+
+class WorkerTimeout(WorkerCrashed):
+    """Raised when a call exceeds the pool timeout; the worker is restarted."""
+
+
+class SharedResult:
+    """Reference to a JSON-encoded result placed in a shared memory segment by a worker."""
+
+    def __init__(self, name: str, size: int):
+        self.name = name
+        self.size = size
+
+
+def export_result(value: Any, threshold: int, segments: List[Any]) -> Any:
+    """Move a large result into shared memory as JSON (worker side); small ones are returned as-is."""
+
+    if shared_memory is None or isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return value
+    try:
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except (TypeError, ValueError):
+        return value
+    size = len(encoded)
+    if size < threshold:
+        return value
+    segment = shared_memory.SharedMemory(create=True, size=size)
+    segment.buf[:size] = encoded
+    segments.append(segment)
+    return SharedResult(segment.name, size)
+
+
+def import_result(value: Any) -> Any:
+    """Decode a SharedResult and release its segment (parent side)."""
+
+    if not isinstance(value, SharedResult):
+        return value
+    segment = shared_memory.SharedMemory(name=value.name)
+    try:
+        return json.loads(bytes(segment.buf[: value.size]))
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def _worker_main(conn, factory: Callable[..., Any], factory_args: Tuple[Any, ...], shm_threshold: int) -> None:
+    tools = factory(*factory_args)
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except EOFError:
+                return
+            if message is None:
+                return
+            call_id, tool_name, payload = message
+            segments: List[Any] = []
+            with metrics.collect(tool_name) as collector:
+                try:
+                    result = export_result(tools.dispatch(tool_name, payload), shm_threshold, segments)
+                    reply = (call_id, True, result)
+                except Exception as exc:  # noqa: BLE001 - re-raised in the parent
+                    reply = (call_id, False, picklable_exception(exc))
+            try:
+                # Phase spans are replayed into the parent's metrics registry.
+                conn.send(reply + (collector.phases,))
+            finally:
+                # The parent unlinks each segment once it has copied the bytes.
+                for segment in segments:
+                    segment.close()
+    finally:
+        tools.close()
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        self.lock = threading.Lock()
+        self.process = None
+        self.conn = None
+        self.captures = set()
+        self.calls = 0
+        self.restarts = 0
+
+
+class ReplayWorkerPool:
+    """Route tool calls to replay subprocesses with capture affinity."""
+
+    def __init__(
+        self,
+        factory: Callable[..., Any],
+        factory_args: Tuple[Any, ...] = (),
+        workers: int = 2,
+        call_timeout: Optional[float] = 300.0,
+        shm_threshold: int = SHM_THRESHOLD,
+        local_tools: Any = None,
+    ):
+        self.factory = factory
+        self.factory_args = factory_args
+        self.call_timeout = call_timeout
+        self.shm_threshold = shm_threshold
+        self._local_tools = local_tools
+        self._context = multiprocessing.get_context("spawn")
+        self._workers = [_Worker(i) for i in range(max(1, int(workers)))]
+        self._affinity: Dict[str, _Worker] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.crashes = 0
+        self.timeouts = 0
+        for worker in self._workers:
+            self._start(worker)
+
+    @property
+    def local_tools(self) -> Any:
+        """In-process tools for work that needs no replay (schema, index reads)."""
+
+        if self._local_tools is None:
+            self._local_tools = self.factory(*self.factory_args)
+        return self._local_tools
+
+    def dispatch(self, tool_name: str, payload: Dict[str, Any]) -> Any:
+        if tool_name == "session_stats":
+            return self.stats()
+        key = capture_lock_key(payload)
+        return self._call(self._route(key), tool_name, payload)
+
+    def stream(self, tool_name: str, payload: Dict[str, Any], chunk_size: int = 1000) -> Iterator[List[Any]]:
+        if tool_name != "iterate_actions":
+            raise ValueError(f"Tool does not support streaming: {tool_name}")
+        # Build the persistent action index in the capture's worker, then read it locally.
+        self.dispatch("iterate_actions", {"capture_path": payload["capture_path"], "limit": 0})
+        return self.local_tools.stream(tool_name, payload, chunk_size)
+
+    def export_schema(self) -> Dict[str, Any]:
+        return self.local_tools.export_schema()
+
+    def tool_schema(self) -> Any:
+        return self.local_tools.tool_schema()
+
+    def stats(self) -> Dict[str, Any]:
+        workers = []
+        for worker in self._workers:
+            sessions = None
+            try:
+                sessions = self._call(worker, "session_stats", {})
+            except WorkerCrashed:
+                pass
+            workers.append(
+                {
+                    "index": worker.index,
+                    "pid": worker.process.pid if worker.process is not None else None,
+                    "captures": sorted(worker.captures),
+                    "calls": worker.calls,
+                    "restarts": worker.restarts,
+                    "sessions": sessions,
+                }
+            )
+        return {"workers": workers, "crashes": self.crashes, "timeouts": self.timeouts}
+
+    def close(self) -> None:
+        for worker in self._workers:
+            with worker.lock:
+                self._stop(worker, graceful=True)
+
+    def _route(self, key: Optional[str]) -> _Worker:
+        with self._lock:
+            worker = self._affinity.get(key) if key is not None else None
+            if worker is None:
+                worker = min(self._workers, key=lambda w: (w.lock.locked(), len(w.captures), w.calls))
+                if key is not None:
+                    self._affinity[key] = worker
+                    worker.captures.add(key)
+            return worker
+
+    def _call(self, worker: _Worker, tool_name: str, payload: Dict[str, Any]) -> Any:
+        call_id = next(self._ids)
+        with worker.lock:
+            if worker.process is None or not worker.process.is_alive():
+                self._restart(worker)
+            worker.calls += 1
+            try:
+                worker.conn.send((call_id, tool_name, payload))
+                if not worker.conn.poll(self.call_timeout):
+                    self.timeouts += 1
+                    self._restart(worker)
+                    raise WorkerTimeout(f"{tool_name} exceeded {self.call_timeout}s; replay worker restarted")
+                _, ok, value, phases = worker.conn.recv()
+            except (EOFError, OSError) as exc:
+                self.crashes += 1
+                worker.process.join(1.0)
+                code = worker.process.exitcode
+                self._restart(worker)
+                raise WorkerCrashed(f"Replay worker exited during {tool_name} (exit code {code})") from exc
+        metrics.replay_spans(phases)
+        value = import_result(value)
+        if not ok:
+            raise value
+        return value
+
+    def _start(self, worker: _Worker) -> None:
+        parent, child = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child, self.factory, self.factory_args, self.shm_threshold),
+            name=f"renderdoc-replay-{worker.index}",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        worker.process, worker.conn = process, parent
+
+    def _stop(self, worker: _Worker, graceful: bool = False) -> None:
+        process, conn = worker.process, worker.conn
+        worker.process = worker.conn = None
+        if conn is not None:
+            try:
+                if graceful:
+                    conn.send(None)
+            except OSError:
+                pass
+        if process is not None:
+            process.join(5.0 if graceful else 0)
+            if process.is_alive():
+                process.kill() if hasattr(process, "kill") else process.terminate()
+                process.join()
+        if conn is not None:
+            conn.close()
+
+    def _restart(self, worker: _Worker) -> None:
+        self._stop(worker)
+        with self._lock:
+            # A fresh process has nothing open; let captures be re-routed.
+            for key in worker.captures:
+                self._affinity.pop(key, None)
+            worker.captures = set()
+        worker.restarts += 1
+        self._start(worker)